@@ -0,0 +1,252 @@
+import collections
+import json
+import queue
+import socket
+import threading
+import time
+
+import numpy as np
+
+
+# pynput's special Key names; an action is one of these or a single character
+KEY_NAMES = frozenset(
+    ["alt", "alt_l", "alt_r", "alt_gr", "backspace", "caps_lock", "cmd", "cmd_l", "cmd_r", "ctrl", "ctrl_l",
+     "ctrl_r", "delete", "down", "end", "enter", "esc", "home", "left", "page_down", "page_up", "right", "shift",
+     "shift_l", "shift_r", "space", "tab", "up", "insert", "menu", "num_lock", "pause", "print_screen",
+     "scroll_lock", "media_play_pause", "media_volume_mute", "media_volume_down", "media_volume_up",
+     "media_previous", "media_next"]
+    + [f"f{i}" for i in range(1, 21)])
+
+
+def is_key_name(action):
+    return isinstance(action, str) and (len(action) == 1 or action in KEY_NAMES)
+
+
+# Backends
+class ActionBackend:
+    """Where actions end up. send() is only ever called from the
+    ActionDispatcher thread, so it may block.
+
+    action is a key name ("media_volume_up", "a", ...), count how many
+    times in a row to perform it.
+    """
+
+    def send(self, action, count):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class KeyboardBackend(ActionBackend):
+    """Key presses through pynput, or through any object with press()/release().
+
+    resolve_keys: press pynput Keys for special key names
+    ("media_volume_up" is Key.media_volume_up), anything else is a single
+    character. Otherwise the keyboard gets the names as they are (fakes).
+    Default: only when the backend makes its own pynput controller, pass
+    True with a real one.
+    """
+
+    def __init__(self, keyboard=None, resolve_keys=None):
+        if resolve_keys is None:
+            resolve_keys = keyboard is None
+        if keyboard is None:
+            from pynput.keyboard import Controller
+            keyboard = Controller()
+        if resolve_keys:
+            from pynput.keyboard import Key
+            self._resolve = lambda name: getattr(Key, name) if len(name) > 1 else name
+        else:
+            self._resolve = lambda name: name
+        self.keyboard = keyboard
+        self._keys = {}
+
+    def send(self, action, count):
+        key = self._keys.get(action)
+        if key is None:
+            key = self._keys[action] = self._resolve(action)
+        for _ in range(count):
+            self.keyboard.press(key)
+            self.keyboard.release(key)
+
+
+class RecordingBackend(ActionBackend):
+    """Remembers what it was sent. delay simulates a slow input stack."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []  # (action, count, perf_counter time)
+
+    def send(self, action, count):
+        if self.delay:
+            time.sleep(self.delay)
+        self.sent.append((action, count, time.perf_counter()))
+
+    def totals(self):
+        out = {}
+        for action, count, _ in self.sent:
+            out[action] = out.get(action, 0) + count
+        return out
+
+
+class NullBackend(ActionBackend):
+    """Performs nothing, for when someone else acts on the gestures
+    (gesture_daemon.py's clients)."""
+
+    def send(self, action, count):
+        pass
+
+
+class SocketBackend(ActionBackend):
+    """One JSON datagram per action to a local UDP port, for another
+    process (player plugin, test harness) to act on:
+
+        {"action": "media_volume_up", "count": 2, "time": 1700000000.0}
+    """
+
+    def __init__(self, address=("127.0.0.1", 47800)):
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, action, count):
+        msg = json.dumps({"action": action, "count": count, "time": time.time()})
+        try:
+            self.sock.sendto(msg.encode(), self.address)
+        except OSError:
+            pass  # nobody listening, like a key press nobody handles
+
+    def close(self):
+        self.sock.close()
+
+
+# Defaults: volume steps are merged, track / playback changes are rate limited
+COALESCE = frozenset({"media_volume_up", "media_volume_down"})
+RATE_LIMITS = {
+    "media_volume_up": 0.05,
+    "media_volume_down": 0.05,
+    "media_play_pause": 0.5,
+    "media_next": 0.3,
+    "media_previous": 0.3,
+}
+
+
+class ActionDispatcher(threading.Thread):
+    """Performs actions off the capture loop.
+
+    submit() never blocks: it puts the action on a bounded queue (and drops
+    it when the queue is full). The dispatcher thread drains the queue,
+    merges queued repeats of coalescable actions into one send(action, n),
+    and enforces per-action minimum intervals: a coalescable action waits
+    for its slot (collecting more repeats meanwhile), any other action that
+    comes too soon is dropped.
+    """
+
+    def __init__(self, backend, maxsize=64, coalesce=COALESCE, rate_limits=None, latency_samples=4096):
+        super().__init__(daemon=True, name="GesturlyActions")
+        self.backend = backend
+        self.coalesce = coalesce
+        self.rate_limits = dict(RATE_LIMITS if rate_limits is None else rate_limits)
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._running = True
+        self._idle = threading.Event()
+        self._idle.set()
+
+        self._pending = {}      # coalescable action -> enqueue times waiting for their slot
+        self._next_allowed = {}
+
+        # Stats
+        self.submitted = 0
+        self.dropped = 0        # queue full
+        self.rate_limited = 0
+        self.sent = 0           # actions performed (a batch of n counts n)
+        self.batches = 0        # backend.send() calls
+        self.errors = 0
+        self.latency_ms = collections.deque(maxlen=latency_samples)  # enqueue -> performed, per action
+
+    def submit(self, action):
+        self.submitted += 1
+        try:
+            self._queue.put_nowait((action, time.perf_counter()))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._idle.clear()
+
+    def run(self):
+        while self._running:
+            try:
+                item = self._queue.get(timeout=self._wait_time())
+            except queue.Empty:
+                item = None
+            if item is not None:
+                self._accept(*item)
+                # Take whatever else queued up meanwhile in the same round
+                while True:
+                    try:
+                        self._accept(*self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            self._send_pending()
+            if not self._pending and self._queue.empty():
+                self._idle.set()
+
+    def _wait_time(self):
+        if not self._pending:
+            return 0.1
+        now = time.perf_counter()
+        return max(0.0, min(self._next_allowed.get(a, now) for a in self._pending) - now)
+
+    def _accept(self, action, enqueued):
+        if action in self.coalesce:
+            self._pending.setdefault(action, []).append(enqueued)
+            return
+        now = time.perf_counter()
+        if now < self._next_allowed.get(action, 0.0):
+            self.rate_limited += 1
+            return
+        self._send(action, [enqueued], now)
+
+    def _send_pending(self):
+        now = time.perf_counter()
+        for action in list(self._pending):
+            if now >= self._next_allowed.get(action, 0.0):
+                self._send(action, self._pending.pop(action), now)
+
+    def _send(self, action, enqueued, now):
+        self._next_allowed[action] = now + self.rate_limits.get(action, 0.0)
+        try:
+            self.backend.send(action, len(enqueued))
+        except Exception as e:
+            self.errors += 1
+            print(f"ActionDispatcher: {action} failed: {e}")
+            return
+        done = time.perf_counter()
+        self.latency_ms.extend([(done - t) * 1000 for t in enqueued])
+        self.sent += len(enqueued)
+        self.batches += 1
+
+    def flush(self, timeout=1.0):
+        """Wait until everything submitted so far was sent (or dropped)."""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        self.flush()
+        self._running = False
+        if self.is_alive():
+            self.join(timeout=1)
+        self.backend.close()
+
+    def latency_summary(self):
+        """(count, p50, p95, p99, max) of enqueue -> performed latency in ms."""
+        if not self.latency_ms:
+            return 0, 0.0, 0.0, 0.0, 0.0
+        ms = np.array(list(self.latency_ms))  # list() copies in one go, the thread may be appending
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return len(ms), p50, p95, p99, ms.max()
+
+    def format_stats(self):
+        n, p50, p95, p99, worst = self.latency_summary()
+        return (f"actions: {self.submitted} submitted, {self.sent} sent in {self.batches} batches, "
+                f"{self.rate_limited} rate limited, {self.dropped} dropped\n"
+                f"  enqueue -> performed ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {worst:.2f}")
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict, namedtuple
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QImage, QPainter, QPainterPath
+
+# Pre-rendered variants of one cover, as QImages so they can be built off the
+# GUI thread. Pages only do a QPixmap.fromImage() per track change.
+#   card       CARD_SIZE square, centre-cropped, rounded (BigPicturePage)
+#   background small blurred version, stretched to the window (BigPicturePage)
+#   thumbnail  THUMB_SIZE, aspect kept (HomePage)
+AlbumArt = namedtuple("AlbumArt", "card background thumbnail")
+
+CARD_SIZE = 250
+CARD_RADIUS = 20
+BLUR_SIZE = 50    # downsample to this to blur ...
+BG_SIZE = 512     # ... and smooth back up to this
+THUMB_SIZE = 400
+
+
+def default_cache_dir():
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "gesturly", "album_art")
+
+
+def track_key(info):
+    raw = f"{info['source']}\0{info['artist']}\0{info['song']}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def render_variants(data):
+    """Encoded image bytes -> AlbumArt, or None if the data doesn't decode."""
+    img = QImage.fromData(data)
+    if img.isNull():
+        return None
+    smooth = Qt.TransformationMode.SmoothTransformation
+
+    # Card: fill the square, crop the overflow, clip to a rounded rect
+    filled = img.scaled(CARD_SIZE, CARD_SIZE, Qt.AspectRatioMode.KeepAspectRatioByExpanding, smooth)
+    card = QImage(CARD_SIZE, CARD_SIZE, QImage.Format.Format_ARGB32_Premultiplied)
+    card.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(card)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(0, 0, CARD_SIZE, CARD_SIZE), CARD_RADIUS, CARD_RADIUS)
+    painter.setClipPath(path)
+    painter.drawImage((CARD_SIZE - filled.width()) // 2, (CARD_SIZE - filled.height()) // 2, filled)
+    painter.end()
+
+    small = img.scaled(BLUR_SIZE, BLUR_SIZE, Qt.AspectRatioMode.IgnoreAspectRatio, smooth)
+    background = small.scaled(BG_SIZE, BG_SIZE, Qt.AspectRatioMode.IgnoreAspectRatio, smooth)
+
+    thumbnail = img.scaled(THUMB_SIZE, THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio, smooth)
+    return AlbumArt(card, background, thumbnail)
+
+
+class AlbumArtCache:
+    """Track-keyed album art: in-memory LRU of rendered variants over a
+    size-bounded on-disk store of the original bytes.
+
+    A new track costs one fetch + one render, a replay within the session
+    costs nothing, and a replay after a restart costs one render. A track
+    without art is only remembered for miss_ttl seconds: a failed fetch
+    (network blip, player busy) is tried again after that.
+    Meant to be used from a single thread (the NowPlayingService).
+    """
+
+    def __init__(self, cache_dir=None, max_memory_entries=32, max_disk_bytes=64 * 1024 * 1024, miss_ttl=5.0):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.miss_ttl = miss_ttl
+        self._memory = OrderedDict()  # key -> AlbumArt
+        self._misses = OrderedDict()  # key -> time.monotonic() until which it counts as "no art"
+        self._disk = OrderedDict()    # key -> size in bytes, oldest first
+        self._disk_bytes = 0
+        self.hits = self.disk_hits = self.fetches = 0
+        self._load_disk_index()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".img")
+
+    def _load_disk_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".img"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+        except OSError:
+            return
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def get(self, info, fetch):
+        """AlbumArt for the track described by info, or None.
+
+        fetch(info) -> bytes or None is only called on a full miss.
+        """
+        key = track_key(info)
+        if key in self._memory:
+            self.hits += 1
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if key in self._misses:
+            if time.monotonic() < self._misses[key]:
+                self.hits += 1
+                return None
+            del self._misses[key]
+
+        data = self._read_disk(key)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            self.fetches += 1
+            data = fetch(info)
+            if data:
+                self._write_disk(key, data)
+
+        art = render_variants(data) if data else None
+        if art is None:
+            self._misses[key] = time.monotonic() + self.miss_ttl
+            if len(self._misses) > self.max_memory_entries:
+                self._misses.popitem(last=False)
+            return None
+        self._memory[key] = art
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+        return art
+
+    def _read_disk(self, key):
+        if key not in self._disk:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)  # mtime doubles as "last used" across restarts
+        except OSError:
+            self._forget_disk(key)
+            return None
+        self._disk.move_to_end(key)
+        return data
+
+    def _write_disk(self, key, data):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._forget_disk(key)
+        self._disk[key] = len(data)
+        self._disk_bytes += len(data)
+        self._evict_disk()
+
+    def _forget_disk(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key = next(iter(self._disk))
+            self._forget_disk(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
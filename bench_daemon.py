@@ -0,0 +1,190 @@
+"""Gesture daemon under load: many local clients, some of them too slow.
+
+    python bench_daemon.py                                    # 100 clients (5 slow), events + landmarks, 10 s
+    python bench_daemon.py --clients 500 --procs 8 --fps 0    # unpaced: as many frames as the engine manages
+    python bench_daemon.py --topics events                    # gesture changes only
+
+The engine runs on generated frames in this process, publishing through a
+GestureDaemon on a temporary socket. The clients live in --procs other
+processes: the fast ones read everything as it comes, the slow ones read
+4 KB every --slow-interval seconds. Reported:
+
+    - engine fps and busy time per frame, without and with the daemon
+    - what publishing costs the engine thread per message
+    - how much of what was published each fast client got
+    - delivery latency, published -> parsed by the client
+    - messages dropped at the slow clients (and, hopefully not, the fast ones)
+"""
+import argparse
+import json
+import multiprocessing as mp_proc
+import os
+import selectors
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from action_dispatch import NullBackend
+from frame_sources import open_source
+from gesture_daemon import TOPICS, GestureDaemon, encode
+from gesture_engine import GestureEngine
+
+LATENCY_SAMPLES = 20000  # per client process
+SLOW_READ = 4096         # bytes a slow client reads at a time
+
+
+def client_process(path, fast, slow, topics, slow_interval, ready, stop, results):
+    """fast + slow clients on one selector, until stop is set."""
+    sel = selectors.DefaultSelector()
+    clients = []
+    for i in range(fast + slow):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        sock.sendall(encode({"topics": topics}))
+        sock.setblocking(False)
+        c = {"sock": sock, "slow": i >= fast, "buf": b"", "received": 0, "dropped": 0}
+        clients.append(c)
+        if not c["slow"]:
+            sel.register(sock, selectors.EVENT_READ, c)
+    slow_clients = [c for c in clients if c["slow"]]
+    ready.put(os.getpid())
+
+    latencies = []
+    seen = 0
+    next_slow_read = time.perf_counter() + slow_interval
+    while not stop.is_set():
+        ready_clients = [key.data for key, _ in sel.select(timeout=0.05)]
+        if time.perf_counter() >= next_slow_read:
+            ready_clients += slow_clients
+            next_slow_read += slow_interval
+        for c in ready_clients:
+            try:
+                data = c["sock"].recv(SLOW_READ if c["slow"] else 65536)
+            except BlockingIOError:
+                continue
+            if not data:
+                if not c["slow"]:
+                    sel.unregister(c["sock"])
+                continue
+            *lines, c["buf"] = (c["buf"] + data).split(b"\n")
+            received = time.perf_counter()
+            for line in lines:
+                msg = json.loads(line)
+                kind = msg["type"]
+                if kind == "dropped":
+                    c["dropped"] += msg["count"]
+                    continue
+                if kind == "hello":
+                    continue
+                c["received"] += 1
+                if not c["slow"] and "emitted" in msg:
+                    # Reservoir, so a long run still samples all of it
+                    seen += 1
+                    if len(latencies) < LATENCY_SAMPLES:
+                        latencies.append(received - msg["emitted"])
+                    else:
+                        j = np.random.randint(seen)
+                        if j < LATENCY_SAMPLES:
+                            latencies[j] = received - msg["emitted"]
+    for c in clients:
+        c["sock"].close()
+    results.put({
+        "fast": [(c["received"], c["dropped"]) for c in clients if not c["slow"]],
+        "slow": [(c["received"], c["dropped"]) for c in clients if c["slow"]],
+        "latencies": latencies,
+    })
+
+
+def run_engine(args, daemon_path=None, on_ready=None):
+    engine = GestureEngine(open_source(f"synthetic:{args.size}"), actions=NullBackend(), fps=args.fps or None)
+    daemon = None
+    if daemon_path:
+        daemon = GestureDaemon(engine, daemon_path, queue_size=args.queue, snapshot_interval=args.snapshot_interval)
+        daemon.start()
+        if on_ready:
+            on_ready()
+    stopper = threading.Timer(args.seconds, engine.stop)
+    stopper.start()
+    try:
+        engine.run()
+    finally:
+        stopper.cancel()
+    return engine, daemon
+
+
+def split(n, parts):
+    return [n // parts + (i < n % parts) for i in range(parts)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--slow", type=int, default=5, help="how many of the clients are slow")
+    parser.add_argument("--slow-interval", type=float, default=1.0, help="seconds between a slow client's reads")
+    parser.add_argument("--procs", type=int, default=4, help="client processes")
+    parser.add_argument("--topics", nargs="+", choices=TOPICS, default=["events", "landmarks"])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=60.0, help="engine frame rate (0 = unpaced)")
+    parser.add_argument("--size", default="640x480", help="generated frame size")
+    parser.add_argument("--queue", type=int, default=256, help="daemon queue per client")
+    parser.add_argument("--snapshot-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    base, _ = run_engine(args)
+    print(f"without daemon:        {base.frames_processed} frames, {base.pacer.format_stats()}")
+
+    ctx = mp_proc.get_context("spawn")
+    ready, results, stop = ctx.Queue(), ctx.Queue(), ctx.Event()
+    path = os.path.join(tempfile.mkdtemp(prefix="gesturly-bench-"), "daemon.sock")
+    fast = split(args.clients - args.slow, args.procs)
+    slow = split(args.slow, args.procs)
+    procs = [ctx.Process(target=client_process, args=(path, f, s, args.topics, args.slow_interval, ready, stop,
+                                                      results)) for f, s in zip(fast, slow)]
+
+    def start_clients():
+        for p in procs:
+            p.start()
+        for _ in procs:
+            ready.get(timeout=60)
+        time.sleep(0.5)  # for every client's topic request to go through
+
+    engine, daemon = run_engine(args, path, start_clients)
+    time.sleep(0.5)  # let the fast clients drain
+    stop.set()
+    out = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join()
+    daemon.stop()
+    os.rmdir(os.path.dirname(path))
+
+    print(f"with {args.clients} clients:".ljust(23) + f"{engine.frames_processed} frames, {engine.pacer.format_stats()}")
+    print(daemon.format_stats())
+    frames = max(1, engine.frames_processed)
+    print(f"engine thread per frame: {daemon.publish_ns / 1e6 / frames:.3f} ms queueing, "
+          f"{daemon.wake_ns / 1e6 / frames:.3f} ms waking the I/O thread (right before the pacer's sleep)")
+
+    published = sum(daemon.published[t] for t in args.topics)
+    fast_stats = [c for r in out for c in r["fast"]]
+    slow_stats = [c for r in out for c in r["slow"]]
+    if fast_stats:
+        got = np.array([r for r, _ in fast_stats])
+        print(f"fast clients ({len(fast_stats)}): received {got.min()}..{got.max()} of {published} published "
+              f"({got.mean() / max(1, published):.1%} on average), "
+              f"{sum(d for _, d in fast_stats)} dropped")
+    lat = np.array([v for r in out for v in r["latencies"]]) * 1000
+    if len(lat):
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        print(f"delivery latency ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {lat.max():.2f}")
+    if slow_stats:
+        got = np.array([r for r, _ in slow_stats])
+        # Their "dropped" notices wait behind everything else queued for them,
+        # so count at the daemon (fast clients drop nothing, see above)
+        print(f"slow clients ({len(slow_stats)}): received {got.mean():.0f} on average, "
+              f"{daemon.dropped / len(slow_stats):.0f} dropped for each by the daemon")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""ActionDispatcher vs. performing actions inline, with a slow fake input stack.
+
+    python bench_dispatch.py [--delay-ms 5] [--events 2000] [--rate 60]
+    python bench_dispatch.py --socket      # through a local UDP socket instead
+
+Simulates the capture loop submitting a mix of held-volume repeats and
+one-shot actions at frame rate and reports how long the loop itself is
+held up per action, plus enqueue -> performed latency and coalescing.
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+import numpy as np
+
+from action_dispatch import ActionDispatcher, RecordingBackend, SocketBackend
+
+
+def workload(n, rng):
+    # Mostly volume (hold to repeat), some track / playback changes
+    choices = ["media_volume_up"] * 6 + ["media_volume_down"] * 2 + ["media_play_pause", "media_next"]
+    return [choices[i] for i in rng.integers(len(choices), size=n)]
+
+
+def run_inline(backend, actions, period):
+    held = []
+    for action in actions:
+        t0 = time.perf_counter()
+        backend.send(action, 1)
+        held.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, period - held[-1]))
+    return np.array(held) * 1e6
+
+
+def run_dispatched(dispatcher, actions, period):
+    held = []
+    for action in actions:
+        t0 = time.perf_counter()
+        dispatcher.submit(action)
+        held.append(time.perf_counter() - t0)
+        time.sleep(period)
+    dispatcher.stop()
+    return np.array(held) * 1e6
+
+
+class UdpCounter(threading.Thread):
+    """Receives the SocketBackend's datagrams and counts actions."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.address = self.sock.getsockname()
+        self.totals = {}
+        self.running = True
+
+    def run(self):
+        while self.running:
+            try:
+                msg = json.loads(self.sock.recv(4096))
+            except socket.timeout:
+                continue
+            self.totals[msg["action"]] = self.totals.get(msg["action"], 0) + msg["count"]
+
+
+def describe(label, held_us):
+    p50, p99 = np.percentile(held_us, [50, 99])
+    print(f"{label:<12} loop held per action (us): p50 {p50:9.1f}  p99 {p99:9.1f}  max {held_us.max():9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=60, help="actions submitted per second")
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="simulated cost of one backend send")
+    parser.add_argument("--socket", action="store_true", help="dispatch to a local UDP socket")
+    args = parser.parse_args()
+
+    actions = workload(args.events, np.random.default_rng(0))
+    period = 1.0 / args.rate
+    expected = {a: actions.count(a) for a in set(actions)}
+
+    if not args.socket:
+        inline = RecordingBackend(delay=args.delay_ms / 1000)
+        describe("inline", run_inline(inline, actions, period))
+
+    receiver = None
+    if args.socket:
+        receiver = UdpCounter()
+        receiver.start()
+        backend = SocketBackend(receiver.address)
+    else:
+        backend = RecordingBackend(delay=args.delay_ms / 1000)
+    dispatcher = ActionDispatcher(backend)
+    dispatcher.start()
+    describe("dispatched", run_dispatched(dispatcher, actions, period))
+    print(dispatcher.format_stats())
+
+    if receiver:
+        time.sleep(0.3)
+        receiver.running = False
+        totals = receiver.totals
+    else:
+        totals = backend.totals()
+    print(f"submitted: {expected}")
+    print(f"performed: {totals}")
+
+
+if __name__ == "__main__":
+    main()
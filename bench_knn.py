@@ -0,0 +1,140 @@
+"""k-NN classifier: query latency vs. template count, and accuracy vs. the rule table.
+
+    python bench_knn.py                          # synthetic hands, 100 .. 10000 templates
+    python bench_knn.py --counts 500 5000 --brute
+    python bench_knn.py --recordings recordings/*.gestrec   # real templates, held-out frames
+
+Synthetic hands are generated at very different distances from the camera
+(hand sizes of 4% to 25% of the image), which is exactly where the fixed
+rule thresholds fall over.
+"""
+import argparse
+import time
+import numpy as np
+
+from bench_replay import print_confusion
+from gesture_features import classify, GESTURE_NAMES
+from gesture_knn import KnnClassifier, build_from_recordings, cKDTree
+
+# Per finger: the four joints (MCP .. tip) in a hand frame where the wrist is
+# at the origin, the palm is 1 long and "up" is -y, like in the image.
+_MCP_X = np.array([-0.3, -0.1, 0.1, 0.3])
+_LENGTH = np.array([1.0, 1.1, 1.0, 0.8])
+_EXTENDED = np.array([[0, -1.0], [0, -1.45], [0, -1.75], [0, -2.0]])
+_CURLED = np.array([[0, -1.0], [0, -1.35], [0, -1.15], [0, -0.95]])
+_THUMB_UP = np.array([[-0.35, -0.25], [-0.6, -0.45], [-0.65, -0.75], [-0.65, -1.05]])
+_THUMB_TUCKED = np.array([[-0.35, -0.25], [-0.6, -0.45], [-0.4, -0.55], [-0.15, -0.55]])
+
+# name -> (thumb up, (index, middle, ring, pinky) extended)
+SYNTHETIC_POSES = {
+    "Open Palm": (True, (1, 1, 1, 1)),
+    "Thumbs Down": (False, (0, 0, 0, 0)),
+    "Thumbs Up": (True, (0, 0, 0, 0)),
+    "OK": (None, (None, 1, 1, 1)),
+    "Peace": (False, (1, 1, 0, 0)),
+}
+
+
+def _pose(name):
+    thumb, fingers = SYNTHETIC_POSES[name]
+    pts = np.zeros((21, 2))
+    for i, up in enumerate(fingers):
+        joints = (_EXTENDED if up else _CURLED).copy()
+        joints[1:, 1] = joints[0, 1] + (joints[1:, 1] - joints[0, 1]) * _LENGTH[i]
+        joints[:, 0] += _MCP_X[i]
+        pts[5 + 4 * i:9 + 4 * i] = joints
+    pts[1:5] = _THUMB_UP if thumb else _THUMB_TUCKED
+    if thumb is None:
+        # OK: index curls down onto the thumb tip
+        pts[6:9] = [[-0.4, -1.25], [-0.5, -1.1], [-0.5, -0.9]]
+        pts[3:5] = [[-0.55, -0.7], [-0.48, -0.88]]
+    return pts
+
+
+def synthetic_hands(n, rng, scale=(0.04, 0.25)):
+    """n random hands of random poses. Returns ((n, 21, 3) landmarks, names)."""
+    names = list(SYNTHETIC_POSES)
+    labels = rng.integers(len(names), size=n)
+    base = np.stack([_pose(name) for name in names])[labels]
+    base += rng.normal(0, 0.05, base.shape)
+
+    angle = rng.uniform(-0.4, 0.4, n)
+    cos, sin = np.cos(angle), np.sin(angle)
+    rot = np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2)
+    size = rng.uniform(*scale, n)
+    xy = np.einsum("nij,nkj->nki", rot, base) * size[:, None, None]
+    xy += rng.uniform(0.3, 0.7, (n, 1, 2))
+
+    pts = np.empty((n, 21, 3), dtype=np.float32)
+    pts[..., :2] = xy
+    pts[..., 2] = rng.normal(0, 0.05, (n, 21)) * size[:, None]
+    return pts, [names[i] for i in labels]
+
+
+def measure(knn, queries, repeat=1):
+    lat = []
+    for _ in range(repeat):
+        for q in queries:
+            t0 = time.perf_counter_ns()
+            knn.classify(q)
+            lat.append(time.perf_counter_ns() - t0)
+    return np.array(lat) / 1000.0
+
+
+def accuracy(codes, names, truth):
+    return float(np.mean([names[c] == t for c, t in zip(codes, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 300, 1000, 3000, 10000],
+                        help="template counts to benchmark")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--brute", action="store_true", help="brute force even if scipy is installed")
+    parser.add_argument("--recordings", nargs="+", help="use templates from labelled recordings instead")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    if args.recordings:
+        knn = build_from_recordings(args.recordings, use_tree=not args.brute)
+        print(knn.summary())
+        lat = measure(knn, synthetic_hands(args.queries, rng)[0])
+        print(f"query (us): p50 {np.percentile(lat, 50):.1f}  p99 {np.percentile(lat, 99):.1f}")
+        return
+
+    test_pts, test_names = synthetic_hands(5000, rng)
+    rule_codes = classify(test_pts)
+    rule_acc = accuracy(rule_codes, GESTURE_NAMES, test_names)
+    index = "brute force" if args.brute or cKDTree is None else "KD-tree"
+    print(f"rule table accuracy on synthetic hands: {rule_acc:.1%}")
+    print(f"k-NN ({index}, 12 PCA dims + exact re-rank):")
+    print(f"{'templates':>10} {'MB':>7} {'build ms':>9} {'p50 us':>8} {'p99 us':>8} {'batch hands/s':>14} {'accuracy':>9}")
+
+    knn = None
+    for count in args.counts:
+        train_pts, train_names = synthetic_hands(count, rng)
+        knn = KnnClassifier(max_per_label=count, min_spacing=0.0, use_tree=not args.brute)
+        knn.add(train_pts, train_names)
+        t0 = time.perf_counter()
+        knn.classify(test_pts[0])  # builds the index
+        build_ms = (time.perf_counter() - t0) * 1000
+        lat = measure(knn, test_pts[:args.queries])
+        t0 = time.perf_counter()
+        codes = knn.classify(test_pts)
+        batch = len(test_pts) / (time.perf_counter() - t0)
+        mb = len(knn) * knn._index[0].itemsize * knn._index[0].shape[1] / 1e6
+        print(f"{len(knn):>10} {mb:>7.2f} {build_ms:>9.1f} {np.percentile(lat, 50):>8.1f} "
+              f"{np.percentile(lat, 99):>8.1f} {batch:>14,.0f} {accuracy(codes, knn.names, test_names):>9.1%}")
+
+    # Where the two disagree: by ground truth, on the largest template set
+    print()
+    print("k-NN vs. ground truth (rows = truth), largest template set")
+    names = GESTURE_NAMES
+    matrix = np.zeros((len(names), len(names)), dtype=np.int64)
+    for c, t in zip(knn.classify(test_pts), test_names):
+        matrix[names.index(t), names.index(knn.names[c]) if knn.names[c] in names else 0] += 1
+    print_confusion(matrix, names)
+
+
+if __name__ == "__main__":
+    main()
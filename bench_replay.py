@@ -0,0 +1,167 @@
+"""Replay landmark recordings through the classifier and execute_action.
+
+    python bench_replay.py recordings/*.gestrec [--repeat 5]
+
+No camera, no GUI and no real key presses: actions go to a FakeKeyboard.
+Reports throughput, per-call latency percentiles and a confusion matrix of
+recorded ground truth vs. classifier output, over the classifier's gestures
+(gestures.json or --knn) plus any other label the recordings use.
+"""
+import argparse
+import time
+import numpy as np
+
+from gesture_config import DEFAULT_CONFIG_PATH, ConfigWatcher
+from landmark_recording import LandmarkRecording, UNLABELLED
+
+
+def make_engine(keyboard, config_path, knn=None):
+    # Imported here so `--batch-only` runs work without OpenCV / MediaPipe
+    from gesture_engine import GestureEngine
+    # Replays run much faster than real time, the recorded timeline is
+    # already rate limited by the state machine's cooldowns
+    engine = GestureEngine(keyboard=keyboard, config_path=config_path, knn_templates=knn, rate_limits={})
+    # Never run(), so its dispatcher is ours to start
+    engine.dispatcher.start()
+    return engine
+
+
+def label_names(classifier_names, recs):
+    """The classifier's names, then labels only the recordings know. Warns
+    about the latter: the classifier can never predict them."""
+    names = list(classifier_names)
+    for rec in recs:
+        used = set(np.unique(rec.labels[rec.labels != UNLABELLED]).tolist())
+        for code in sorted(used):
+            name = rec.label_names[code]
+            if name not in names:
+                print(f"warning: {rec.path} labels frames {name!r}, which the classifier doesn't know")
+                names.append(name)
+    return names
+
+
+def truth_codes(rec, codes):
+    # A recording's label codes, translated to our names
+    remap = np.array([codes.get(name, 0) for name in rec.label_names], dtype=np.int64)
+    labels = np.asarray(rec.labels).astype(np.int64)
+    return np.where(labels == UNLABELLED, UNLABELLED, remap[np.maximum(labels, 0)])
+
+
+def replay(engine, rec, codes):
+    """Feed one recording frame by frame. Returns (predicted codes, per-call ns).
+    codes: label name -> code in the confusion matrix."""
+    n = len(rec)
+    predicted = np.zeros(n, dtype=np.int64)
+    latency_ns = np.zeros(n, dtype=np.int64)
+    has_hand = rec.has_hand
+    landmarks = rec.landmarks
+    timestamps = rec.timestamps
+    clock = time.perf_counter_ns
+
+    for i in range(n):
+        t0 = clock()
+        gesture = None
+        if has_hand[i]:
+            gesture, _ = engine.detect_gesture(np.asarray(landmarks[i]))
+        engine.execute_action(gesture, now=float(timestamps[i]))
+        if engine.motions_enabled:
+            # Frame size isn't recorded, so swipe distances are only approximate
+            engine.execute_motion(np.asarray(landmarks[i]) if has_hand[i] else None, float(timestamps[i]))
+        latency_ns[i] = clock() - t0
+        predicted[i] = codes.get(gesture, 0)
+    return predicted, latency_ns
+
+
+def confusion_matrix(truth, predicted, n_labels):
+    mask = truth != UNLABELLED
+    flat = truth[mask].astype(np.int64) * n_labels + predicted[mask]
+    return np.bincount(flat, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+
+
+def print_confusion(matrix, names):
+    names = [n or "None" for n in names]
+    width = max(len(n) for n in names) + 2
+    print("truth \\ pred".ljust(width) + "".join(n[:10].rjust(11) for n in names))
+    for name, row in zip(names, matrix):
+        print(name.ljust(width) + "".join(str(v).rjust(11) for v in row))
+    total = matrix.sum()
+    if total:
+        print(f"accuracy: {np.trace(matrix) / total:.2%} of {total} labelled frames")
+
+
+def print_latency(label, latency_ns, frames, elapsed):
+    us = latency_ns / 1000.0
+    p50, p90, p99 = np.percentile(us, [50, 90, 99])
+    print(f"{label}: {frames} frames in {elapsed:.3f}s -> {frames / elapsed:,.0f} frames/s")
+    print(f"  per call (us): p50 {p50:.1f}  p90 {p90:.1f}  p99 {p99:.1f}  max {us.max():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--repeat", type=int, default=1, help="replay each recording N times")
+    parser.add_argument("--batch-only", action="store_true", help="skip the per-frame GestureEngine replay")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="gesture definitions (default: gestures.json)")
+    parser.add_argument("--knn", metavar="TEMPLATES", help="replay through a k-NN template file instead of the rules")
+    args = parser.parse_args()
+
+    knn = None
+    if args.knn:
+        from gesture_knn import KnnClassifier
+        knn = KnnClassifier.load(args.knn)
+        if not len(knn):
+            print(f"warning: {args.knn} has no templates, every frame classifies as no gesture")
+    # Same gestures the engine loads (built-ins when the file is missing)
+    classifier = knn if knn is not None else ConfigWatcher(args.config).config.table
+
+    recs = [LandmarkRecording(p) for p in args.recordings]
+    names = label_names(classifier.names, recs)
+    codes = {name: code for code, name in enumerate(names) if name}
+    n_labels = len(names)
+    matrix = np.zeros((n_labels, n_labels), dtype=np.int64)
+
+    # 1. Bulk: whole recordings through the vectorized classifier
+    frames, elapsed = 0, 0.0
+    for rec in recs:
+        pts = np.asarray(rec.landmarks[rec.has_hand])
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            classifier.classify(pts)
+            elapsed += time.perf_counter() - t0
+            frames += len(pts)
+    if frames:
+        print(f"batch classify: {frames} hands in {elapsed:.3f}s -> {frames / elapsed:,.0f} hands/s")
+
+    if args.batch_only:
+        return
+
+    # 2. Frame by frame, the way the live loop calls it
+    from gesture_engine import FakeKeyboard
+    keyboard = FakeKeyboard()
+    engine = make_engine(keyboard, args.config, knn)
+    all_latency, frames, elapsed = [], 0, 0.0
+    for rec in recs:
+        for _ in range(args.repeat):
+            # Nothing carries over from the previous recording
+            engine.state_machine.reset()
+            engine.motion.reset(new_clock=True)
+            t0 = time.perf_counter()
+            predicted, latency_ns = replay(engine, rec, codes)
+            elapsed += time.perf_counter() - t0
+            frames += len(rec)
+            all_latency.append(latency_ns)
+        matrix += confusion_matrix(truth_codes(rec, codes), predicted, n_labels)
+
+    if not frames:
+        print("no frames to replay")
+        return
+    print_latency("replay", np.concatenate(all_latency), frames, elapsed)
+    engine.dispatcher.stop()
+    print(engine.dispatcher.format_stats())
+    print("key presses:", {str(k): v for k, v in keyboard.presses.items()})
+    print()
+    print_confusion(matrix, names)
+
+
+if __name__ == "__main__":
+    main()
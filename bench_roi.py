@@ -0,0 +1,104 @@
+"""Compare full-frame vs. ROI-cropped MediaPipe inference on the same video.
+
+    python bench_roi.py hands.mp4 [--max-side 320] [--padding 0.5]
+    python bench_roi.py 0            # webcam, Ctrl+C to stop
+
+Both paths see every frame. Full-frame results are the reference for the
+ROI path's landmark error and gesture agreement.
+"""
+import argparse
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from bench_replay import print_confusion
+from gesture_features import GESTURE_NAMES, classify, landmarks_to_array
+from hand_inference import HANDS_OPTIONS
+from hand_roi import HandROI, to_full_frame
+
+
+def make_hands():
+    # Same settings as the engine
+    return mp.solutions.hands.Hands(**HANDS_OPTIONS)
+
+
+def infer(hands, img_bgr):
+    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    rgb.flags.writeable = False
+    result = hands.process(rgb)
+    if not result.multi_hand_landmarks:
+        return None
+    return landmarks_to_array(result.multi_hand_landmarks[0].landmark)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="video file, or a camera index")
+    parser.add_argument("--max-side", type=int, default=320)
+    parser.add_argument("--padding", type=float, default=0.5)
+    parser.add_argument("--frames", type=int, default=0, help="stop after N frames (0 = whole video)")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(int(args.source) if args.source.isdigit() else args.source)
+    roi = HandROI(padding=args.padding, max_side=args.max_side)
+    full_ms, roi_ms, err_px = [], [], []
+    full_hits = roi_hits = roi_crops = frames = 0
+    n_labels = len(GESTURE_NAMES)
+    matrix = np.zeros((n_labels, n_labels), dtype=np.int64)
+
+    with make_hands() as hands_full, make_hands() as hands_roi:
+        try:
+            while not args.frames or frames < args.frames:
+                ok, img = cap.read()
+                if not ok:
+                    break
+                img = cv2.flip(img, 1)
+                h, w = img.shape[:2]
+                frames += 1
+
+                t0 = time.perf_counter()
+                ref = infer(hands_full, img)
+                t1 = time.perf_counter()
+                inp, region = roi.crop(img)
+                pts = infer(hands_roi, inp)
+                if pts is not None:
+                    pts = to_full_frame(pts[np.newaxis], region, w, h)[0]
+                roi.update(pts, w, h)
+                t2 = time.perf_counter()
+
+                full_ms.append((t1 - t0) * 1000)
+                roi_ms.append((t2 - t1) * 1000)
+                roi_crops += region is not None
+                full_hits += ref is not None
+                roi_hits += pts is not None
+
+                ref_code = classify(ref) if ref is not None else 0
+                roi_code = classify(pts) if pts is not None else 0
+                matrix[ref_code, roi_code] += 1
+                if ref is not None and pts is not None:
+                    d = (ref[:, :2] - pts[:, :2]) * (w, h)
+                    err_px.append(float(np.sqrt((d * d).sum(axis=1)).mean()))
+        except KeyboardInterrupt:
+            pass
+
+    cap.release()
+    if not frames:
+        print("no frames read")
+        return
+
+    print(f"{frames} frames, {roi_crops} ({roi_crops / frames:.0%}) ran on a crop")
+    for name, ms in (("full", full_ms), ("roi", roi_ms)):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"  {name:<5} cvtColor+process ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  mean {np.mean(ms):.2f}")
+    print(f"  speedup (mean): {np.mean(full_ms) / np.mean(roi_ms):.2f}x")
+    print(f"  hand detected: full {full_hits}  roi {roi_hits}")
+    if err_px:
+        print(f"  landmark error vs full (px): mean {np.mean(err_px):.2f}  p95 {np.percentile(err_px, 95):.2f}")
+    print()
+    print("gesture agreement (rows = full frame, cols = roi)")
+    print_confusion(matrix, GESTURE_NAMES)
+
+
+if __name__ == "__main__":
+    main()
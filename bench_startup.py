@@ -0,0 +1,124 @@
+"""Cold start: how long until the window shows, and until the camera runs.
+
+    python bench_startup.py                 # 5 fresh processes, offscreen, generated frames
+    python bench_startup.py --runs 10 --webcam
+
+Every run is a new interpreter, so imports are really cold (as far as the
+OS file cache allows). Times are from process launch:
+
+    interpreter   python itself is up
+    qt import     PyQt6 imported
+    gui import    gui.py imported (must not pull in cv2 / MediaPipe)
+    app           QApplication created
+    window        MainWindow constructed (HomePage only)
+    first paint   the window painted for the first time
+    worker ready  cv2 / MediaPipe / pynput imported in the background, camera thread started
+    first frame   the first frame went through recognition
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+STAGES = ["interpreter", "qt import", "gui import", "app", "window", "first paint", "worker ready", "first frame"]
+
+
+class NullKeyboard:
+    def press(self, key):
+        pass
+
+    def release(self, key):
+        pass
+
+
+def child(launched, webcam, timeout):
+    marks = {"interpreter": time.time()}
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+    marks["qt import"] = time.time()
+    import gui
+    marks["gui import"] = time.time()
+    heavy = sorted(m for m in ("cv2", "mediapipe", "pynput") if m in sys.modules)
+    app = QApplication(sys.argv[:1])
+    marks["app"] = time.time()
+
+    # Generated frames as an open_source() spec: the camera thread opens it,
+    # so nothing here imports cv2 before the window is up
+    source = None if webcam else "synthetic"
+    window = gui.MainWindow(source=source, keyboard=None if webcam else NullKeyboard())
+    marks["window"] = time.time()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and "first paint" not in marks:
+                marks["first paint"] = time.time()
+            return False
+
+    watcher = FirstPaint()
+    window.installEventFilter(watcher)
+
+    def on_ready():
+        marks["worker ready"] = time.time()
+        window.worker.status_signal.connect(on_status)
+
+    def on_status(status):
+        if status == "running" and "first frame" not in marks:
+            marks["first frame"] = time.time()
+            app.quit()
+        elif status.startswith("error"):
+            app.quit()
+
+    window.startup.ready.connect(on_ready)
+    window.show()
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec()
+    window.close()
+
+    out = {stage: (t - launched) * 1000 for stage, t in marks.items()}
+    out["heavy imported by gui"] = heavy
+    print(json.dumps(out))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--webcam", action="store_true", help="real camera instead of generated frames")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.webcam, args.timeout)
+        return
+
+    results = []
+    for _ in range(args.runs):
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", repr(time.time()), "--timeout", str(args.timeout)]
+        if args.webcam:
+            cmd.append("--webcam")
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if not lines:
+            print(proc.stdout + proc.stderr)
+            sys.exit(f"run failed with status {proc.returncode}")
+        results.append(json.loads(lines[-1]))
+
+    heavy = results[0].pop("heavy imported by gui")
+    print(f"{'stage':<14} {'median ms':>10} {'min ms':>8} {'max ms':>8} {'step ms':>8}")
+    prev = 0.0
+    for stage in STAGES:
+        times = sorted(r[stage] for r in results if stage in r)
+        if not times:
+            print(f"{stage:<14} {'-':>10}   (didn't happen within {args.timeout:.0f}s)")
+            continue
+        median = times[len(times) // 2]
+        print(f"{stage:<14} {median:>10.0f} {times[0]:>8.0f} {times[-1]:>8.0f} {median - prev:>8.0f}")
+        prev = median
+    print(f"heavy modules imported by gui.py itself: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from pipeline_trace import TRACER
+
+
+class LatestFrameMailbox:
+    """Single-slot handoff between the capture thread and the processing loop.
+
+    A new frame always replaces the one waiting in the slot, so the consumer
+    never works through a backlog: it gets the newest frame or nothing.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            if self._item is not None:
+                # The consumer never saw the previous frame -> it is stale now
+                self.dropped += 1
+            self.put_count += 1
+            self._item = (frame, timestamp, self.put_count)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Returns (frame, timestamp, frame_id) or None on timeout / close."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class CaptureThread(threading.Thread):
+    """Producer: reads the camera as fast as it delivers and posts to a mailbox.
+
+    cap is anything with read() -> (ok, frame): a cv2.VideoCapture or a
+    frame_sources.FrameSource. The mailbox is closed when the source ends.
+    """
+
+    def __init__(self, cap, mailbox):
+        super().__init__(name="GesturlyCapture", daemon=True)
+        self.cap = cap
+        self.mailbox = mailbox
+        self._is_running = True
+
+    def run(self):
+        while self._is_running:
+            t = TRACER.now()
+            success, img = self.cap.read()
+            if not success:
+                if getattr(self.cap, "ended", False):
+                    break
+                time.sleep(0.1)
+                continue
+            # Frame ids are assigned by the mailbox, this one will be the next
+            TRACER.lap("read", self.mailbox.put_count + 1, t)
+            self.mailbox.put(img, time.perf_counter())
+        self.mailbox.close()
+
+    def stop(self):
+        self._is_running = False
+        if self.is_alive():
+            self.join()
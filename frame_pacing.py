@@ -0,0 +1,135 @@
+"""Deadline-based frame pacing for the recognition loop.
+
+Frame k is due at start + k * period. After each frame the loop sleeps
+only for what is left until the next deadline, so a slow frame doesn't
+get a fixed sleep stacked on top of it. A frame that runs past the next
+deadline is an overrun: the missed slots are skipped (not caught up in a
+burst) and the schedule restarts from now. With a live source the frame
+taken after the wait is always the newest one, so skipped slots are
+frames that are simply never looked at.
+"""
+import collections
+import time
+
+import numpy as np
+
+
+class FramePacer:
+    """Paces a loop to `fps` frames per second, or to one frame per
+    `budget_ms` milliseconds. fps=None and budget_ms=None: no pacing,
+    only the stats.
+
+        pacer.begin()        # frame starts (after the frame was taken)
+        ...                  # process it
+        pacer.wait()         # sleep until the next one is due
+    """
+
+    def __init__(self, fps=None, budget_ms=None, samples=240, clock=time.perf_counter, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.period = 0.0
+        self.set_target(fps, budget_ms)
+        self._starts = collections.deque(maxlen=samples)  # frame start times
+        self._busy = collections.deque(maxlen=samples)    # processing seconds per frame
+        self._start = None
+        self._deadline = None
+        self.frames = 0
+        self.overruns = 0
+        self.skipped = 0      # deadlines missed and not caught up
+        self.slept = 0.0      # seconds spent waiting in total
+
+    def set_target(self, fps=None, budget_ms=None):
+        if fps and budget_ms:
+            raise ValueError("give a frame rate or a latency budget, not both")
+        if fps:
+            self.period = 1.0 / fps
+        elif budget_ms:
+            self.period = budget_ms / 1000.0
+        else:
+            self.period = 0.0
+        self._deadline = None  # new schedule from the next frame on
+
+    @property
+    def target_fps(self):
+        return 1.0 / self.period if self.period else None
+
+    def begin(self):
+        now = self.clock()
+        self._start = now
+        self._starts.append(now)
+        self.frames += 1
+        # First frame, or the frame itself came late (slow camera, source
+        # stalled): schedule from its arrival, that's not our overrun
+        if self._deadline is None or now - self._deadline > self.period / 2:
+            self._deadline = now
+        return now
+
+    def wait(self):
+        """End of the frame: sleep until the next deadline. Returns the
+        seconds slept (0 when the frame overran)."""
+        now = self.clock()
+        if self._start is not None:
+            self._busy.append(now - self._start)
+            self._start = None
+        if not self.period:
+            return 0.0
+        if self._deadline is None:
+            self._deadline = now  # target changed during this frame
+
+        self._deadline += self.period
+        delay = self._deadline - now
+        if delay >= 0:
+            if delay:
+                self.sleep(delay)
+                self.slept += delay
+            return delay
+
+        # Overran: drop the slots we missed and start over from now
+        self.overruns += 1
+        self.skipped += int(-delay // self.period)
+        self._deadline = now
+        return 0.0
+
+    def reset(self):
+        self._deadline = None
+        self._start = None
+
+    # --- stats -----------------------------------------------------------
+
+    @property
+    def fps(self):
+        """Frames per second actually achieved, over the recent frames."""
+        if len(self._starts) < 2:
+            return 0.0
+        elapsed = self._starts[-1] - self._starts[0]
+        return (len(self._starts) - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def jitter_ms(self):
+        """Standard deviation of the time between frame starts."""
+        if len(self._starts) < 3:
+            return 0.0
+        return float(np.std(np.diff(np.array(self._starts)))) * 1000
+
+    @property
+    def busy_ms(self):
+        """Mean processing time per frame, over the recent frames."""
+        if not self._busy:
+            return 0.0
+        return sum(self._busy) / len(self._busy) * 1000
+
+    def stats(self):
+        return {
+            "target_fps": self.target_fps,
+            "fps": self.fps,
+            "jitter_ms": self.jitter_ms,
+            "busy_ms": self.busy_ms,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "frames": self.frames,
+        }
+
+    def format_stats(self):
+        target = f"{self.target_fps:.0f}" if self.period else "unpaced"
+        return (f"pacing ({target}): {self.fps:.1f} fps, jitter {self.jitter_ms:.2f} ms, "
+                f"busy {self.busy_ms:.1f} ms/frame, {self.overruns} overruns, {self.skipped} frames skipped")
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+from PyQt6.QtGui import QImage
+
+
+class FramePool:
+    """A fixed number of preallocated uint8 image buffers, reused frame after frame.
+
+    acquire() hands out a free buffer of the requested shape, or None when
+    the consumer still holds all of them (the caller should skip that frame
+    rather than wait). When the requested shape changes (the preview widget
+    was resized) the pool is refilled with new buffers; old-shape buffers
+    coming back are simply dropped.
+    """
+
+    def __init__(self, count=3):
+        self.count = count
+        self.shape = None
+        self._free = []
+        self._lock = threading.Lock()
+        self.exhausted = 0  # acquire() calls that found no free buffer
+
+    def acquire(self, shape):
+        with self._lock:
+            if shape != self.shape:
+                self.shape = shape
+                self._free = [np.empty(shape, dtype=np.uint8) for _ in range(self.count)]
+            if not self._free:
+                self.exhausted += 1
+                return None
+            return self._free.pop()
+
+    def release(self, buf):
+        with self._lock:
+            if buf.shape == self.shape and len(self._free) < self.count:
+                self._free.append(buf)
+
+
+class PreviewFrame:
+    """A pooled RGB buffer wrapped in a QImage (no copy) on its way to the GUI.
+
+    The receiver must call release() once it has converted the image
+    (QPixmap.fromImage copies), which returns the buffer to the pool.
+    A frame that is dropped without release() is returned when collected.
+    overlay: what to draw over it (gesture_worker.HandOverlay), or None.
+    """
+
+    def __init__(self, pool, buf, frame_id, overlay=None):
+        self.frame_id = frame_id
+        self.overlay = overlay
+        self._pool = pool
+        self._buf = buf
+        h, w, ch = buf.shape
+        self.image = QImage(buf.data, w, h, ch * w, QImage.Format.Format_RGB888)
+
+    def release(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            self.image = None
+            pool.release(self._buf)
+            self._buf = None
+
+    def __del__(self):
+        self.release()
@@ -0,0 +1,184 @@
+import os
+import time
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """Where frames come from. Same read() contract as cv2.VideoCapture.
+
+    read() -> (True, BGR uint8 frame) or (False, None).
+    live:  frames arrive on their own clock and stale ones may be dropped
+           (camera, real-time file playback). Non-live sources are pulled
+           as fast as the pipeline can go and every frame is processed.
+    ended: no frame will ever come again (end of file / directory).
+    """
+
+    live = False
+    ended = False
+    fps = 0.0
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class WebcamSource(FrameSource):
+    live = True
+
+    def __init__(self, index=0, width=None, height=None):
+        self.cap = cv2.VideoCapture(index)
+        # Reduce resolution for speed if needed (Optional)
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # OPTIMIZATION: Keep the driver queue as short as the backend allows,
+        # the capture thread drains it continuously anyway
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """A video file. realtime=True plays it at its own frame rate, like a camera."""
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.path = path
+        self.loop = loop
+        self.live = realtime
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"can't open video {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next = None
+
+    def read(self):
+        ok, img = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.cap.read()
+        if not ok:
+            self.ended = True
+            return False, None
+        if self.live:
+            _pace(self)
+        return True, img
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path, loop=False, fps=30.0):
+        self.files = sorted(
+            os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(self.EXTENSIONS)
+        )
+        if not self.files:
+            raise IOError(f"no images in {path}")
+        self.path = path
+        self.loop = loop
+        self.fps = fps
+        self._i = 0
+
+    def read(self):
+        # Skips unreadable files, but a full pass of them (looping or not)
+        # would otherwise never return
+        misses = 0
+        while True:
+            if self._i >= len(self.files):
+                if not self.loop:
+                    self.ended = True
+                    return False, None
+                self._i = 0
+            img = cv2.imread(self.files[self._i])
+            self._i += 1
+            if img is not None:
+                return True, img
+            misses += 1
+            if misses >= len(self.files):
+                raise IOError(f"no readable images in {self.path}")
+
+
+class SyntheticSource(FrameSource):
+    """In-memory generated frames, no I/O and no decoding.
+
+    A bright disc moves across a gradient so consecutive frames differ.
+    Frames are pre-rendered once and cycled, so read() costs nothing and
+    benchmarks measure the pipeline, not the generator.
+    frames=None runs forever.
+    """
+
+    def __init__(self, width=640, height=480, frames=None, period=60, fps=30.0, realtime=False):
+        self.frames = frames
+        self.fps = fps
+        self.live = realtime
+        self._count = 0
+        self._next = None
+        xs = np.linspace(0, 255, width, dtype=np.float32)
+        base = np.empty((height, width, 3), dtype=np.uint8)
+        base[..., 0] = xs.astype(np.uint8)
+        base[..., 1] = 64
+        base[..., 2] = 255 - base[..., 0]
+        self._cycle = []
+        for i in range(period):
+            img = base.copy()
+            cx = int(width * (0.2 + 0.6 * i / period))
+            cv2.circle(img, (cx, height // 2), min(width, height) // 8, (220, 200, 255), -1)
+            self._cycle.append(img)
+
+    def read(self):
+        if self.frames is not None and self._count >= self.frames:
+            self.ended = True
+            return False, None
+        img = self._cycle[self._count % len(self._cycle)]
+        self._count += 1
+        if self.live:
+            _pace(self)
+        return True, img
+
+
+def _pace(source):
+    # Sleep until this frame is due, like a camera would deliver it
+    now = time.perf_counter()
+    if source._next is None or now - source._next > 1.0:
+        source._next = now
+    delay = source._next - now
+    if delay > 0:
+        time.sleep(delay)
+    source._next += 1.0 / source.fps
+
+
+def open_source(spec, loop=False, realtime=False):
+    """Build a source from a command line style spec.
+
+    "0", "1"...           webcam index
+    "synthetic[:WxH]"     generated frames
+    a directory           image sequence
+    anything else         video file (or stream URL)
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return WebcamSource(int(spec))
+    if spec.startswith("synthetic"):
+        width, height = 640, 480
+        if ":" in spec:
+            width, height = (int(v) for v in spec.split(":", 1)[1].lower().split("x"))
+        return SyntheticSource(width, height, realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop, realtime=realtime)
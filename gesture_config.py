@@ -0,0 +1,144 @@
+"""gestures.json: what the gestures look like and what they do.
+
+    {"gestures": [
+        {"name": "OK", "color": [255, 0, 255],
+         "fingers": {"middle": true, "ring": true, "pinky": true},
+         "where": [{"dist": ["thumb_tip", "index_tip"], "lt": 0.05}],
+         "action": "media_play_pause",
+         "rule": {"confirm_n": 3, "window_frames": 5, "window_ms": 250, "cooldown": 1.5}},
+        ...
+    ],
+    "motions": [
+        {"name": "Swipe Right", "action": "media_next"},
+        ...
+    ]}
+
+The list is in priority order. fingers / where are compiled into a
+GestureTable (see gesture_features.py). action is a pynput Key name (or a
+single character); gestures without one are recognised but do nothing.
+rule takes GestureRule's arguments (see gesture_state.py).
+motions map the swipes and circles of gesture_motion.py to actions; they
+fire once per movement and need no rule.
+
+ConfigWatcher reloads the file when it changes, so gestures can be edited
+while the camera runs.
+"""
+import json
+import os
+import time
+
+from action_dispatch import is_key_name
+from gesture_features import BUILTIN_GESTURES, DEFAULT_TABLE, GestureTable
+from gesture_motion import MOTION_NAMES
+from gesture_state import GestureRule, default_rules
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+
+DEFAULT_ACTIONS = {
+    "Thumbs Up": "media_volume_up",
+    "Thumbs Down": "media_volume_down",
+    "OK": "media_play_pause",
+    "Peace": "media_next",
+}
+
+# Swipes change track, circles seek (arrow keys, in the focused player)
+DEFAULT_MOTION_ACTIONS = {
+    "Swipe Right": "media_next",
+    "Swipe Left": "media_previous",
+    "Circle CW": "right",
+    "Circle CCW": "left",
+}
+
+
+class GestureConfig:
+    def __init__(self, table, actions, rules, motion_actions):
+        self.table = table                    # GestureTable
+        self.actions = actions                # gesture name -> key name
+        self.rules = rules                    # gesture name -> GestureRule
+        self.motion_actions = motion_actions  # motion name -> key name
+
+
+def builtin_config():
+    return GestureConfig(DEFAULT_TABLE, dict(DEFAULT_ACTIONS), default_rules(), dict(DEFAULT_MOTION_ACTIONS))
+
+
+def parse_config(data):
+    """GestureConfig from the parsed JSON. Raises ValueError if it's invalid."""
+    try:
+        gestures = data.get("gestures", BUILTIN_GESTURES)
+        table = GestureTable(gestures)
+        actions = {}
+        rules = {}
+        for g in gestures:
+            action = g.get("action")
+            if not action:
+                continue
+            if not is_key_name(action):
+                raise ValueError(f"{g['name']}: unknown key {action!r}, expected a pynput Key name or one character")
+            actions[g["name"]] = action
+            rules[g["name"]] = GestureRule(**g.get("rule", {}))
+
+        motion_actions = {}
+        for m in data.get("motions", []):
+            if m["name"] not in MOTION_NAMES:
+                raise ValueError(f"unknown motion {m['name']!r}, expected one of {MOTION_NAMES}")
+            if m.get("action"):
+                if not is_key_name(m["action"]):
+                    raise ValueError(f"{m['name']}: unknown key {m['action']!r}, "
+                                     f"expected a pynput Key name or one character")
+                motion_actions[m["name"]] = m["action"]
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"invalid gesture config: {e!r}") from e
+    return GestureConfig(table, actions, rules, motion_actions)
+
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        return parse_config(json.load(f))
+
+
+class ConfigWatcher:
+    """Keeps a GestureConfig in sync with its file.
+
+    poll() is cheap enough to call every frame: the file is only stat()ed
+    every `interval` seconds and only re-read when its mtime changed. A
+    missing file means the built-in gestures; a broken one keeps the last
+    good config.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self._mtime = None
+        self._next_check = 0.0
+        self.config = builtin_config()
+        self.poll()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    def poll(self, now=None):
+        """Returns the new GestureConfig if the file changed, else None."""
+        now = time.monotonic() if now is None else now
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        if mtime is None:
+            self.config = builtin_config()
+        else:
+            try:
+                self.config = load_config(self.path)
+            except (OSError, ValueError) as e:
+                print(f"ConfigWatcher: keeping previous gestures, {self.path}: {e}")
+                return None
+        self.reloads += 1
+        return self.config
@@ -0,0 +1,418 @@
+"""Gestures for other local programs, over a Unix domain socket, no GUI.
+
+    python gesture_daemon.py                          # webcam, $XDG_RUNTIME_DIR/gesturly.sock
+    python gesture_daemon.py 0 --actions keys         # and press media keys like the GUI does
+    python gesture_daemon.py clip.mp4 --loop --socket /tmp/gesturly.sock
+
+Runs the same GestureEngine as the GUI's camera thread, without Qt or any
+preview rendering. Clients connect to the socket and read newline-delimited
+JSON, one message per line:
+
+    {"type": "hello", "version": 1, "topics": ["events"]}
+    {"type": "change", "label": "Thumbs Up", "previous": "No Hand", "confidence": 0.8, ...}
+    {"type": "dropped", "count": 12}
+
+A client picks what it gets by sending a line of its own, at any time:
+
+    {"topics": ["events", "snapshots", "landmarks"]}
+
+    events     gesture state changes and fired actions ("change" / "action",
+               the fields of gesture_events.GestureEvent), the default
+    snapshots  the latest state every --snapshot-interval seconds ("snapshot")
+    landmarks  every frame with hands, and once when they're gone
+               ("landmarks": frame_id, frame_time, handedness, hands as
+               21 [x, y, z] per hand, normalized to the frame)
+
+Every client has its own bounded queue. One that doesn't keep up loses its
+oldest messages and is told how many ("dropped"), the camera loop never
+waits for a client. Times are the daemon's time.perf_counter(), "emitted"
+minus a client's own perf_counter() on arrival is the delivery latency.
+
+    from gesture_daemon import subscribe
+    for msg in subscribe("/tmp/gesturly.sock"):
+        print(msg["type"], msg.get("label"))
+"""
+import argparse
+import collections
+import json
+import os
+import selectors
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from action_dispatch import KeyboardBackend, NullBackend, SocketBackend
+from frame_sources import open_source
+from gesture_config import DEFAULT_CONFIG_PATH
+from gesture_engine import GestureEngine
+from hand_inference import INFERENCE_MODES
+
+PROTOCOL_VERSION = 1
+TOPICS = ("events", "snapshots", "landmarks")
+DEFAULT_TOPICS = ("events",)
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), "gesturly.sock")
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+def event_message(event):
+    # A GestureEvent with its kind as the message type
+    msg = {"type": event.kind, **event._asdict()}
+    del msg["kind"]
+    return msg
+
+
+class Client:
+    """One connected subscriber. queue and dropped belong to the daemon's
+    lock, the rest to its I/O thread."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.topics = frozenset(DEFAULT_TOPICS)
+        self.queue = collections.deque()  # encoded lines
+        self.dropped = 0                  # since the last "dropped" message
+        self.out = b""                    # taken from the queue, not sent yet
+        self.inbuf = b""
+        self.writing = False              # socket full, waiting for EVENT_WRITE
+        # Stats
+        self.sent = 0
+        self.dropped_total = 0
+
+
+class GestureDaemon:
+    """Publishes an engine's gesture events to Unix socket clients.
+
+    Publishing (from the engine's thread) encodes a message once and appends
+    it to each interested client's queue. One I/O thread accepts clients,
+    reads their topic requests and writes queued messages without blocking.
+
+    queue_size:        messages per client before the oldest are dropped
+    snapshot_interval: seconds between "snapshot" messages
+    """
+
+    def __init__(self, engine, path=DEFAULT_SOCKET, queue_size=256, snapshot_interval=0.1):
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+        self.engine = engine
+        self.path = path
+        self.queue_size = queue_size
+        self.snapshot_interval = snapshot_interval
+
+        self._lock = threading.Lock()
+        self._clients = ()  # replaced, never mutated
+        self._wanted = dict.fromkeys(TOPICS, 0)  # clients per topic, publishing skips unwanted topics
+        self._had_hands = False
+        self._unsent = False
+        self._wake_pending = True  # the I/O thread is busy and will look at the queues anyway
+        self._running = False
+        self._thread = None
+
+        # Stats
+        self.published = dict.fromkeys(TOPICS, 0)
+        self.publish_ns = 0   # engine thread time spent queueing messages
+        self.wake_ns = 0      # and waking the I/O thread up
+        self.clients_seen = 0
+        self.dropped = 0
+
+    # --- lifecycle -----------------------------------------------------
+
+    def start(self):
+        self._listen()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.server, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(target=self._io_loop, name="GestureDaemon", daemon=True)
+        self._thread.start()
+
+        self.engine.events.subscribe(self._on_event)
+        self.engine.events.subscribe_snapshots(self._on_snapshot, self.snapshot_interval)
+        self.engine.on_frame.append(self._on_frame)
+
+    def _listen(self):
+        if os.path.exists(self.path):
+            # A socket file left by a daemon that died, unless one still answers
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"another gesture daemon is listening on {self.path}")
+            finally:
+                probe.close()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)  # this user's programs only
+        self.server.listen(64)
+        self.server.setblocking(False)
+
+    def stop(self):
+        if not self._running:
+            return
+        self.engine.events.unsubscribe(self._on_event)
+        self.engine.events.unsubscribe(self._on_snapshot)
+        if self._on_frame in self.engine.on_frame:
+            self.engine.on_frame.remove(self._on_frame)
+        self._running = False
+        self._wake_w.send(b"\0")
+        self._thread.join(timeout=2.0)
+        for client in self._clients:
+            client.sock.close()
+        self._clients = ()
+        self._selector.close()
+        self.server.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    # --- publishing (engine thread) -----------------------------------
+
+    def _on_event(self, event):
+        if self._wanted["events"]:
+            self._publish("events", encode(event_message(event)))
+
+    def _on_snapshot(self, event):
+        if self._wanted["snapshots"]:
+            self._publish("snapshots", encode(event_message(event)))
+
+    def _on_frame(self, res):
+        has_hands = res.pts is not None
+        if self._wanted["landmarks"] and (has_hands or self._had_hands):
+            hands = np.round(res.pts, 4).tolist() if has_hands else []
+            self._publish("landmarks", encode({"type": "landmarks", "frame_id": res.frame_id,
+                                               "frame_time": res.frame_time, "handedness": res.handedness,
+                                               "hands": hands}))
+        self._had_hands = has_hands
+
+        # OPTIMIZATION: One wake-up per frame, after everything this frame
+        # published (events come from an earlier on_frame callback). The
+        # engine thread gets the GIL back only once the I/O thread's burst
+        # of sends is done, so this is left for right before the pacer's
+        # sleep rather than paid per message.
+        if self._unsent:
+            self._unsent = False
+            t = time.perf_counter_ns()
+            self._wake()
+            self.wake_ns += time.perf_counter_ns() - t
+
+    def _publish(self, topic, line):
+        # OPTIMIZATION: Encoded once for every client; a full queue drops its
+        # oldest message instead of making the camera loop wait
+        t = time.perf_counter_ns()
+        with self._lock:
+            for client in self._clients:
+                if topic in client.topics:
+                    if len(client.queue) >= self.queue_size:
+                        client.queue.popleft()
+                        client.dropped += 1
+                        client.dropped_total += 1
+                        self.dropped += 1
+                    client.queue.append(line)
+            self.published[topic] += 1
+        self._unsent = True
+        self.publish_ns += time.perf_counter_ns() - t
+
+    def _wake(self):
+        # Only when the I/O thread is about to sleep, it looks at every
+        # queue before it does
+        if not self._wake_pending:
+            self._wake_pending = True
+            try:
+                self._wake_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass
+
+    # --- I/O thread -----------------------------------------------------
+
+    def _io_loop(self):
+        while self._running:
+            # Cleared before looking at the queues: a message published from
+            # here on wakes select() up, one published earlier is seen now
+            self._wake_pending = False
+            for client in self._clients:
+                if client.queue and not client.writing:
+                    self._write(client)
+            events = self._selector.select()
+            self._wake_pending = True
+            for key, mask in events:
+                sock = key.fileobj
+                if sock is self.server:
+                    self._accept()
+                elif sock is self._wake_r:
+                    self._drain_wake()
+                else:
+                    client = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(client)
+                    if mask & selectors.EVENT_WRITE and client in self._clients:
+                        self._write(client)
+
+    def _accept(self):
+        try:
+            sock, _ = self.server.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        client = Client(sock)
+        client.queue.append(encode({"type": "hello", "version": PROTOCOL_VERSION, "topics": sorted(client.topics)}))
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        with self._lock:
+            self._clients = self._clients + (client,)
+            self._count_topics()
+        self.clients_seen += 1
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _set_writing(self, client, writing):
+        client.writing = writing
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+        self._selector.modify(client.sock, events, client)
+
+    def _read(self, client):
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._remove(client)
+            return
+        client.inbuf += data
+        *lines, client.inbuf = client.inbuf.split(b"\n")
+        for line in lines:
+            try:
+                topics = json.loads(line)["topics"]
+            except (ValueError, KeyError, TypeError):
+                continue  # not a request we know, ignore it
+            client.topics = frozenset(t for t in topics if t in TOPICS)
+            with self._lock:
+                self._count_topics()
+        if len(client.inbuf) > 65536:
+            self._remove(client)  # not talking our protocol
+
+    def _write(self, client):
+        # Straight to the socket, only a full one waits for EVENT_WRITE
+        if not client.out:
+            with self._lock:
+                lines = list(client.queue)
+                client.queue.clear()
+                dropped, client.dropped = client.dropped, 0
+            if dropped:
+                lines.insert(0, encode({"type": "dropped", "count": dropped}))
+            client.out = b"".join(lines)
+            client.sent += len(lines)
+        if client.out:
+            try:
+                n = client.sock.send(client.out)
+            except BlockingIOError:
+                n = 0
+            except OSError:
+                self._remove(client)
+                return
+            client.out = client.out[n:]
+        full = bool(client.out)
+        if full != client.writing:
+            self._set_writing(client, full)
+
+    def _remove(self, client):
+        self._selector.unregister(client.sock)
+        client.sock.close()
+        with self._lock:
+            self._clients = tuple(c for c in self._clients if c is not client)
+            self._count_topics()
+
+    def _count_topics(self):
+        # Under the lock
+        self._wanted = {topic: sum(topic in c.topics for c in self._clients) for topic in TOPICS}
+
+    # --- stats -----------------------------------------------------------
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def format_stats(self):
+        published = ", ".join(f"{n} {topic}" for topic, n in self.published.items())
+        messages = sum(self.published.values())
+        per_msg = self.publish_ns / messages / 1000 if messages else 0.0
+        return (f"daemon: {self.clients} clients ({self.clients_seen} seen), published {published} "
+                f"({per_msg:.1f} us each to queue, {self.wake_ns / 1e6:.0f} ms waking up in all), "
+                f"{self.dropped} dropped for slow clients")
+
+
+def subscribe(path=DEFAULT_SOCKET, topics=DEFAULT_TOPICS):
+    """Connect to a running daemon and yield its messages as dicts."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    try:
+        sock.sendall(encode({"topics": list(topics)}))
+        with sock.makefile("rb") as lines:
+            for line in lines:
+                yield json.loads(line)
+    finally:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default="0",
+                        help="webcam index (default 0), video file, image directory or synthetic[:WxH]")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--queue", type=int, default=256, help="messages queued per client before dropping")
+    parser.add_argument("--snapshot-interval", type=float, default=0.1, help="seconds between snapshots")
+    parser.add_argument("--loop", action="store_true", help="loop files / image directories")
+    parser.add_argument("--fps", type=float, default=30.0, help="pace the loop to at most this many frames per second")
+    parser.add_argument("--quality-budget-ms", type=float, default=20.0,
+                        help="switch quality tiers at runtime to keep inference under this many ms (0 = fixed)")
+    parser.add_argument("--inference", choices=INFERENCE_MODES, default="thread")
+    parser.add_argument("--actions", choices=("none", "keys", "socket"), default="none",
+                        help="perform no actions (default), send real media keys, or send them to a UDP port")
+    parser.add_argument("--port", type=int, default=47800, help="UDP port for --actions socket")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="gesture definitions (default: gestures.json)")
+    parser.add_argument("--knn", metavar="TEMPLATES", help="classify with a k-NN template file instead of the rules")
+    args = parser.parse_args()
+
+    if args.actions == "keys":
+        actions = KeyboardBackend()
+    elif args.actions == "socket":
+        actions = SocketBackend(("127.0.0.1", args.port))
+    else:
+        actions = NullBackend()
+    source = open_source(args.source, loop=args.loop, realtime=True)
+    engine = GestureEngine(source, actions=actions, inference=args.inference, config_path=args.config,
+                           knn_templates=args.knn, fps=args.fps, quality_budget_ms=args.quality_budget_ms or None)
+    daemon = GestureDaemon(engine, args.socket, queue_size=args.queue, snapshot_interval=args.snapshot_interval)
+    daemon.start()
+    signal.signal(signal.SIGTERM, lambda *_: engine.stop())
+    print(f"gesture daemon listening on {args.socket}", flush=True)
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        engine.stop()
+    finally:
+        daemon.stop()
+    print(f"{engine.frames_processed} frames, {engine.events.published} gesture events")
+    print(daemon.format_stats())
+
+
+if __name__ == "__main__":
+    main()
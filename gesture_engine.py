@@ -0,0 +1,506 @@
+"""Capture -> inference -> classify -> act, without any Qt.
+
+GestureWorker (the GUI's camera thread) is one consumer of this engine;
+it can just as well run headless on a video, an image directory or
+generated frames to benchmark the whole pipeline:
+
+    python gesture_engine.py synthetic --frames 2000
+    python gesture_engine.py clip.mp4 --trace
+    python gesture_engine.py 0 --actions keys     # webcam, real media keys
+    python gesture_engine.py synthetic --fps 30   # paced like the GUI
+    python gesture_engine.py clip.mp4 --inference both   # in-thread vs. out-of-process MediaPipe
+"""
+import argparse
+import threading
+import time
+import cv2
+import numpy as np
+
+from action_dispatch import ActionDispatcher, KeyboardBackend, RecordingBackend, SocketBackend
+from frame_capture import LatestFrameMailbox, CaptureThread
+from frame_pacing import FramePacer
+from frame_sources import WebcamSource, open_source
+from gesture_config import DEFAULT_CONFIG_PATH, ConfigWatcher
+from gesture_events import GestureEventStream
+from gesture_features import landmarks_to_array
+from gesture_motion import MotionDetector
+from gesture_state import GestureStateMachine
+from hand_inference import INFERENCE_MODES, make_inference
+from hand_roi import HandROI, to_full_frame
+from landmark_recording import LandmarkRecorder
+from pipeline_trace import TRACER
+from quality_governor import QualityGovernor, tier_options
+
+
+class FakeKeyboard:
+    """Drop-in for pynput's Controller that only counts key presses."""
+
+    def __init__(self):
+        self.presses = {}
+
+    def press(self, key):
+        self.presses[key] = self.presses.get(key, 0) + 1
+
+    def release(self, key):
+        pass
+
+
+class FrameResult:
+    """Everything the engine knows about one processed frame."""
+
+    def __init__(self, frame_id, frame_time, image, pts, handedness, region, gesture, color, fired, motion,
+                 infer_ms, model_ms):
+        self.frame_id = frame_id
+        self.frame_time = frame_time  # capture time, perf_counter clock (source time for non-live sources)
+        self.image = image            # flipped BGR frame, only valid during the callback
+        self.pts = pts                # (N, 21, 3) full-frame normalized landmarks or None
+        self.handedness = handedness  # "Left" / "Right" per hand
+        self.region = region          # ROI the inference ran on, None = full frame
+        self.gesture = gesture        # per-frame classification or None
+        self.color = color
+        self.fired = fired            # gesture or motion confirmed on this frame (action sent) or None
+        self.motion = motion          # swipe / circle completed on this frame or None
+        self.infer_ms = infer_ms      # cvtColor + hands.process, as seen by the pipeline
+        self.model_ms = model_ms      # hands.process alone (the rest is IPC in process mode)
+
+    @property
+    def gesture_text(self):
+        if self.motion:
+            return self.motion
+        if self.gesture:
+            return self.gesture
+        return "No Hand"
+
+
+class GestureEngine:
+    """The recognition pipeline. run() blocks until stop() or the source ends.
+
+    on_frame callbacks are called from the run() thread with a FrameResult
+    after every frame. Consumers that only care about the gesture state
+    subscribe to events instead (see gesture_events.py): it publishes only
+    when the state changes.
+    """
+
+    def __init__(self, source=None, keyboard=None, use_roi=True, inference="thread", config_path=DEFAULT_CONFIG_PATH,
+                 knn_templates=None, actions=None, rate_limits=None, fps=None, budget_ms=None,
+                 quality_budget_ms=None, resolve_keys=None):
+        self.source = source
+        self._is_running = True
+
+        # Actions are performed by their own thread (see action_dispatch.py), a
+        # slow input stack never holds up frames. actions: an ActionBackend;
+        # default is key presses through keyboard (anything with
+        # press()/release(), pynput when None; resolve_keys=True for a pynput
+        # controller passed in, see KeyboardBackend).
+        # Started by run(), so an engine that never runs leaks no thread
+        self.dispatcher = ActionDispatcher(actions or KeyboardBackend(keyboard, resolve_keys), rate_limits=rate_limits)
+
+        # Learned classifier instead of the rule table (see gesture_knn.py):
+        # a KnnClassifier or the path of a saved template file
+        if isinstance(knn_templates, str):
+            from gesture_knn import KnnClassifier
+            knn_templates = KnnClassifier.load(knn_templates)
+        if knn_templates is not None and not len(knn_templates):
+            print("GestureEngine: the k-NN classifier has no templates, no gesture will be recognized")
+        self.knn = knn_templates
+
+        # Swipes and circles from the wrist / fingertip trajectory (see gesture_motion.py)
+        self.motion = MotionDetector()
+
+        # Gestures, their actions and when they count as "performed", from
+        # gestures.json (see gesture_config.py), reloaded when it changes
+        self.config_watcher = ConfigWatcher(config_path)
+        self._apply_config(self.config_watcher.config)
+
+        # OPTIMIZATION: Run inference on a crop around the tracked hand
+        self.use_roi = use_roi
+        self.roi = HandROI()
+
+        # Quality tiers (input scale, model, tracking confidence): fixed, or
+        # picked at runtime to keep inference within quality_budget_ms
+        # (see quality_governor.py). on_quality_change callbacks get the new
+        # QualityTier, from the run() thread.
+        self.governor = QualityGovernor(quality_budget_ms) if quality_budget_ms else None
+        self.on_quality_change = []
+        self.input_scale = 1.0
+
+        # MediaPipe in this thread or in its own process (see hand_inference.py)
+        self.inference = make_inference(inference)
+        self._pending_inference = None
+        if self.governor:
+            self._apply_tier(self.governor.tier)
+
+        # OPTIMIZATION: Gesture state changes as typed events, published only
+        # on transitions (and fired actions), not every frame
+        self.events = GestureEventStream()
+        self.on_frame = [self.events.update]
+        # Frame pacing: at most fps frames per second (or one per budget_ms),
+        # sleeping only for what's left of each frame's slot (see frame_pacing.py)
+        self.pacer = FramePacer(fps, budget_ms)
+
+        # Landmark recording (see landmark_recording.py)
+        self._recorder = None
+        self._recorder_label = None
+        self._recorder_lock = threading.Lock()
+
+        # Stats
+        self.frames_processed = 0
+        self.hands_seen = 0
+        self.actions_fired = 0
+        # Frames the capture thread replaced before we got to them
+        self.dropped_frames = 0
+        self._buffers = {}
+
+    # --- configuration -----------------------------------------------
+
+    def _apply_config(self, config):
+        self.key_map = {**config.actions, **config.motion_actions}  # gesture -> action
+        self.gestures = self.knn if self.knn is not None else config.table
+        # Colors come from the config, also for k-NN labels
+        colors = dict(zip(config.table.names, config.table.colors))
+        self._gesture_list = [(name, colors.get(name, (255, 255, 255))) for name in self.gestures.names]
+        self.gesture_rules = config.rules
+        self.state_machine = GestureStateMachine(self.gesture_rules)
+        # Nothing to look for if no motion does anything
+        self.motions_enabled = bool(config.motion_actions)
+        self.motion.reset()
+
+    def _reload_config(self):
+        config = self.config_watcher.poll()
+        if config is None:
+            return
+        self._apply_config(config)
+        print(f"GestureEngine: reloaded {len(config.table.names) - 1} gestures")
+
+    # --- classification / actions ------------------------------------
+
+    def detect_gesture(self, lm):
+        # lm = MediaPipe landmark list, a (21, 3) array or a (N, 21, 3) batch
+        if not isinstance(lm, np.ndarray):
+            lm = landmarks_to_array(lm)
+
+        codes = self.gestures.classify(lm)
+        if lm.ndim == 3:
+            return [self._gesture_list[c] for c in codes]
+        return self._gesture_list[codes]
+
+    def execute_action(self, gesture, now=None):
+        # Call once per frame, also with gesture=None, so the state machine
+        # sees the hand go away. now: frame time (perf_counter clock),
+        # replays pass the recorded timestamps.
+        current_time = time.perf_counter() if now is None else now
+        fired = self.state_machine.update(gesture, current_time)
+        if fired is None or fired not in self.key_map:
+            return None
+        self._press(fired)
+        return fired
+
+    def execute_motion(self, pts, now, aspect=1.0):
+        # Call once per frame with the one tracked hand, or pts=None when
+        # there isn't exactly one. Returns the motion that fired, if any.
+        if pts is None:
+            self.motion.reset()
+            return None
+        motion = self.motion.update(pts, now, aspect)
+        if motion in self.key_map:
+            self._press(motion)
+        return motion
+
+    def _press(self, gesture):
+        self.dispatcher.submit(self.key_map[gesture])
+        self.actions_fired += 1
+
+    # --- recording ----------------------------------------------------
+
+    def start_recording(self, path, label=None):
+        # label: ground truth for every frame (operator performs a known gesture).
+        # Without one the classifier output is stored and can be corrected later.
+        with self._recorder_lock:
+            if self._recorder:
+                self._recorder.close()
+            self._recorder = LandmarkRecorder(path, info={"source": "GestureEngine"},
+                                              label_names=self.gestures.names)
+            self._recorder_label = label
+
+    def stop_recording(self):
+        with self._recorder_lock:
+            if self._recorder:
+                self._recorder.close()
+                self._recorder = None
+
+    def _record_frame(self, timestamp, pts, handedness, gesture):
+        with self._recorder_lock:
+            if not self._recorder:
+                return
+            label = self._recorder_label if self._recorder_label is not None else gesture
+            if pts is None:
+                self._recorder.add(timestamp, label=label)
+            else:
+                self._recorder.add(timestamp, pts[0], handedness[0] if handedness else None, label)
+
+    # --- inference mode -----------------------------------------------
+
+    def set_inference_mode(self, mode):
+        # Safe from any thread, the switch happens between two frames
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"unknown inference mode {mode!r}")
+        self._pending_inference = mode
+
+    def _switch_inference(self):
+        mode, self._pending_inference = self._pending_inference, None
+        if mode == self.inference.mode:
+            return
+        new = make_inference(mode, self.inference.options)
+        new.start()
+        self.inference.close()
+        self.inference = new
+        # The new model has no tracking state yet
+        self.roi.reset()
+
+    @property
+    def quality_tier(self):
+        return self.governor.tier if self.governor else None
+
+    def _apply_tier(self, tier):
+        self.input_scale = tier.input_scale
+        self.roi.max_side = tier.roi_max_side
+        self.inference.set_options(tier_options(tier))
+
+    def _govern(self, result):
+        # Frames the model never saw (process restarting) say nothing about its speed
+        if not result.model_ms:
+            return
+        tier = self.governor.update(result.infer_ms)
+        if tier is not None:
+            self._apply_tier(tier)
+            for callback in self.on_quality_change:
+                callback(tier)
+
+    # --- pipeline -----------------------------------------------------
+
+    def _buffer(self, name, shape):
+        # Reusable scratch buffer, reallocated only when the frame size changes
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def _frames(self):
+        """Yields (img, frame_time, frame_id) until the source ends or stop()."""
+        if self.source.live:
+            # Capture runs in its own thread and only ever hands over the newest
+            # frame, so a slow hands.process() can't make us act on old frames
+            mailbox = LatestFrameMailbox()
+            capture = CaptureThread(self.source, mailbox)
+            capture.start()
+            try:
+                while self._is_running:
+                    item = mailbox.get(timeout=0.1)
+                    if item is None:
+                        if mailbox.closed:
+                            return
+                        continue
+                    self.dropped_frames = mailbox.dropped
+                    yield item
+            finally:
+                capture.stop()
+        else:
+            # Files, image directories, generated frames: process every frame,
+            # as fast as we can, on the source's own timeline
+            frame_id = 0
+            fps = self.source.fps or 30.0
+            while self._is_running:
+                t = TRACER.now()
+                success, img = self.source.read()
+                if not success:
+                    return
+                frame_id += 1
+                TRACER.lap("read", frame_id, t)
+                yield img, frame_id / fps, frame_id
+
+    def run(self, max_frames=None):
+        if self.source is None:
+            self.source = WebcamSource(0)
+        elif isinstance(self.source, str):
+            # A spec ("synthetic", "clip.mp4"...), opened here in the run()
+            # thread and played like a camera
+            self.source = open_source(self.source, realtime=True)
+
+        self.dispatcher.start()
+        try:
+            self.inference.start()
+            for img, frame_time, frame_id in self._frames():
+                self.pacer.begin()
+                if self._pending_inference:
+                    self._switch_inference()
+                self._reload_config()
+                result = self.process_frame(img, frame_time, frame_id)
+                for callback in self.on_frame:
+                    callback(result)
+                if self.governor:
+                    self._govern(result)
+                if max_frames and self.frames_processed >= max_frames:
+                    break
+                self.pacer.wait()
+        finally:
+            self.inference.close()
+            self.dispatcher.stop()
+            self._is_running = False
+            self.source.release()
+
+    def process_frame(self, img, frame_time, frame_id):
+        # Tracing: each lap() records the stage that just finished
+        # (no-ops returning 0 when tracing is off)
+        t = TRACER.now()
+        if t and self.source.live:
+            # How long the frame waited in the mailbox
+            queued_ns = int(frame_time * 1e9)
+            TRACER.record("mailbox_wait", frame_id, queued_ns, t - queued_ns)
+
+        # 1. Flip (into a reused buffer)
+        img = cv2.flip(img, 1, dst=self._buffer("flip", img.shape))
+        t = TRACER.lap("flip", frame_id, t)
+
+        # 2. ROI: only the area around last frame's hand goes to MediaPipe
+        frame_h, frame_w = img.shape[:2]
+        inp, region = self.roi.crop(img) if self.use_roi else (img, None)
+        if region is None and self.input_scale < 1.0:
+            # Lower quality tier: detect on a downscaled frame (landmarks are
+            # normalized, so they need no mapping back)
+            size = (max(1, round(frame_w * self.input_scale)), max(1, round(frame_h * self.input_scale)))
+            inp = cv2.resize(img, size, dst=self._buffer("scaled", (size[1], size[0], 3)),
+                             interpolation=cv2.INTER_AREA)
+        t = TRACER.lap("roi_crop", frame_id, t)
+
+        # 3. Color Conversion (of the inference input only), straight into
+        # the inference input buffer (shared memory in process mode)
+        infer_start = time.perf_counter()
+        inp_rgb = cv2.cvtColor(inp, cv2.COLOR_BGR2RGB, dst=self.inference.input_buffer(inp.shape))
+        t = TRACER.lap("cvtColor", frame_id, t)
+
+        out = self.inference.process(inp_rgb)
+        infer_ms = (time.perf_counter() - infer_start) * 1000
+        t = TRACER.lap("hands.process", frame_id, t)
+
+        color = (100, 100, 100)
+        pts = None
+        gesture = None
+
+        if out.pts is not None:
+            # OPTIMIZATION: Every hand arrives as one array, classify them in one batch
+            pts = to_full_frame(out.pts, region, frame_w, frame_h)
+            self.hands_seen += 1
+            for detected_gesture, detected_color in self.detect_gesture(pts):
+                if detected_gesture:
+                    color = detected_color
+                    gesture = detected_gesture
+
+        # Next frame's crop (tracking lost -> full frame again)
+        if self.use_roi:
+            self.roi.update(pts[0] if pts is not None and len(pts) == 1 else None, frame_w, frame_h)
+
+        fired = self.execute_action(gesture, now=frame_time)
+
+        # Motion gestures, on top of the static pose
+        motion = None
+        if self.motions_enabled:
+            one_hand = pts[0] if pts is not None and len(pts) == 1 else None
+            motion = self.execute_motion(one_hand, frame_time, frame_w / frame_h)
+            if motion in self.key_map:
+                fired = motion
+
+        if self._recorder:
+            self._record_frame(frame_time, pts, out.handedness, gesture)
+        TRACER.lap("classify", frame_id, t)
+
+        self.frames_processed += 1
+        return FrameResult(frame_id, frame_time, img, pts, out.handedness, region, gesture, color, fired, motion,
+                           infer_ms, out.model_ms)
+
+    def stop(self):
+        self._is_running = False
+        self.stop_recording()
+
+
+def run_once(args, inference):
+    source = open_source(args.source, loop=args.loop, realtime=args.realtime)
+    max_frames = args.frames or (1000 if args.source.startswith("synthetic") else None)
+    if args.actions == "keys":
+        actions = KeyboardBackend()
+    elif args.actions == "socket":
+        actions = SocketBackend(("127.0.0.1", args.port))
+    else:
+        actions = RecordingBackend()
+    engine = GestureEngine(source, actions=actions, use_roi=not args.no_roi, inference=inference,
+                           config_path=args.config, knn_templates=args.knn, fps=args.fps, budget_ms=args.budget_ms,
+                           quality_budget_ms=args.quality_budget_ms)
+    infer_ms, model_ms = [], []
+
+    def collect(res):
+        infer_ms.append(res.infer_ms)
+        model_ms.append(res.model_ms)
+
+    engine.on_frame.append(collect)
+    started = time.perf_counter()
+    try:
+        engine.run(max_frames=max_frames)
+    except KeyboardInterrupt:
+        engine.stop()
+    elapsed = time.perf_counter() - started
+
+    n = engine.frames_processed
+    print(f"[{inference}] {n} frames in {elapsed:.2f}s -> {n / elapsed if elapsed else 0:.1f} fps"
+          f" ({elapsed * 1000 / n if n else 0:.2f} ms/frame)")
+    print(f"  hand in {engine.hands_seen} frames, {engine.actions_fired} actions fired, "
+          f"{engine.dropped_frames} frames dropped")
+    if n:
+        p50, p95, p99 = np.percentile(infer_ms, [50, 95, 99])
+        print(f"  cvtColor+inference ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}"
+              f"  (model alone p50 {np.percentile(model_ms, 50):.2f})")
+    print("  " + engine.pacer.format_stats())
+    print(f"  gesture events: {engine.events.published} published for {engine.events.frames} frames")
+    if engine.governor:
+        print("  " + engine.governor.format_stats())
+        for _, name, p90 in engine.governor.history:
+            print(f"    -> {name} (p90 was {p90:.1f} ms)")
+    print("  " + engine.dispatcher.format_stats())
+    if inference == "process":
+        print(f"  inference process restarts: {engine.inference.restarts}, frames skipped: {engine.inference.skipped}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default="synthetic",
+                        help="webcam index, video file, image directory or synthetic[:WxH] (default)")
+    parser.add_argument("--frames", type=int, default=0, help="stop after N frames (default: 1000 for synthetic)")
+    parser.add_argument("--loop", action="store_true", help="loop files / image directories")
+    parser.add_argument("--realtime", action="store_true", help="play files at their frame rate, like a camera")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--fps", type=float, help="pace the loop to at most this many frames per second")
+    pacing.add_argument("--budget-ms", type=float, help="pace the loop to one frame per this many ms")
+    parser.add_argument("--quality-budget-ms", type=float,
+                        help="switch quality tiers at runtime to keep inference under this many ms")
+    parser.add_argument("--no-roi", action="store_true", help="always run inference on the full frame")
+    parser.add_argument("--inference", choices=INFERENCE_MODES + ("both",), default="thread",
+                        help="run MediaPipe in this thread, in a child process, or both one after the other")
+    parser.add_argument("--actions", choices=("record", "keys", "socket"), default="record",
+                        help="record actions only (default), send real media keys, or send them to a UDP port")
+    parser.add_argument("--port", type=int, default=47800, help="UDP port for --actions socket")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="gesture definitions (default: gestures.json)")
+    parser.add_argument("--knn", metavar="TEMPLATES", help="classify with a k-NN template file instead of the rules")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace and print per-stage percentiles")
+    args = parser.parse_args()
+
+    if args.trace:
+        TRACER.enable()
+    modes = INFERENCE_MODES if args.inference == "both" else (args.inference,)
+    for mode in modes:
+        run_once(args, mode)
+
+    if args.trace:
+        TRACER.dump(args.trace)
+        print(TRACER.format_summary())
+
+
+if __name__ == "__main__":
+    main()
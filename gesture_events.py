@@ -0,0 +1,104 @@
+"""Gesture state as a stream of typed events, published only when it changes.
+
+The engine produces a FrameResult per frame, but most frames say the same
+thing as the one before ("No Hand", again). GestureEventStream turns them
+into GestureEvents and calls its subscribers only when the state changes
+(and when an action fires). Consumers that want a steady feed can ask for
+rate-limited snapshots of the latest state instead.
+
+Subscribers are plain callables, called from the engine's thread, so the
+same stream feeds Qt (GestureWorker re-emits it as a signal), the
+gesture_daemon's sockets, or a test harness.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+NO_HAND = "No Hand"
+
+# kind:        "change" (label changed), "action" (an action fired on an
+#              unchanged label, e.g. held volume repeating) or "snapshot"
+# label:       gesture or motion name, or NO_HAND
+# previous:    label before this change (same as label for the other kinds)
+# confidence:  fraction of the last few frames that had this label
+# handedness:  "Left" / "Right" of the first hand, None without hands
+# fired:       gesture or motion whose action fired on this frame, or None
+# frame_id:    frame the event comes from
+# frame_time:  that frame's capture time (perf_counter, source time for files)
+# since:       frame_time of the frame this label started on
+# emitted:     perf_counter when the event was published (emitted - frame_time = latency)
+GestureEvent = namedtuple("GestureEvent", "kind label previous confidence handedness fired frame_id frame_time "
+                                          "since emitted")
+
+
+class GestureEventStream:
+    """Feed every FrameResult to update(); subscribers hear about changes.
+
+    agreement_frames: how many recent frames the confidence looks at.
+    """
+
+    def __init__(self, agreement_frames=5):
+        self._recent = deque(maxlen=agreement_frames)
+        # Held while delivering, so a new subscriber's initial state can't
+        # arrive after (and overwrite) a concurrent change. Unchanged frames
+        # never take it.
+        self._lock = threading.RLock()
+        self._subscribers = ()
+        self._snapshots = ()    # [callback, interval, next due]
+        self.latest = None      # GestureEvent describing the current state
+        self.frames = 0
+        self.published = 0
+
+    def subscribe(self, callback):
+        """callback(GestureEvent) on every change / action. It immediately
+        gets the current state, if there is one."""
+        with self._lock:
+            self._subscribers = self._subscribers + (callback,)
+            if self.latest is not None:
+                callback(self.latest)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = tuple(c for c in self._subscribers if c != callback)
+            self._snapshots = tuple(s for s in self._snapshots if s[0] != callback)
+
+    def subscribe_snapshots(self, callback, interval=0.1):
+        """callback(GestureEvent of kind "snapshot") with the latest state,
+        at most once every interval seconds, whether it changed or not."""
+        with self._lock:
+            self._snapshots = self._snapshots + ([callback, interval, 0.0],)
+
+    def update(self, res):
+        """One frame's FrameResult (see gesture_engine.py)."""
+        self.frames += 1
+        label = res.gesture_text
+        self._recent.append(label)
+        confidence = self._recent.count(label) / len(self._recent)
+        handedness = res.handedness[0] if res.handedness else None
+        prev = self.latest
+
+        kind = None
+        if prev is None or label != prev.label:
+            kind = "change"
+        elif res.fired:
+            kind = "action"
+        if kind is not None:
+            since = res.frame_time if kind == "change" else prev.since
+            previous = prev.label if prev is not None else NO_HAND
+            event = GestureEvent(kind, label, previous, confidence, handedness, res.fired, res.frame_id,
+                                 res.frame_time, since, time.perf_counter())
+            with self._lock:
+                self.latest = event
+                self.published += 1
+                for callback in self._subscribers:
+                    callback(event)
+
+        if self._snapshots:
+            now = time.perf_counter()
+            for entry in self._snapshots:
+                if now >= entry[2]:
+                    entry[2] = now + entry[1]
+                    latest = self.latest
+                    entry[0](latest._replace(kind="snapshot", previous=latest.label, confidence=confidence,
+                                             handedness=handedness, fired=None, frame_id=res.frame_id,
+                                             frame_time=res.frame_time, emitted=now))
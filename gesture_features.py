@@ -0,0 +1,226 @@
+import numpy as np
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_MCP = 2
+THUMB_TIP = 4
+INDEX_TIP = 8
+
+# Bones of the hand skeleton, same as mediapipe's HAND_CONNECTIONS
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),          # thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),          # index
+    (5, 9), (9, 10), (10, 11), (11, 12),     # middle
+    (9, 13), (13, 14), (14, 15), (15, 16),   # ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # pinky + palm edge
+])
+
+# MediaPipe's 21 landmarks by name, for gesture definitions
+LANDMARK_NAMES = [
+    "wrist",
+    "thumb_cmc", "thumb_mcp", "thumb_ip", "thumb_tip",
+    "index_mcp", "index_pip", "index_dip", "index_tip",
+    "middle_mcp", "middle_pip", "middle_dip", "middle_tip",
+    "ring_mcp", "ring_pip", "ring_dip", "ring_tip",
+    "pinky_mcp", "pinky_pip", "pinky_dip", "pinky_tip",
+]
+LANDMARKS = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+# Bit i of a finger mask is set when FINGERS[i] is up
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+_FINGER_BITS = np.array([2, 4, 8, 16])  # index .. pinky
+
+# OPTIMIZATION: Every distance we need is a (point A - point B) pair, so we
+# gather them all with one fancy-index instead of ~10 get_dist_sq() calls.
+#   0-3: finger tips -> wrist   (Index, Middle, Ring, Pinky)
+#   4-7: finger PIPs -> wrist
+_PAIR_A = np.array([8, 12, 16, 20, 6, 10, 14, 18])
+_PAIR_B = np.array([WRIST] * 8)
+
+THUMB_UP_MARGIN = 0.05
+
+NO_GESTURE_COLOR = (128, 128, 128)
+
+# The built-in gestures, in priority order (first match wins). Same schema
+# as the "gestures" list of gestures.json, see GestureTable.
+BUILTIN_GESTURES = [
+    {"name": "Open Palm", "color": [0, 255, 0],        # Green
+     "fingers": {"thumb": True, "index": True, "middle": True, "ring": True, "pinky": True}},
+    {"name": "Thumbs Down", "color": [255, 0, 0],      # Red (fist)
+     "fingers": {"thumb": False, "index": False, "middle": False, "ring": False, "pinky": False}},
+    {"name": "Thumbs Up", "color": [255, 255, 0],      # Yellow
+     "fingers": {"thumb": True, "index": False, "middle": False, "ring": False, "pinky": False}},
+    {"name": "OK", "color": [255, 0, 255],             # Magenta
+     "fingers": {"middle": True, "ring": True, "pinky": True},
+     "where": [{"dist": ["thumb_tip", "index_tip"], "lt": 0.05}]},
+    {"name": "Peace", "color": [255, 128, 0],          # Orange
+     "fingers": {"index": True, "middle": True, "ring": False, "pinky": False}},
+]
+
+
+def landmarks_to_array(landmarks):
+    """MediaPipe landmark list -> (21, 3) float32 array of x, y, z."""
+    return np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+
+
+def finger_features(pts):
+    """Per-hand finger states for a (N, 21, 3) batch.
+
+    Returns (thumb_up, fingers_up) where fingers_up is a (N, 4) bool array
+    ordered Index, Middle, Ring, Pinky.
+    """
+    diff = pts[:, _PAIR_A] - pts[:, _PAIR_B]
+    dist_sq = np.einsum("nij,nij->ni", diff, diff)
+
+    # We only need to know if the TIP is further from wrist than the PIP
+    fingers_up = dist_sq[:, 0:4] > dist_sq[:, 4:8]
+    # Simple Y-check: Tip above knuckle (Remember: Y decreases going UP in images)
+    thumb_up = pts[:, THUMB_TIP, 1] < pts[:, THUMB_MCP, 1] - THUMB_UP_MARGIN
+    return thumb_up, fingers_up
+
+
+def finger_mask(pts):
+    """(N,) 5-bit finger masks of a (N, 21, 3) batch, bit i = FINGERS[i] is up."""
+    thumb_up, fingers_up = finger_features(pts)
+    return thumb_up.astype(np.intp) | (fingers_up @ _FINGER_BITS)
+
+
+def _finger_pattern(fingers):
+    # {"thumb": True, "ring": False, ...} -> (want, care) bit masks
+    want = care = 0
+    for finger, up in fingers.items():
+        if finger not in FINGERS:
+            raise ValueError(f"unknown finger {finger!r}, expected one of {FINGERS}")
+        bit = 1 << FINGERS.index(finger)
+        care |= bit
+        if up:
+            want |= bit
+    return want, care
+
+
+def _landmark(ref):
+    if isinstance(ref, int) and 0 <= ref < len(LANDMARK_NAMES):
+        return ref
+    if ref in LANDMARKS:
+        return LANDMARKS[ref]
+    raise ValueError(f"unknown landmark {ref!r}")
+
+
+def _predicate(spec):
+    # {"dist": [a, b], "lt": d} -> (a, b, d squared, less_than)
+    a, b = (_landmark(ref) for ref in spec["dist"])
+    if ("lt" in spec) == ("gt" in spec):
+        raise ValueError(f"distance predicate needs exactly one of lt / gt: {spec}")
+    less = "lt" in spec
+    limit = float(spec["lt"] if less else spec["gt"])
+    return a, b, limit * limit, less
+
+
+class GestureTable:
+    """Gesture definitions compiled into a lookup table.
+
+    definitions: list of dicts in priority order, first match wins:
+        name:    gesture name
+        color:   [r, g, b] for the preview
+        fingers: {"thumb": true, "index": false, ...}, fingers left out
+                 can be either up or down
+        where:   optional distance predicates (normalized units), each
+                 {"dist": ["thumb_tip", "index_tip"], "lt": 0.05} (or "gt")
+
+    Each of the 32 finger masks keeps only the gestures whose finger
+    pattern allows it, cut after the first one without predicates. Most
+    masks therefore resolve to one code straight from the table and only
+    the remaining predicates of the others are evaluated, so per-frame cost
+    doesn't grow with the number of gestures.
+    Codes index names / colors, 0 means "no gesture".
+    """
+
+    def __init__(self, definitions):
+        self.names = [None]
+        self.colors = [NO_GESTURE_COLOR]
+        compiled = []
+        for d in definitions:
+            name = d["name"]
+            if name in self.names:
+                raise ValueError(f"gesture {name!r} defined twice")
+            want, care = _finger_pattern(d.get("fingers", {}))
+            predicates = tuple(_predicate(p) for p in d.get("where", ()))
+            compiled.append((len(self.names), want, care, predicates))
+            self.names.append(name)
+            self.colors.append(tuple(d.get("color", (255, 255, 255))))
+        self.codes = {name: code for code, name in enumerate(self.names) if name}
+
+        # fast[mask]: the code, or -1 when cells[mask] has predicates to check
+        self.fast = np.zeros(32, dtype=np.intp)
+        self.cells = [()] * 32
+        for mask in range(32):
+            cell = []
+            for code, want, care, predicates in compiled:
+                if mask & care == want:
+                    cell.append((code, predicates))
+                    if not predicates:
+                        break
+            if cell and cell[0][1]:
+                self.fast[mask] = -1
+                self.cells[mask] = tuple(cell)
+            elif cell:
+                self.fast[mask] = cell[0][0]
+
+    @property
+    def gestures(self):
+        return list(zip(self.names, self.colors))
+
+    def classify(self, pts):
+        """Classify a (21, 3) hand or a (N, 21, 3) batch.
+
+        Returns a gesture code (int) for a single hand, or an (N,) int array
+        for a batch.
+        """
+        pts = np.asarray(pts, dtype=np.float32)
+        single = pts.ndim == 2
+        if single:
+            pts = pts[np.newaxis]
+
+        masks = finger_mask(pts)
+        if single:
+            code = self.fast[masks[0]]
+            if code < 0:
+                code = self._resolve(self.cells[masks[0]], pts)[0]
+            return int(code)
+
+        codes = self.fast[masks]
+        pending = codes < 0
+        if pending.any():
+            # Grouped by mask, so every predicate is evaluated once per group
+            for mask in np.unique(masks[pending]):
+                idx = np.flatnonzero(masks == mask)
+                codes[idx] = self._resolve(self.cells[mask], pts[idx])
+        return codes
+
+    @staticmethod
+    def _resolve(cell, pts):
+        codes = np.zeros(len(pts), dtype=np.intp)
+        undecided = np.ones(len(pts), dtype=bool)
+        for code, predicates in cell:
+            match = undecided.copy()
+            for a, b, limit_sq, less in predicates:
+                d = pts[:, a] - pts[:, b]
+                dist_sq = np.einsum("ni,ni->n", d, d)
+                match &= (dist_sq < limit_sq) if less else (dist_sq > limit_sq)
+            codes[match] = code
+            undecided &= ~match
+            if not undecided.any():
+                break
+        return codes
+
+
+# Gesture codes returned by classify(). 0 means "no gesture".
+DEFAULT_TABLE = GestureTable(BUILTIN_GESTURES)
+GESTURES = DEFAULT_TABLE.gestures
+GESTURE_NAMES = DEFAULT_TABLE.names
+GESTURE_CODES = DEFAULT_TABLE.codes
+
+
+def classify(pts):
+    """Classify with the built-in gestures. Look codes up in GESTURES / GESTURE_NAMES."""
+    return DEFAULT_TABLE.classify(pts)
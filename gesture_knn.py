@@ -0,0 +1,264 @@
+"""Nearest-neighbour gesture classifier trained from labelled templates.
+
+The rule table (gesture_features.py) thresholds raw image coordinates, so
+it drifts as the user moves closer to or away from the camera. This one
+compares whole hand shapes instead: landmarks are taken relative to the
+wrist and divided by the palm size, then matched against stored
+templates by k-nearest-neighbour vote.
+
+    python gesture_knn.py build recordings/*.gestrec -o templates.npz
+    python gesture_knn.py info templates.npz
+    python gesture_engine.py 0 --knn templates.npz
+
+Memory and query time are bounded: every label keeps at most
+max_per_label templates (near-duplicates are skipped, the rest reservoir
+sampled), and queries go through a KD-tree (scipy, if installed) on a
+low-dimensional PCA projection before an exact re-rank.
+"""
+import argparse
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional, brute force is fine for a few thousand templates
+    cKDTree = None
+
+from gesture_features import WRIST
+
+_MCPS = np.array([5, 9, 13, 17])
+FEATURE_DIM = 20 * 3
+
+
+def normalize_landmarks(pts):
+    """(N, 21, 3) landmarks -> (N, 60) features, wrist at the origin, palm size 1.
+
+    Scaled so the Euclidean distance between two features is the RMS
+    distance between their landmarks, in palm sizes.
+    """
+    pts = np.asarray(pts, dtype=np.float32)
+    if pts.ndim == 2:
+        pts = pts[np.newaxis]
+    rel = pts - pts[:, WRIST:WRIST + 1]
+    # Palm size: RMS wrist -> knuckle distance, the most rigid part of the hand
+    palm = np.sqrt(np.einsum("nij,nij->n", rel[:, _MCPS], rel[:, _MCPS]) / len(_MCPS))
+    rel = rel[:, 1:] / (np.maximum(palm, 1e-6)[:, None, None] * np.sqrt(20))
+    return rel.reshape(len(pts), FEATURE_DIM)
+
+
+class KnnClassifier:
+    """k-NN over labelled hand templates. Same classify() contract as GestureTable.
+
+    k:             neighbours that vote (weighted by 1 / distance)
+    max_per_label: template budget per label
+    min_spacing:   a new template closer than this (RMS palm sizes) to one
+                   of the same label is a duplicate and skipped
+    max_dist:      nearest template further than this -> no gesture
+    dims:          PCA dimensions the index searches in (None = all 60)
+    use_tree:      KD-tree when scipy is installed, False = always brute force
+    """
+
+    def __init__(self, k=5, max_per_label=500, min_spacing=0.02, max_dist=0.25, dims=12, use_tree=True, seed=0):
+        self.k = k
+        self.max_per_label = max_per_label
+        self.min_spacing = min_spacing
+        self.max_dist = max_dist
+        self.dims = dims
+        self.use_tree = use_tree and cKDTree is not None
+        self.names = [None]  # code -> label, 0 = "no gesture" templates
+        self.codes = {}
+        self._templates = {}  # code -> (max_per_label, 60) buffer
+        self._count = {}
+        self._seen = {}
+        self._rng = np.random.default_rng(seed)
+        self._index = None
+
+    def __len__(self):
+        return sum(self._count.values())
+
+    def _code(self, label):
+        if label is None:
+            return 0
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.names)
+            self.names.append(label)
+        return code
+
+    # --- templates ------------------------------------------------------
+
+    def add(self, pts, labels):
+        """Add (N, 21, 3) hands with N labels (or one (21, 3) hand and a label).
+
+        Returns how many became templates.
+        """
+        feats = normalize_landmarks(pts)
+        if isinstance(labels, str) or labels is None:
+            labels = [labels] * len(feats)
+        added = 0
+        for feat, label in zip(feats, labels):
+            added += self._add_one(feat, self._code(label))
+        if added:
+            self._index = None
+        return added
+
+    def _add_one(self, feat, code):
+        buf = self._templates.get(code)
+        if buf is None:
+            buf = self._templates[code] = np.empty((self.max_per_label, FEATURE_DIM), dtype=np.float32)
+            self._count[code] = self._seen[code] = 0
+        n = self._count[code]
+        if n:
+            d = buf[:n] - feat
+            if np.einsum("ij,ij->i", d, d).min() < self.min_spacing ** 2:
+                return 0
+        self._seen[code] += 1
+        if n < self.max_per_label:
+            buf[n] = feat
+            self._count[code] = n + 1
+            return 1
+        # Full: reservoir sampling keeps a uniform sample of everything seen
+        j = self._rng.integers(self._seen[code])
+        if j < self.max_per_label:
+            buf[j] = feat
+            return 1
+        return 0
+
+    # --- index ------------------------------------------------------------
+
+    def _build(self):
+        feats = np.concatenate([buf[:self._count[c]] for c, buf in self._templates.items()])
+        labels = np.concatenate([np.full(self._count[c], c, dtype=np.intp) for c in self._templates])
+        if self.dims and len(feats) > self.dims:
+            mean = feats.mean(axis=0)
+            _, _, vt = np.linalg.svd(feats - mean, full_matrices=False)
+            basis = vt[:self.dims].T.copy()
+        else:
+            mean = np.zeros(FEATURE_DIM, dtype=np.float32)
+            basis = np.eye(FEATURE_DIM, dtype=np.float32)
+        proj = (feats - mean) @ basis
+        tree = cKDTree(proj) if self.use_tree else None
+        self._index = (feats, labels, mean, basis, proj, np.einsum("ij,ij->i", proj, proj), tree)
+
+    def _candidates(self, q, n):
+        # n nearest templates of each projected query, approximate
+        _, _, _, _, proj, proj_sq, tree = self._index
+        if tree is not None:
+            _, idx = tree.query(q, k=n)
+            return idx.reshape(len(q), n)
+        d = proj_sq[None, :] - 2 * (q @ proj.T)
+        if n >= len(proj):
+            return np.broadcast_to(np.arange(len(proj)), d.shape)
+        return np.argpartition(d, n - 1, axis=1)[:, :n]
+
+    def classify(self, pts):
+        """Classify a (21, 3) hand or a (N, 21, 3) batch. Codes index self.names."""
+        pts = np.asarray(pts, dtype=np.float32)
+        single = pts.ndim == 2
+        if not len(self):
+            return 0 if single else np.zeros(len(pts), dtype=np.intp)
+        if self._index is None:
+            self._build()
+        feats, labels, mean, basis = self._index[:4]
+
+        x = normalize_landmarks(pts)
+        k = min(self.k, len(feats))
+        # Over-fetch in the projection, then re-rank on the exact distance
+        n = min(len(feats), 3 * k)
+        codes = np.empty(len(x), dtype=np.intp)
+        for start in range(0, len(x), 1024):
+            chunk = x[start:start + 1024]
+            cand = self._candidates((chunk - mean) @ basis, n)
+            d = feats[cand] - chunk[:, None]
+            dist = np.sqrt(np.einsum("ijk,ijk->ij", d, d))
+            order = np.argsort(dist, axis=1)[:, :k]
+            near = np.take_along_axis(dist, order, axis=1)
+            near_labels = labels[np.take_along_axis(cand, order, axis=1)]
+            weights = 1.0 / (near + 1e-3)
+            votes = np.zeros((len(chunk), len(self.names)))
+            rows = np.arange(len(chunk))
+            for j in range(k):  # one column at a time, so repeated labels add up
+                votes[rows, near_labels[:, j]] += weights[:, j]
+            out = votes.argmax(axis=1)
+            if self.max_dist is not None:
+                out[near[:, 0] > self.max_dist] = 0
+            codes[start:start + len(chunk)] = out
+        return int(codes[0]) if single else codes
+
+    # --- persistence ------------------------------------------------------
+
+    def save(self, path):
+        codes = list(self._templates)
+        np.savez_compressed(
+            path,
+            names=np.array([n or "" for n in self.names]),
+            template_codes=np.array(codes, dtype=np.intp),
+            counts=np.array([self._count[c] for c in codes], dtype=np.intp),
+            seen=np.array([self._seen[c] for c in codes], dtype=np.intp),
+            templates=np.concatenate([self._templates[c][:self._count[c]] for c in codes])
+            if codes else np.empty((0, FEATURE_DIM), np.float32),
+            params=np.array([self.k, self.max_per_label, self.min_spacing,
+                             -1 if self.max_dist is None else self.max_dist, self.dims or 0]),
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        k, max_per_label, min_spacing, max_dist, dims = data["params"].tolist()
+        knn = cls(int(k), int(max_per_label), min_spacing, None if max_dist < 0 else max_dist, int(dims) or None)
+        knn.names = [n or None for n in data["names"].tolist()]
+        knn.codes = {n: c for c, n in enumerate(knn.names) if n}
+        offset = 0
+        for code, count, seen in zip(data["template_codes"], data["counts"], data["seen"]):
+            buf = np.empty((knn.max_per_label, FEATURE_DIM), dtype=np.float32)
+            buf[:count] = data["templates"][offset:offset + count]
+            offset += count
+            knn._templates[int(code)] = buf
+            knn._count[int(code)] = int(count)
+            knn._seen[int(code)] = int(seen)
+        return knn
+
+    def summary(self):
+        lines = [f"{len(self)} templates, k={self.k}, {self.dims or FEATURE_DIM} index dims, "
+                 f"{'KD-tree' if self.use_tree else 'brute force'}"]
+        for code in sorted(self._templates):
+            lines.append(f"  {self.names[code] or 'None':<12} {self._count[code]:>5} kept of {self._seen[code]}")
+        return "\n".join(lines)
+
+
+def build_from_recordings(paths, **options):
+    """Templates from the labelled hand frames of landmark recordings."""
+    from landmark_recording import LandmarkRecording, UNLABELLED
+
+    knn = KnnClassifier(**options)
+    for path in paths:
+        rec = LandmarkRecording(path)
+        labels = np.asarray(rec.labels)
+        use = rec.has_hand & (labels != UNLABELLED)
+        names = [rec.label_names[c] for c in labels[use]]
+        knn.add(np.asarray(rec.landmarks[use]), names)
+    return knn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a template file from labelled recordings")
+    build.add_argument("recordings", nargs="+")
+    build.add_argument("-o", "--output", default="templates.npz")
+    build.add_argument("--max-per-label", type=int, default=500)
+    build.add_argument("-k", type=int, default=5)
+    info = sub.add_parser("info", help="show what a template file contains")
+    info.add_argument("templates")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        knn = build_from_recordings(args.recordings, k=args.k, max_per_label=args.max_per_label)
+        knn.save(args.output)
+        print(f"wrote {args.output}")
+    else:
+        knn = KnnClassifier.load(args.templates)
+    print(knn.summary())
+
+
+if __name__ == "__main__":
+    main()
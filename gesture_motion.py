@@ -0,0 +1,169 @@
+"""Motion gestures: swipes and circles, from the recent landmark trajectory.
+
+MotionHistory keeps the last few dozen positions of the wrist and the
+index fingertip in fixed-size ring arrays, plus running sums (path length,
+turning angle) over a few windows. Each new frame adds its step to the
+sums and subtracts the step that just left the window, so the cost per
+frame is the same whatever the window length.
+"""
+import math
+import numpy as np
+
+from gesture_features import WRIST, INDEX_TIP
+
+MOTION_POINTS = np.array([WRIST, INDEX_TIP])
+_WRIST, _TIP = 0, 1  # rows of MOTION_POINTS
+
+MOTION_NAMES = ("Swipe Left", "Swipe Right", "Swipe Up", "Swipe Down", "Circle CW", "Circle CCW")
+
+_RESUM_EVERY = 4096  # recompute the running sums now and then so float error can't build up
+
+
+class MotionHistory:
+    """Ring buffer of the last `length` positions of a few points.
+
+    windows: window lengths in steps (frames) to keep running sums for,
+    each must be shorter than length.
+    """
+
+    def __init__(self, points=len(MOTION_POINTS), length=32, windows=(12, 30), min_step=0.004):
+        if max(windows) >= length:
+            raise ValueError("windows must be shorter than the history")
+        self.length = length
+        self.min_step = min_step  # steps shorter than this don't change the heading (jitter)
+        self.pos = np.zeros((length, points, 2))
+        self.t = np.zeros(length)
+        self.step = np.zeros((length, points))   # length of the step that ended on each frame
+        self.turn = np.zeros((length, points))   # heading change on each frame
+        self.path = {w: np.zeros(points) for w in windows}
+        self.turning = {w: np.zeros(points) for w in windows}
+        self.reset()
+
+    def reset(self):
+        self.n = -1         # index of the newest frame, ever increasing
+        self.count = 0      # frames since reset
+        self.heading = np.full(self.pos.shape[1], np.nan)
+        for w in self.path:
+            self.path[w][:] = 0.0
+            self.turning[w][:] = 0.0
+
+    def push(self, xy, t):
+        """Add one frame: (points, 2) positions at time t."""
+        self.n += 1
+        i = self.n % self.length
+        step = np.zeros(len(xy))
+        turn = np.zeros(len(xy))
+        if self.count:
+            d = xy - self.pos[(self.n - 1) % self.length]
+            step = np.hypot(d[:, 0], d[:, 1])
+            moving = step > self.min_step
+            if moving.any():
+                heading = np.arctan2(d[:, 1], d[:, 0])
+                delta = heading - self.heading
+                turn = np.where(moving & ~np.isnan(delta), (delta + np.pi) % (2 * np.pi) - np.pi, 0.0)
+                self.heading = np.where(moving, heading, self.heading)
+        self.pos[i] = xy
+        self.t[i] = t
+        self.step[i] = step
+        self.turn[i] = turn
+        self.count += 1
+
+        for w in self.path:
+            self.path[w] += step
+            self.turning[w] += turn
+            if self.count > w:
+                old = (self.n - w) % self.length
+                self.path[w] -= self.step[old]
+                self.turning[w] -= self.turn[old]
+        if self.n % _RESUM_EVERY == 0:
+            self._resum()
+
+    def _resum(self):
+        for w in self.path:
+            steps = min(w, self.count - 1)
+            idx = [(self.n - k) % self.length for k in range(steps)]
+            self.path[w] = self.step[idx].sum(axis=0)
+            self.turning[w] = self.turn[idx].sum(axis=0)
+
+    def steps(self, w):
+        """Steps actually in window w (fewer right after a reset)."""
+        return min(w, self.count - 1)
+
+    def displacement(self, w, point):
+        """(dx, dy, seconds) from the start of window w to now."""
+        a, b = (self.n - self.steps(w)) % self.length, self.n % self.length
+        dx, dy = self.pos[b, point] - self.pos[a, point]
+        return dx, dy, self.t[b] - self.t[a]
+
+
+class MotionDetector:
+    """Swipes (wrist) and circles (index fingertip) from a MotionHistory.
+
+    Distances are in frame heights (x is scaled by the aspect ratio so
+    circles stay round). After a detection the history starts over, and
+    nothing fires for `cooldown` seconds.
+    """
+
+    def __init__(self, swipe_frames=12, swipe_min_dist=0.35, swipe_min_speed=0.6, swipe_straightness=0.8,
+                 circle_frames=30, circle_min_turn=1.6 * math.pi, circle_min_path=0.5, circle_max_drift=0.35,
+                 min_frames=4, cooldown=0.6):
+        self.history = MotionHistory(windows=(swipe_frames, circle_frames), length=max(swipe_frames, circle_frames) + 2)
+        self.swipe_frames = swipe_frames
+        self.swipe_min_dist = swipe_min_dist
+        self.swipe_min_speed = swipe_min_speed
+        self.swipe_straightness = swipe_straightness
+        self.circle_frames = circle_frames
+        self.circle_min_turn = circle_min_turn
+        self.circle_min_path = circle_min_path
+        self.circle_max_drift = circle_max_drift
+        self.min_frames = min_frames  # a hand that only just appeared isn't moving yet
+        self.cooldown = cooldown
+        self._quiet_until = float("-inf")
+
+    def reset(self, new_clock=False):
+        # new_clock: the timestamps start over (another recording), so does
+        # the cooldown
+        self.history.reset()
+        if new_clock:
+            self._quiet_until = float("-inf")
+
+    def update(self, pts, now, aspect=1.0):
+        """Feed one hand's (21, 3) full-frame landmarks. Returns a MOTION_NAMES entry or None."""
+        xy = pts[MOTION_POINTS, :2] * (aspect, 1.0)
+        h = self.history
+        h.push(xy, now)
+        if now < self._quiet_until or h.count < self.min_frames:
+            return None
+        motion = self._swipe() or self._circle()
+        if motion:
+            h.reset()
+            self._quiet_until = now + self.cooldown
+        return motion
+
+    def _swipe(self):
+        w = self.swipe_frames
+        dx, dy, seconds = self.history.displacement(w, _WRIST)
+        dist = math.hypot(dx, dy)
+        path = self.history.path[w][_WRIST]
+        if dist < self.swipe_min_dist or dist < self.swipe_straightness * path:
+            return None
+        if seconds <= 0 or dist / seconds < self.swipe_min_speed:
+            return None
+        # Mostly along one axis
+        if abs(dx) >= 2 * abs(dy):
+            return "Swipe Right" if dx > 0 else "Swipe Left"
+        if abs(dy) >= 2 * abs(dx):
+            return "Swipe Down" if dy > 0 else "Swipe Up"
+        return None
+
+    def _circle(self):
+        w = self.circle_frames
+        turning = self.history.turning[w][_TIP]
+        path = self.history.path[w][_TIP]
+        if abs(turning) < self.circle_min_turn or path < self.circle_min_path:
+            return None
+        dx, dy, _ = self.history.displacement(w, _TIP)
+        if math.hypot(dx, dy) > self.circle_max_drift * path:
+            return None
+        # Image y points down, so a positive angle turns clockwise on screen
+        return "Circle CW" if turning > 0 else "Circle CCW"
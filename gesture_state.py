@@ -0,0 +1,121 @@
+from collections import deque
+
+
+class GestureRule:
+    """Timing rules for one gesture.
+
+    confirm_n / window_frames / window_ms:
+        the gesture becomes active once it was classified in at least
+        confirm_n of the last window_frames frames, counting only frames
+        younger than window_ms. Worst-case confirmation latency is therefore
+        bounded both in frames and in time.
+    release_n:
+        hysteresis, an active gesture stays active while it still has at least
+        release_n votes in the window (release_n < confirm_n), so one bad frame
+        doesn't drop it and one good frame doesn't bring it back.
+    cooldown:
+        minimum seconds between two activations of this gesture.
+    repeat_delay / repeat_interval / repeat_min_interval / repeat_accel:
+        hold to repeat. If repeat_delay is set, a held gesture fires again
+        after repeat_delay, then every repeat_interval, each interval
+        multiplied by repeat_accel down to repeat_min_interval.
+    """
+
+    def __init__(self, confirm_n=3, window_frames=5, window_ms=250, release_n=1, cooldown=0.5,
+                 repeat_delay=None, repeat_interval=0.3, repeat_min_interval=0.08, repeat_accel=0.8):
+        if not 0 < release_n <= confirm_n <= window_frames:
+            raise ValueError("need 0 < release_n <= confirm_n <= window_frames")
+        self.confirm_n = confirm_n
+        self.window_frames = window_frames
+        self.window_ms = window_ms
+        self.release_n = release_n
+        self.cooldown = cooldown
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.repeat_min_interval = repeat_min_interval
+        self.repeat_accel = repeat_accel
+
+
+class GestureStateMachine:
+    """Turns a noisy per-frame label stream into discrete gesture triggers.
+
+    Feed every frame (including frames with no gesture) to update(); it
+    returns the gesture to fire on this frame, or None.
+    Gestures without a rule are tracked but never fire.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        history = max((r.window_frames for r in rules.values()), default=1)
+        self._history = deque(maxlen=history)  # (label, timestamp)
+        self.reset()
+
+    def reset(self):
+        self._history.clear()
+        self.active = None
+        self._active_since = 0.0
+        self._next_repeat = None
+        self._interval = 0.0
+        self._last_fired = {}
+
+    def _votes(self, gesture, rule, now):
+        # Walk newest -> oldest, stopping at whichever window edge comes first
+        oldest = now - rule.window_ms / 1000.0
+        votes = 0
+        for i, (label, t) in enumerate(reversed(self._history)):
+            if i >= rule.window_frames or t < oldest:
+                break
+            if label == gesture:
+                votes += 1
+        return votes
+
+    def update(self, label, now):
+        self._history.append((label, now))
+
+        # 1. Active gesture: release it once it loses its votes
+        if self.active is not None:
+            rule = self.rules[self.active]
+            if self._votes(self.active, rule, now) < rule.release_n:
+                self.active = None
+                self._next_repeat = None
+
+        # 2. Hold to repeat
+        if self.active is not None:
+            if self._next_repeat is not None and now >= self._next_repeat:
+                rule = self.rules[self.active]
+                self._interval = max(rule.repeat_min_interval, self._interval * rule.repeat_accel)
+                self._next_repeat = now + self._interval
+                self._last_fired[self.active] = now
+                return self.active
+            return None
+
+        # 3. Nothing active: does this frame's label have enough votes to enter?
+        rule = self.rules.get(label)
+        if rule is None or self._votes(label, rule, now) < rule.confirm_n:
+            return None
+
+        self.active = label
+        self._active_since = now
+        if rule.repeat_delay is not None:
+            self._interval = rule.repeat_interval / rule.repeat_accel
+            self._next_repeat = now + rule.repeat_delay
+        if now - self._last_fired.get(label, float("-inf")) < rule.cooldown:
+            return None
+        self._last_fired[label] = now
+        return label
+
+
+def default_rules():
+    """When each built-in gesture counts as "performed".
+
+    At 30 fps a 3-of-5 window confirms in ~100 ms, worst case 250 ms.
+    """
+    return {
+        # Volume: hold to repeat, speeding up the longer it's held
+        "Thumbs Up": GestureRule(confirm_n=3, window_frames=5, window_ms=250, cooldown=0.3,
+                                 repeat_delay=0.6, repeat_interval=0.3, repeat_min_interval=0.1),
+        "Thumbs Down": GestureRule(confirm_n=3, window_frames=5, window_ms=250, cooldown=0.3,
+                                   repeat_delay=0.6, repeat_interval=0.3, repeat_min_interval=0.1),
+        "OK": GestureRule(confirm_n=3, window_frames=5, window_ms=250, cooldown=1.5),
+        "Peace": GestureRule(confirm_n=3, window_frames=5, window_ms=250, cooldown=1.5),
+    }
@@ -1,177 +1,215 @@
 import cv2
-import mediapipe as mp
-import time
-from pynput.keyboard import Key, Controller
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
-from PyQt6.QtGui import QImage
+import threading
+import numpy as np
+from collections import namedtuple
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from frame_pool import FramePool, PreviewFrame
+from gesture_engine import GestureEngine
+from gesture_features import HAND_CONNECTIONS
+from pipeline_trace import TRACER, TRACE_PATH
+
+# What the GUI draws over the camera feed, a few hundred bytes per frame.
+# hands: per hand 21 (x, y) landmarks as plain lists, normalized to the full
+# frame, so they fit any display size. color: RGB of the label.
+HandOverlay = namedtuple("HandOverlay", "frame_id hands handedness label color")
+
+# Bones as (joint, joint) pairs, for drawing without numpy
+SKELETON = [tuple(bone) for bone in HAND_CONNECTIONS.tolist()]
 
 class GestureWorker(QThread):
-    change_pixmap_signal = pyqtSignal(QImage)
-    gesture_signal = pyqtSignal(str)
-    
-    def __init__(self):
+    """Runs the GestureEngine in a QThread and turns its frames into Qt signals."""
+    change_pixmap_signal = pyqtSignal(object)  # frame_pool.PreviewFrame, call .release() when done
+    landmarks_signal = pyqtSignal(object)      # HandOverlay without any image, only while connected
+    # gesture_events.GestureEvent, only when the gesture state changes (or an
+    # action fires), not every frame
+    gesture_event_signal = pyqtSignal(object)
+    gesture_state_signal = pyqtSignal(object)  # rate-limited snapshots, see watch_gesture_state()
+    quality_signal = pyqtSignal(object)  # quality_governor.QualityTier, when the governor changes it
+    status_signal = pyqtSignal(str)      # "starting" (model loading, camera opening), "running", "error: ..."
+
+    def __init__(self, source=None, keyboard=None, use_roi=True, inference="thread", knn_templates=None,
+                 target_fps=30.0, budget_ms=None, quality_budget_ms=20.0):
         super().__init__()
-        self._is_running = True
-        self.keyboard = Controller()
-        
-        # Cooldown management
-        self.last_action_time = 0
-        # Optimization: Map gestures to Keys directly for faster lookup
-        self.key_map = {
-            "Thumbs Up": (Key.media_volume_up, 0.3),
-            "Thumbs Down": (Key.media_volume_down, 0.3),
-            "OK": (Key.media_play_pause, 1.5),
-            "Peace": (Key.media_next, 1.5)
-        }
-
-    # OPTIMIZATION: Use Squared Euclidean Distance
-    # Removing math.sqrt() saves CPU cycles on every frame
-    def get_dist_sq(self, p1, p2):
-        return (p1.x - p2.x)**2 + (p1.y - p2.y)**2 + (p1.z - p2.z)**2
-
-    def is_finger_extended(self, landmarks, tip_id, pip_id):
-        # We only need to know if the TIP is further from wrist than the PIP
-        wrist = landmarks[0]
-        tip = landmarks[tip_id]
-        pip = landmarks[pip_id]
-        
-        return self.get_dist_sq(tip, wrist) > self.get_dist_sq(pip, wrist)
-
-    def is_thumb_up(self, landmarks):
-        # Simple Y-check: Tip above knuckle (Remember: Y decreases going UP in images)
-        return landmarks[4].y < landmarks[2].y - 0.05
+        # source: a frame_sources.FrameSource or open_source() spec, None = default webcam
+        # inference: "thread" or "process" (MediaPipe out of the GUI's process)
+        # knn_templates: classify with learned templates (gesture_knn.py) instead of the rules
+        # target_fps / budget_ms: frame pacing, the loop sleeps out the rest
+        # of each frame's slot (yielding to the GUI) instead of a fixed delay
+        # quality_budget_ms: inference time to hold by switching quality tiers
+        # (see quality_governor.py), None = fixed settings. 20 ms leaves room
+        # for the rest of a frame at 30 fps.
+        if budget_ms:
+            target_fps = None
+        self.engine = GestureEngine(source, keyboard=keyboard, use_roi=use_roi, inference=inference,
+                                    knn_templates=knn_templates, fps=target_fps, budget_ms=budget_ms,
+                                    quality_budget_ms=quality_budget_ms)
+        self.engine.on_frame.append(self._on_frame)
+        self.engine.events.subscribe(self.gesture_event_signal.emit)
+        # A bound signal's .emit is a new object (and unequal) on every access,
+        # keep the one we subscribe so unsubscribe() can find it
+        self._snapshot_callback = self.gesture_state_signal.emit
+        self.engine.on_quality_change.append(self.quality_signal.emit)
+        self.status = "starting"  # last status_signal, for code outside the GUI (soak_test.py)
+
+        # OPTIMIZATION: Preview frames are rendered at the widget's size into a
+        # small pool of reused buffers, only display-sized images reach the GUI
+        self.preview_pool = FramePool(count=3)
+        self.preview_size = None  # (w, h) of the preview widget, set by the GUI
+        self._buffers = {}
+
+        # OPTIMIZATION: Only annotate and emit preview frames while someone is
+        # looking at them. Recognition and actions keep running regardless.
+        self._preview_viewers = set()
+        self._preview_suspended = False  # e.g. window minimised
+        self._preview_wanted = False
+        self._viewers_lock = threading.Lock()
+
+        self._running = False  # first frame seen
+        self._had_hands = False
+
+    # The engine owns recognition state, these keep the old worker API working
+    @property
+    def dropped_frames(self):
+        return self.engine.dropped_frames
 
     def detect_gesture(self, lm):
-        # lm = landmarks list
-        
-        # Check fingers (Indices: 8=Index, 12=Middle, 16=Ring, 20=Pinky)
-        # We compare Tip vs PIP (Knuckle)
-        index_up = self.is_finger_extended(lm, 8, 6)
-        middle_up = self.is_finger_extended(lm, 12, 10)
-        ring_up = self.is_finger_extended(lm, 16, 14)
-        pinky_up = self.is_finger_extended(lm, 20, 18)
-        
-        thumb_up = self.is_thumb_up(lm)
-
-        # Optimization: Calculate this only once
-        thumb_index_dist = self.get_dist_sq(lm[4], lm[8])
-
-        # Logic Tree
-        # 1. Open Palm (All Up)
-        if index_up and middle_up and ring_up and pinky_up and thumb_up:
-            return "Open Palm", (0, 255, 0) # Green
-        
-        # 2. Thumbs Down (All Down, Thumb not up) - You might want to add specific thumb down logic here
-        # Currently this checks "Fist" effectively
-        if not index_up and not middle_up and not ring_up and not pinky_up and not thumb_up:
-            return "Thumbs Down", (255, 0, 0) # Red
-        
-        # 3. Thumbs Up (Fist + Thumb Up)
-        if thumb_up and not index_up and not middle_up and not ring_up and not pinky_up:
-            return "Thumbs Up", (255, 255, 0) # Yellow
-        
-        # 4. OK Sign (Thumb touches Index, others up)
-        # 0.0025 is 0.05 squared
-        if thumb_index_dist < 0.0025 and middle_up and ring_up and pinky_up:
-            return "OK", (255, 0, 255) # Magenta
-        
-        # 5. Peace Sign (Index & Middle Up)
-        if index_up and middle_up and not ring_up and not pinky_up:
-            return "Peace", (255, 128, 0) # Orange
-        
-        return None, (128, 128, 128)
-
-    def execute_action(self, gesture):
-        if not gesture or gesture not in self.key_map:
+        return self.engine.detect_gesture(lm)
+
+    def execute_action(self, gesture, now=None):
+        return self.engine.execute_action(gesture, now)
+
+    def start_recording(self, path, label=None):
+        self.engine.start_recording(path, label)
+
+    def stop_recording(self):
+        self.engine.stop_recording()
+
+    def set_inference_mode(self, mode):
+        self.engine.set_inference_mode(mode)
+
+    def set_frame_rate(self, fps=None, budget_ms=None):
+        self.engine.pacer.set_target(fps, budget_ms)
+
+    @property
+    def quality_tier(self):
+        return self.engine.quality_tier
+
+    def pacing_stats(self):
+        # Achieved fps, jitter, overruns... (see FramePacer.stats)
+        return self.engine.pacer.stats()
+
+    def watch_gesture_state(self, interval=0.1):
+        # Start gesture_state_signal: the latest GestureEvent (kind
+        # "snapshot") at most every interval seconds, changed or not.
+        # None stops it.
+        events = self.engine.events
+        events.unsubscribe(self._snapshot_callback)
+        if interval:
+            events.subscribe_snapshots(self._snapshot_callback, interval)
+
+    # --- preview viewers ----------------------------------------------
+
+    def add_preview_viewer(self, viewer):
+        # viewer: any hashable token, typically the widget showing the feed
+        with self._viewers_lock:
+            self._preview_viewers.add(viewer)
+            self._update_preview_wanted()
+
+    def remove_preview_viewer(self, viewer):
+        with self._viewers_lock:
+            self._preview_viewers.discard(viewer)
+            self._update_preview_wanted()
+
+    def set_preview_suspended(self, suspended):
+        with self._viewers_lock:
+            self._preview_suspended = suspended
+            self._update_preview_wanted()
+
+    def _update_preview_wanted(self):
+        # The run loop only reads this one bool per frame
+        self._preview_wanted = bool(self._preview_viewers) and not self._preview_suspended
+
+    def set_preview_size(self, w, h):
+        # Called from the GUI thread, a tuple assignment is atomic
+        self.preview_size = (max(1, w), max(1, h))
+
+    def _preview_shape(self, frame_w, frame_h):
+        # Fit the frame into the widget keeping aspect, never upscale
+        scale = 1.0
+        if self.preview_size:
+            scale = min(1.0, self.preview_size[0] / frame_w, self.preview_size[1] / frame_h)
+        return (max(1, round(frame_h * scale)), max(1, round(frame_w * scale)), 3)
+
+    def _buffer(self, name, shape):
+        # Reusable scratch buffer, reallocated only when the frame size changes
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    # --- per frame ----------------------------------------------------
+
+    def _on_frame(self, res):
+        if not self._running:
+            self._running = True
+            self._set_status("running")
+        frame_id = res.frame_id
+        t = TRACER.now()
+
+        # OPTIMIZATION: Landmarks and label go to the GUI as data, it draws
+        # them as vectors at display resolution. Nothing is drawn into frames.
+        overlay = None
+        if res.pts is not None or self._had_hands:
+            hands = [hand[:, :2].tolist() for hand in res.pts] if res.pts is not None else []
+            overlay = HandOverlay(frame_id, hands, res.handedness, res.gesture_text, res.color)
+        self._had_hands = res.pts is not None
+        # Image-less consumers: every frame with hands, once when they're gone
+        if overlay and self.receivers(self.landmarks_signal):
+            self.landmarks_signal.emit(overlay)
+
+        # Preview, at the preview widget's size, if anyone is watching
+        if not self._preview_wanted:
+            return
+        if overlay is None:
+            overlay = HandOverlay(frame_id, [], res.handedness, res.gesture_text, res.color)
+
+        img = res.image
+        frame_h, frame_w = img.shape[:2]
+        preview_shape = self._preview_shape(frame_w, frame_h)
+        preview = self.preview_pool.acquire(preview_shape)
+        if preview is None:
+            # The GUI still holds every buffer: skip this preview,
+            # recognition never waits for the display
             return
 
-        key, cooldown = self.key_map[gesture]
-        current_time = time.time()
+        ph, pw = preview_shape[:2]
+        if (ph, pw) == (frame_h, frame_w):
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=preview)
+        else:
+            small = cv2.resize(img, (pw, ph), dst=self._buffer("small", preview_shape), interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=preview)
+        t = TRACER.lap("preview_resize", frame_id, t)
 
-        if (current_time - self.last_action_time) > cooldown:
-            self.keyboard.press(key)
-            self.keyboard.release(key)
-            self.last_action_time = current_time
+        # Hand the pooled buffer to the GUI, no copy (it releases it)
+        self.change_pixmap_signal.emit(PreviewFrame(self.preview_pool, preview, frame_id, overlay))
+        TRACER.lap("emit", frame_id, t)
 
     def run(self):
-        # OPTIMIZATION: Initialize MediaPipe options outside the loop
-        mp_hands = mp.solutions.hands
-        mp_draw = mp.solutions.drawing_utils
-        
-        # Pre-define drawing specs so we don't recreate them 60 times a second
-        joint_spec = mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3)
-        conn_spec = mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2)
-        
-        # OPTIMIZATION: model_complexity=0 is the "Lite" model (Faster, slightly less accurate)
-        # perfect for real-time gesture control on laptops.
-        with mp_hands.Hands(
-            max_num_hands=1,
-            model_complexity=0, 
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        ) as hands:
-            
-            cap = cv2.VideoCapture(0)
-            # Reduce resolution for speed if needed (Optional)
-            # cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            # cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-            while self._is_running:
-                success, img = cap.read()
-                if not success:
-                    self.msleep(100)
-                    continue
-
-                # 1. Flip
-                img = cv2.flip(img, 1)
-                
-                # 2. Color Conversion
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                
-                # OPTIMIZATION: Pass by reference, flag as not writeable
-                # This drastically speeds up the internal MediaPipe processing
-                img_rgb.flags.writeable = False
-                result = hands.process(img_rgb)
-                img_rgb.flags.writeable = True # Unlock for drawing
-                
-                gesture_text = "No Hand"
-                color = (100, 100, 100)
-
-                if result.multi_hand_landmarks:
-                    for hand_lms in result.multi_hand_landmarks:
-                        # Draw landmarks
-                        mp_draw.draw_landmarks(img_rgb, hand_lms, mp_hands.HAND_CONNECTIONS, joint_spec, conn_spec)
-                        
-                        # Detect
-                        detected_gesture, detected_color = self.detect_gesture(hand_lms.landmark)
-                        
-                        if detected_gesture:
-                            gesture_text = detected_gesture
-                            color = detected_color
-                            self.execute_action(gesture_text)
-
-                # Emit Text Signal
-                self.gesture_signal.emit(gesture_text)
-
-                # Draw Text (On RGB image directly)
-                # Using a shadow (black) + text (color) for better visibility
-                cv2.putText(img_rgb, gesture_text, (12, 32), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,0), 4)
-                cv2.putText(img_rgb, gesture_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
-
-                # 3. Create QImage
-                h, w, ch = img_rgb.shape
-                bytes_per_line = ch * w
-                
-                # OPTIMIZATION: .copy() prevents memory issues when passing to GUI thread
-                qt_img = QImage(img_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888).copy()
-                
-                self.change_pixmap_signal.emit(qt_img)
-                
-                # Yield to GUI
-                self.msleep(10) 
-
-            cap.release()
+        self._set_status("starting")
+        try:
+            self.engine.run()
+        except Exception as e:
+            print(f"GestureWorker: {e!r}")
+            self._set_status(f"error: {e}")
+
+    def _set_status(self, status):
+        self.status = status
+        self.status_signal.emit(status)
 
     def stop(self):
-        self._is_running = False
-        self.wait()
\ No newline at end of file
+        self.engine.stop()
+        self.wait()
+        if TRACE_PATH:
+            TRACER.dump(TRACE_PATH)
+            print(TRACER.format_summary())
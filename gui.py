@@ -1,83 +1,86 @@
-import sys
-import subprocess
 import os
-import tempfile
+import sys
 import datetime
+import threading
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout,
     QHBoxLayout, QFrame, QStackedWidget, QGridLayout, 
-    QSlider, QComboBox, QCheckBox, QSizePolicy, QGraphicsDropShadowEffect
+    QSlider, QComboBox, QCheckBox, QSizePolicy
 )
-from PyQt6.QtGui import QFont, QPixmap, QCursor, QColor, QPainter, QPainterPath
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QFontDatabase, QPixmap, QCursor, QColor, QPainter, QImage, QPainterPath, QPen
+from PyQt6.QtCore import Qt, QTimer, QObject, QEvent, QMargins, QPoint, QPointF, QLineF, QRect, QRectF, pyqtSignal
 
-from gesture_worker import GestureWorker
+from now_playing import NowPlayingService
+from album_art_cache import AlbumArtCache
+from pipeline_trace import TRACER
+from quality_governor import describe_tier
 
 # Music Logic
-class MusicHandler:
-    """Handles all AppleScript logic in one place to avoid code duplication."""
-    
-    @staticmethod
-    def get_info():
-        # Check Spotify
-        script_spot = '''if application "Spotify" is running then
-            tell application "Spotify"
-                if player state is playing then
-                    return name of current track & "|" & artist of current track & "|spotify"
-                end if
-            end tell
-        end if
-        return ""'''
-        
-        # Check Apple Music
-        script_music = '''if application "Music" is running then
-            tell application "Music"
-                if player state is playing then
-                    return name of current track & "|" & artist of current track & "|music"
-                end if
-            end tell
-        end if
-        return ""'''
-        
-        for script in [script_spot, script_music]:
+class NowPlayingBridge(QObject):
+    """Re-emits NowPlayingService changes as a Qt signal.
+
+    The service calls from its own thread, the queued connection delivers
+    on the GUI thread, and all pages share this one subscription.
+    """
+    track_changed = pyqtSignal(object)  # track dict or None
+
+    def __init__(self, service, parent=None):
+        super().__init__(parent)
+        # Last delivered state, for pages built later on
+        self.current = None
+        self.track_changed.connect(self._remember)
+        service.subscribe(self.track_changed.emit)
+
+    def _remember(self, track):
+        self.current = track
+
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+_fonts_loaded = False
+
+
+def load_fonts():
+    """Register the bundled fonts (Urbanist, Six Caps...) with Qt, once."""
+    global _fonts_loaded
+    if _fonts_loaded:
+        return
+    _fonts_loaded = True
+    try:
+        names = sorted(os.listdir(FONTS_DIR))
+    except OSError:
+        return
+    for name in names:
+        if name.lower().endswith((".ttf", ".otf")):
+            if QFontDatabase.addApplicationFont(os.path.join(FONTS_DIR, name)) < 0:
+                print(f"couldn't load font {name}")
+
+
+class Startup(QObject):
+    """Imports the recognition stack (cv2, MediaPipe, pynput) off the GUI
+    thread, so the window can paint first. ready fires on the GUI thread."""
+    ready = pyqtSignal()
+    started = False
+
+    def start(self):
+        self.started = True
+        threading.Thread(target=self._warm_up, name="GesturlyStartup", daemon=True).start()
+
+    def _warm_up(self):
+        import gesture_worker  # noqa: F401  cv2, numpy, the engine
+        for heavy in ("mediapipe", "pynput.keyboard"):
             try:
-                result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=0.5)
-                if result.stdout.strip():
-                    parts = result.stdout.strip().split('|')
-                    if len(parts) >= 2:
-                        return {'song': parts[0], 'artist': parts[1], 'source': parts[2] if len(parts) > 2 else 'music'}
-            except: 
-                continue
-        return None
+                __import__(heavy)
+            except Exception as e:
+                # The worker reports it properly when it gets to it
+                print(f"startup: can't import {heavy}: {e}")
+        self.ready.emit()
 
-    @staticmethod
-    def get_album_art():
-        temp_file = os.path.join(tempfile.gettempdir(), "gesturly_album_art.jpg")
-        script = f'''
-        if application "Music" is running then
-            tell application "Music"
-                if player state is playing then
-                    try
-                        set artworkData to data of artwork 1 of current track
-                        set fileRef to open for access POSIX file "{temp_file}" with write permission
-                        set eof fileRef to 0
-                        write artworkData to fileRef
-                        close access fileRef
-                        return "success"
-                    on error
-                        return "error"
-                    end try
-                end if
-            end tell
-        end if
-        return "not_playing"
-        '''
-        try:
-            result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=1)
-            if "success" in result.stdout:
-                return QPixmap(temp_file)
-        except: pass
+
+def art_pixmap(track, variant):
+    # track['art'] is an AlbumArt of pre-rendered QImages (see album_art_cache.py)
+    if not track or not track.get('art'):
         return None
+    return QPixmap.fromImage(getattr(track['art'], variant))
 
 
 # CUSTOM UI COMPONENTS
@@ -90,39 +93,175 @@ class ClickableLabel(QLabel):
         if event.button() == Qt.MouseButton.LeftButton:
             self.clicked.emit()
 
+def blurred(image, radius):
+    """Cheap blur for shadows: shrink by ~radius/4 and smooth back up."""
+    factor = max(1, radius // 4)
+    smooth = Qt.TransformationMode.SmoothTransformation
+    small = image.scaled(max(1, image.width() // factor), max(1, image.height() // factor),
+                         Qt.AspectRatioMode.IgnoreAspectRatio, smooth)
+    out = small.scaled(image.width(), image.height(), Qt.AspectRatioMode.IgnoreAspectRatio, smooth)
+    out.setDevicePixelRatio(image.devicePixelRatio())
+    return out
+
+
+class ShadowLabel(QLabel):
+    """QLabel with a soft drop shadow.
+
+    OPTIMIZATION: The shadow is rendered once per text / font / size change
+    and then just drawn, where a QGraphicsDropShadowEffect re-rasterizes it
+    on every repaint. It is drawn inside the label, so the label gets
+    margins to make room for it.
+    """
+
+    def __init__(self, text="", blur=20, color=QColor(0, 0, 0, 180), offset=(0, 4), parent=None):
+        super().__init__(text, parent)
+        self.blur = blur
+        self.shadow_color = color
+        self.offset = offset
+        m = blur // 2
+        self.setContentsMargins(m, m, m, m)
+        self._shadow = None
+
+    def setText(self, text):
+        if text == self.text():
+            return
+        super().setText(text)
+        self._shadow = None
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._shadow = None
+        super().changeEvent(event)
+
+    def resizeEvent(self, event):
+        self._shadow = None
+        super().resizeEvent(event)
+
+    def _render_shadow(self):
+        dpr = self.devicePixelRatioF()
+        img = QImage(round(self.width() * dpr), round(self.height() * dpr), QImage.Format.Format_ARGB32_Premultiplied)
+        img.setDevicePixelRatio(dpr)
+        img.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(img)
+        painter.setFont(self.font())
+        painter.setPen(self.shadow_color)
+        painter.drawText(self.contentsRect().translated(*self.offset), self.alignment(), self.text())
+        painter.end()
+        return QPixmap.fromImage(blurred(img, self.blur))
+
+    def paintEvent(self, event):
+        if self._shadow is None:
+            self._shadow = self._render_shadow()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._shadow)
+        painter.end()
+        super().paintEvent(event)
+
+
 class AspectLabel(QLabel):
-    """A Label that scales images smoothly without losing aspect ratio."""
+    """A Label that scales images smoothly without losing aspect ratio.
+
+    Camera frames can come with a gesture_worker.HandOverlay, drawn on top
+    as vectors at the label's resolution: the hand skeleton (if
+    show_skeleton) and the gesture label.
+    """
+    size_changed = pyqtSignal(int, int)
+
+    BONE_COLOR = QColor(255, 0, 0)
+    JOINT_COLOR = QColor(0, 255, 0)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(1, 1)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._pixmap = None
-
-    def setPixmap(self, p):
+        self._frame_id = 0  # camera frame currently shown, for tracing
+        self._overlay = None
+        self._skeleton = None  # gesture_worker.SKELETON, once overlays arrive
+        self.show_skeleton = True
+
+    def setPixmap(self, p, frame_id=0, overlay=None):
+        if overlay is not None and self._skeleton is None:
+            # Overlays only exist once the worker is loaded
+            from gesture_worker import SKELETON
+            self._skeleton = SKELETON
         self._pixmap = p
+        self._frame_id = frame_id
+        self._overlay = overlay
         self._update_display()
 
+    def set_show_skeleton(self, show):
+        self.show_skeleton = show
+        self.update()
+
     def resizeEvent(self, event):
         self._update_display()
         super().resizeEvent(event)
+        self.size_changed.emit(self.width(), self.height())
+
+    def paintEvent(self, event):
+        t = TRACER.now()
+        super().paintEvent(event)
+        if self._overlay and self.pixmap() and not self.pixmap().isNull():
+            self._paint_overlay(self._overlay)
+        if self._frame_id:
+            TRACER.lap("gui.paint", self._frame_id, t)
+
+    def _paint_overlay(self, overlay):
+        # Where the (centered) pixmap is, landmarks are normalized to it
+        shown = self.pixmap()
+        rect = QRect(0, 0, shown.width(), shown.height())
+        rect.moveCenter(self.contentsRect().center())
+        x0, y0, w, h = rect.x(), rect.y(), rect.width(), rect.height()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if self.show_skeleton:
+            for hand in overlay.hands:
+                pts = [QPointF(x0 + x * w, y0 + y * h) for x, y in hand]
+                painter.setPen(QPen(self.BONE_COLOR, 2))
+                painter.drawLines([QLineF(pts[a], pts[b]) for a, b in self._skeleton])
+                painter.setPen(QPen(self.JOINT_COLOR, 2))
+                for p in pts:
+                    painter.drawEllipse(p, 3, 3)
+
+        # Label with a drop shadow, sized to the picture
+        font = QFont("Urbanist", 1, QFont.Weight.Bold)
+        font.setPixelSize(max(12, round(w / 640 * 22)))
+        painter.setFont(font)
+        pos = QPointF(x0 + font.pixelSize() * 0.5, y0 + font.pixelSize() * 1.4)
+        painter.setPen(QColor(0, 0, 0))
+        painter.drawText(pos + QPointF(2, 2), overlay.label)
+        painter.setPen(QColor(*overlay.color))
+        painter.drawText(pos, overlay.label)
+        painter.end()
 
     def _update_display(self):
         if self._pixmap and not self._pixmap.isNull():
-            scaled = self._pixmap.scaled(
-                self.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
+            t = TRACER.now()
+            pw, ph = self._pixmap.width(), self._pixmap.height()
+            fits = pw <= self.width() and ph <= self.height() and (pw == self.width() or ph == self.height())
+            if fits:
+                # OPTIMIZATION: Already rendered at our size (camera preview), no rescale
+                scaled = self._pixmap
+            else:
+                scaled = self._pixmap.scaled(
+                    self.size(),
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
             super().setPixmap(scaled)
+            if self._frame_id:
+                TRACER.lap("gui.update_display", self._frame_id, t)
             
     def sizeHint(self):
         return self.size()
 
 # PAGES
 class HomePage(QWidget):
-    def __init__(self, worker):
+    def __init__(self, worker, now_playing, show_skeleton=True):
         super().__init__()
-        self.worker = worker
+        self.worker = None
         self.setStyleSheet("background-color: #101010;") 
         
         layout = QHBoxLayout(self)
@@ -146,11 +285,14 @@ class HomePage(QWidget):
         intro_layout.addWidget(body)
         
         self.feed_label = AspectLabel()
-        self.feed_label.setStyleSheet("background-color: #000; border-radius: 12px; border: 1px solid #333;")
+        self.feed_label.setText("Starting camera…")
+        self.feed_label.setFont(QFont("Urbanist", 16))
+        self.feed_label.setStyleSheet("background-color: #000; color: #666; border-radius: 12px; border: 1px solid #333;")
         self.feed_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.feed_label.set_show_skeleton(show_skeleton)
         intro_layout.addWidget(self.feed_label)
         
-        self.gesture_status = QLabel("State: NO HAND")
+        self.gesture_status = QLabel("State: STARTING")
         self.gesture_status.setFont(QFont("Urbanist", 18, QFont.Weight.Bold))
         self.gesture_status.setStyleSheet("color: #F7FFE3; margin-top: 10px;")
         self.gesture_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -190,24 +332,61 @@ class HomePage(QWidget):
         layout.addWidget(playing, 4) # 40% Width
 
         # Logic
-        self.worker.change_pixmap_signal.connect(lambda img: self.feed_label.setPixmap(QPixmap.fromImage(img)))
-        self.worker.gesture_signal.connect(lambda txt: self.gesture_status.setText(f"State: {txt}"))
+        now_playing.track_changed.connect(self.update_song)
+        self.update_song(now_playing.current)
+        if worker:
+            self.set_worker(worker)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_song)
-        self.timer.start(2000)
-        self.update_song()
-
-    def update_song(self):
-        info = MusicHandler.get_info()
+    def set_worker(self, worker):
+        # The worker comes up after the window (see MainWindow._start_worker)
+        self.worker = worker
+        worker.change_pixmap_signal.connect(self.show_frame)
+        self.feed_label.size_changed.connect(worker.set_preview_size)
+        worker.set_preview_size(self.feed_label.width(), self.feed_label.height())
+        worker.gesture_event_signal.connect(self.show_gesture)
+        worker.status_signal.connect(self.show_status)
+        if self.isVisible():
+            worker.add_preview_viewer(self)
+
+    def show_gesture(self, event):
+        # gesture_events.GestureEvent, only sent when the state changes
+        if event.kind == "change":
+            self.gesture_status.setText(f"State: {event.label}")
+
+    def show_status(self, status):
+        if status == "running":
+            self.feed_label.setText("")
+        elif status.startswith("error"):
+            self.feed_label.setText("Camera unavailable")
+            self.gesture_status.setText("State: NO CAMERA")
+
+    # The camera feed is only rendered while this page is on screen
+    def showEvent(self, event):
+        if self.worker:
+            self.worker.add_preview_viewer(self)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        if self.worker:
+            self.worker.remove_preview_viewer(self)
+        super().hideEvent(event)
+
+    def show_frame(self, frame):
+        t = TRACER.now()
+        pix = QPixmap.fromImage(frame.image)
+        # fromImage copied it, the worker can reuse the buffer
+        frame.release()
+        TRACER.lap("gui.fromImage", frame.frame_id, t)
+        self.feed_label.setPixmap(pix, frame.frame_id, frame.overlay)
+
+    def update_song(self, info):
+        # Called by the now playing service only when the track changes
         if info:
             self.song_title.setText(info['song'])
             self.song_artist.setText(info['artist'])
             
             # Get Art
-            pix = None
-            if info['source'] == 'music':
-                pix = MusicHandler.get_album_art()
+            pix = art_pixmap(info, "thumbnail")
             
             if pix and not pix.isNull():
                 self.album_art_label.setPixmap(pix)
@@ -218,13 +397,28 @@ class HomePage(QWidget):
             self.album_art_label.clear()
 
 class BigPicturePage(QWidget):
-    def __init__(self, worker):
+    # Album card drop shadow (pre-rendered into the background)
+    CARD_SHADOW_BLUR = 50
+    CARD_SHADOW_OFFSET = (0, 20)
+    CARD_SHADOW_COLOR = QColor(0, 0, 0, 120)
+
+    def __init__(self, worker, now_playing):
         super().__init__()
-        self.worker = worker
         self.current_song_id = None
-        self.bg_pixmap = None
+        self.bg_art = None      # blurred album art (AlbumArt.background), any size
+        self.card_pixmap = None
+
+        # OPTIMIZATION: Everything that only changes with the song or the
+        # window size (blurred art, overlay, album card and its shadow) is
+        # composited once into this pixmap. paintEvent only copies the dirty
+        # part of it, so a label update repaints just that label's area.
+        self._background = None
+        self._background_card = None  # card rect the background was drawn for
+        self._card_shadow = None
         
         self.setStyleSheet("background-color: #101010; color: #F7FFE3;")
+        # paintEvent covers every pixel, Qt needn't clear to the stylesheet color first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
         
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(60, 60, 60, 60)
@@ -253,35 +447,29 @@ class BigPicturePage(QWidget):
         time_layout.setSpacing(0)
         time_layout.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
         
-        self.time_label = QLabel("11:11")
+        self.time_label = ShadowLabel("11:11")
         self.time_label.setStyleSheet("color: #F7FFE3; background-color: transparent;")
-        self.add_shadow(self.time_label)
         
-        self.date_label = QLabel("JAN 01")
+        self.date_label = ShadowLabel("JAN 01")
         self.date_label.setStyleSheet("color: rgba(255, 255, 255, 0.8); background-color: transparent;")
         self.date_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-        self.add_shadow(self.date_label)
         
         time_layout.addWidget(self.time_label)
         time_layout.addWidget(self.date_label)
         
-        # album
-        self.album_card = QLabel()
+        # album: only holds the card's place in the layout, the card and its
+        # shadow are part of the cached background
+        self.album_card = QWidget()
         self.album_card.setFixedSize(250, 250)
-        self.album_card.setStyleSheet("background-color: rgba(255, 255, 255, 0.1); border-radius: 20px;")
-        self.album_card.setScaledContents(True)
+        self.album_card.setStyleSheet("background-color: transparent;")
         self.album_card.hide()
-        
-        # shadwo
-        card_shadow = QGraphicsDropShadowEffect()
-        card_shadow.setBlurRadius(50)
-        card_shadow.setColor(QColor(0, 0, 0, 120))
-        card_shadow.setOffset(0, 20)
-        self.album_card.setGraphicsEffect(card_shadow)
 
         middle_layout.addWidget(time_container)
         middle_layout.addWidget(self.album_card)
         self.main_layout.addWidget(middle_container, 2)
+        # The layout moves the card (a wider clock, a resize...): see eventFilter
+        for widget in (middle_container, self.album_card):
+            widget.installEventFilter(self)
         self.main_layout.addStretch(1)
         
         # song info
@@ -289,38 +477,107 @@ class BigPicturePage(QWidget):
         self.song_info_container.setStyleSheet("background-color: transparent;")
         info_layout = QVBoxLayout(self.song_info_container)
         
-        self.song_title = QLabel("Song Title")
+        self.song_title = ShadowLabel("Song Title")
         self.song_title.setStyleSheet("color: #F7FFE3; background-color: transparent;")
-        self.add_shadow(self.song_title)
         
-        self.song_artist = QLabel("Artist")
+        self.song_artist = ShadowLabel("Artist")
         self.song_artist.setStyleSheet("color: rgba(255, 255, 255, 0.7); background-color: transparent;")
-        self.add_shadow(self.song_artist)
         
         info_layout.addWidget(self.song_title)
         info_layout.addWidget(self.song_artist)
         self.main_layout.addWidget(self.song_info_container)
         
-        self.worker.gesture_signal.connect(lambda g: self.gesture_label.setText(g.upper()))
+        if worker:
+            self.set_worker(worker)
         
+        now_playing.track_changed.connect(self.update_music)
+        self.update_music(now_playing.current)
+
+        # The clock only ticks while the page is visible, and only when the
+        # minute changes (see update_ui)
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.update_ui)
-        self.timer.start(1000)
         self.update_ui()
 
-    def add_shadow(self, widget):
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 180))
-        widget.setGraphicsEffect(shadow)
+    def set_worker(self, worker):
+        worker.gesture_event_signal.connect(self.show_gesture)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        if self.bg_pixmap and not self.bg_pixmap.isNull():
-            painter.drawPixmap(self.rect(), self.bg_pixmap)
+    def showEvent(self, event):
+        self.update_ui()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def show_gesture(self, event):
+        if event.kind == "change":
+            self.gesture_label.setText(event.label.upper())
+
+    # --- cached background ----------------------------------------------
+
+    def _card_rect(self):
+        if not self.card_pixmap or self.album_card.isHidden():
+            return None
+        return QRect(self.album_card.mapTo(self, QPoint(0, 0)), self.album_card.size())
+
+    def _invalidate_background(self):
+        self._background = None
+        self.update()
+
+    def eventFilter(self, obj, event):
+        # The card is drawn into the background, redraw it where it is now
+        # (the old spot gets repainted too, update() covers the whole page)
+        if event.type() in (QEvent.Type.Move, QEvent.Type.Resize) and self._background is not None:
+            if self._card_rect() != self._background_card:
+                self._invalidate_background()
+        return super().eventFilter(obj, event)
+
+    def _render_card_shadow(self, size):
+        blur = self.CARD_SHADOW_BLUR
+        img = QImage(size.width() + 2 * blur, size.height() + 2 * blur, QImage.Format.Format_ARGB32_Premultiplied)
+        img.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(img)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(blur, blur, size.width(), size.height()), 20, 20)
+        painter.fillPath(path, self.CARD_SHADOW_COLOR)
+        painter.end()
+        return QPixmap.fromImage(blurred(img, blur))
+
+    def _render_background(self, card_rect):
+        dpr = self.devicePixelRatioF()
+        bg = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        bg.setDevicePixelRatio(dpr)
+        painter = QPainter(bg)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        if self.bg_art and not self.bg_art.isNull():
+            painter.drawPixmap(self.rect(), self.bg_art)
             painter.fillRect(self.rect(), QColor(0, 0, 0, 160)) # Overlay
         else:
             painter.fillRect(self.rect(), QColor("#101010"))
+        if card_rect is not None:
+            shadow_size = card_rect.size().grownBy(QMargins(*[self.CARD_SHADOW_BLUR] * 4))
+            if self._card_shadow is None or self._card_shadow.size() != shadow_size:
+                self._card_shadow = self._render_card_shadow(card_rect.size())
+            dx, dy = self.CARD_SHADOW_OFFSET
+            blur = self.CARD_SHADOW_BLUR
+            painter.drawPixmap(card_rect.x() + dx - blur, card_rect.y() + dy - blur, self._card_shadow)
+            painter.drawPixmap(card_rect, self.card_pixmap)
+        painter.end()
+        return bg
+
+    def paintEvent(self, event):
+        if self._background is None:
+            self._background_card = self._card_rect()
+            self._background = self._render_background(self._background_card)
+        # Only the dirty part (a label, usually), 1:1 from the cache
+        dirty = event.rect()
+        dpr = self._background.devicePixelRatio()
+        source = QRectF(dirty.x() * dpr, dirty.y() * dpr, dirty.width() * dpr, dirty.height() * dpr)
+        painter = QPainter(self)
+        painter.drawPixmap(QRectF(dirty), self._background, source)
 
     def resizeEvent(self, event):
         h = self.height()
@@ -332,29 +589,21 @@ class BigPicturePage(QWidget):
         
         self.song_title.setFont(QFont("Urbanist", max(24, int(h * 0.06)), QFont.Weight.Bold))
         self.song_artist.setFont(QFont("Urbanist", max(18, int(h * 0.03))))
+        # The art used to be scaled to the window once per song, and went stale on resize
+        self._background = None
         super().resizeEvent(event)
 
     def update_ui(self):
         now = datetime.datetime.now()
+        # ShadowLabel.setText ignores unchanged text, nothing repaints
         self.time_label.setText(now.strftime("%I:%M"))
         self.date_label.setText(now.strftime("%b %d").upper())
-        self.update_music()
+        if self.isVisible():
+            # Next tick right after the minute turns
+            self.timer.start((60 - now.second) * 1000 - now.microsecond // 1000 + 50)
 
-    def get_rounded_pixmap(self, pixmap, radius=20):
-        if pixmap.isNull(): return pixmap
-        rounded = QPixmap(pixmap.size())
-        rounded.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, pixmap.width(), pixmap.height(), radius, radius)
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, pixmap)
-        painter.end()
-        return rounded
-
-    def update_music(self):
-        info = MusicHandler.get_info()
+    def update_music(self, info):
+        # Called by the now playing service only when the track changes
         if info:
             self.song_title.setText(info['song'])
             self.song_artist.setText(info['artist'])
@@ -362,31 +611,29 @@ class BigPicturePage(QWidget):
             s_id = f"{info['song']}{info['artist']}"
             if s_id != self.current_song_id:
                 self.current_song_id = s_id
-                pix = None
-                if info['source'] == 'music':
-                    pix = MusicHandler.get_album_art()
+                card = art_pixmap(info, "card")
                 
-                if pix and not pix.isNull():
-                    scaled_card = pix.scaled(250, 250, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-                    self.album_card.setPixmap(self.get_rounded_pixmap(scaled_card))
+                if card and not card.isNull():
+                    # OPTIMIZATION: Rounding and blurring were done once by the art cache
+                    self.card_pixmap = card
+                    self.bg_art = art_pixmap(info, "background")
                     self.album_card.show()
-                    
-                    small = pix.scaled(50, 50, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    self.bg_pixmap = small.scaled(self.size(), Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 else:
                     self.album_card.hide()
-                    self.bg_pixmap = None
-                self.update() 
+                    self.card_pixmap = self.bg_art = None
+                self._invalidate_background()
         else:
             self.current_song_id = None
             self.song_title.setText("NOT PLAYING")
             self.song_artist.setText("")
             self.album_card.hide()
-            self.bg_pixmap = None
-            self.update()
+            self.card_pixmap = self.bg_art = None
+            self._invalidate_background()
 
 class SettingsPage(QWidget):
-    def __init__(self):
+    show_skeleton_changed = pyqtSignal(bool)
+
+    def __init__(self, worker, show_skeleton=True):
         super().__init__()
         self.setStyleSheet("background-color: #101010;") # FIX
         
@@ -428,10 +675,30 @@ class SettingsPage(QWidget):
 
         check = QCheckBox("Show Hand Skeleton (Debug)")
         check.setStyleSheet("color: white; font-size: 16px;")
+        check.setChecked(show_skeleton)
+        check.toggled.connect(self.show_skeleton_changed)
         main_layout.addWidget(check)
+
+        # Recognition quality, picked at runtime by the worker's governor
+        self.quality_label = QLabel("Recognition quality: starting")
+        self.quality_label.setStyleSheet("color: #888; font-size: 14px;")
+        main_layout.addWidget(self.quality_label)
+        if worker:
+            self.set_worker(worker)
         
         main_layout.addStretch()
 
+    def set_worker(self, worker):
+        # Connect before reading, so a change in between isn't lost
+        worker.quality_signal.connect(self.show_quality)
+        self.show_quality(worker.quality_tier)
+
+    def show_quality(self, tier):
+        if tier is None:
+            self.quality_label.setText("Recognition quality: fixed")
+        else:
+            self.quality_label.setText(f"Recognition quality: {describe_tier(tier)}")
+
     def create_card(self, icon, title, desc):
         card = QFrame()
         card.setStyleSheet("background-color: #1A1A1A; border-radius: 15px; border: 1px solid #333;")
@@ -503,15 +770,31 @@ class ContributePage(QWidget):
 
 # main Window
 class MainWindow(QWidget):
-    def __init__(self):
+    def __init__(self, source=None, keyboard=None, music_backend=None, art_cache=None):
+        # source: frame_sources.FrameSource or spec (default webcam), keyboard: see
+        # GestureWorker, music_backend: now_playing.NowPlayingBackend (default
+        # per platform), art_cache: AlbumArtCache. All default to the real
+        # thing, soak_test.py swaps in synthetic ones.
         super().__init__()
+        load_fonts()
         self.setWindowTitle("Gesturly")
         self.resize(1000, 700)
         self.setStyleSheet("background-color: #101010;")
 
-        # Start Camera Thread
-        self.worker = GestureWorker()
-        self.worker.start()
+        # OPTIMIZATION: Staged startup. The window and HomePage paint first;
+        # cv2 / MediaPipe / pynput are imported in the background and the
+        # camera thread starts once they're in (HomePage shows "Starting
+        # camera" until its first frame). Other pages are built on first use.
+        self.worker = None
+        self._worker_args = dict(source=source, keyboard=keyboard)
+        self._closing = False
+        self.show_skeleton = True  # drawn over the camera feed by HomePage
+        self.startup = Startup(self)
+        self.startup.ready.connect(self._start_worker)
+
+        # One background poller for every page that shows the current track
+        self.now_playing_service = NowPlayingService(music_backend, art_cache=art_cache or AlbumArtCache())
+        self.now_playing = NowPlayingBridge(self.now_playing_service, self)
 
         # Layout: Sidebar + Stack
         main_layout = QHBoxLayout(self)
@@ -539,15 +822,76 @@ class MainWindow(QWidget):
         side_layout.addWidget(self.btn_dev)
 
         # --- Content Stack ---
+        # Placeholders until a page is first shown (see _page)
+        self.page_factories = [
+            lambda: HomePage(self.worker, self.now_playing, self.show_skeleton),  # Index 0
+            lambda: BigPicturePage(self.worker, self.now_playing),                # Index 1
+            self._create_settings_page,                                           # Index 2
+            lambda: ContributePage(),                                             # Index 3
+        ]
+        self.pages = [None] * len(self.page_factories)
         self.stack = QStackedWidget()
-        self.stack.addWidget(HomePage(self.worker))      # Index 0
-        self.stack.addWidget(BigPicturePage(self.worker))# Index 1
-        self.stack.addWidget(SettingsPage())             # Index 2
-        self.stack.addWidget(ContributePage())           # Index 3
+        for _ in self.page_factories:
+            self.stack.addWidget(QWidget())
+        self._page(0)
+
+        self.now_playing_service.start()
 
         main_layout.addWidget(sidebar)
         main_layout.addWidget(self.stack)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.startup.started:
+            # After this first show has painted
+            QTimer.singleShot(0, self.startup.start)
+
+    def _page(self, index):
+        if self.pages[index] is None:
+            page = self.page_factories[index]()
+            placeholder = self.stack.widget(index)
+            was_current = self.stack.currentWidget() is placeholder
+            self.stack.insertWidget(index, page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            if was_current:
+                self.stack.setCurrentWidget(page)
+            self.pages[index] = page
+        return self.pages[index]
+
+    def _create_settings_page(self):
+        page = SettingsPage(self.worker, self.show_skeleton)
+        page.show_skeleton_changed.connect(self.set_show_skeleton)
+        return page
+
+    def set_show_skeleton(self, show):
+        self.show_skeleton = show
+        if self.pages[0]:
+            self.pages[0].feed_label.set_show_skeleton(show)
+
+    def _start_worker(self):
+        if self._closing:
+            return
+        from gesture_worker import GestureWorker  # already imported by Startup
+
+        # Start Camera Thread (GESTURLY_INFERENCE=process runs MediaPipe in its own process)
+        # GESTURLY_TEMPLATES=templates.npz classifies with learned k-NN templates instead of the rules
+        try:
+            worker = GestureWorker(inference=os.environ.get("GESTURLY_INFERENCE", "thread"),
+                                   knn_templates=os.environ.get("GESTURLY_TEMPLATES"),
+                                   **self._worker_args)
+        except Exception as e:
+            # Raised in a slot it would abort the app; run without a camera instead
+            print(f"GestureWorker: {e!r}")
+            self._page(0).show_status(f"error: {e}")
+            return
+        self.worker = worker
+        for page in self.pages:
+            if hasattr(page, "set_worker"):
+                page.set_worker(self.worker)
+        self.worker.set_preview_suspended(self.isMinimized())
+        self.worker.start()
+
     def create_nav_btn(self, text, index):
         btn = ClickableLabel(text)
         btn.setFont(QFont("Segoe UI Emoji", 24))
@@ -559,7 +903,7 @@ class MainWindow(QWidget):
         return btn
 
     def switch_tab(self, index, active_btn):
-        self.stack.setCurrentIndex(index)
+        self.stack.setCurrentWidget(self._page(index))
         
         # Reset all colors
         for b in [self.btn_home, self.btn_big, self.btn_set, self.btn_dev]:
@@ -568,16 +912,22 @@ class MainWindow(QWidget):
         # Highlight active
         active_btn.setStyleSheet("color: #F7FFE3;")
 
+    def changeEvent(self, event):
+        # Nobody sees the camera feed while we're minimised
+        if event.type() == QEvent.Type.WindowStateChange and self.worker:
+            self.worker.set_preview_suspended(self.isMinimized())
+        super().changeEvent(event)
+
     def closeEvent(self, event):
-        self.worker.stop()
+        self._closing = True
+        self.now_playing_service.stop()
+        if self.worker:
+            self.worker.stop()
         event.accept()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
-    # Optional: Load font globally if you have the .ttf file
-    # QFontDatabase.addApplicationFont("Urbanist-Bold.ttf")
-    
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
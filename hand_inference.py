@@ -0,0 +1,313 @@
+"""Where hands.process() runs.
+
+ThreadInference calls MediaPipe in the calling thread. ProcessInference
+runs it in a child process, so inference doesn't share a GIL with the Qt
+GUI: frames go in through a shared-memory slot and only the landmarks come
+back. A child that crashes or hangs is restarted; frames arriving while it
+restarts simply have no hands.
+
+Both are used the same way:
+
+    with make_inference("process") as inference:
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=inference.input_buffer(img.shape))
+        out = inference.process(rgb)     # HandsOutput
+"""
+import multiprocessing as mp_proc
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+from gesture_features import landmarks_to_array
+from shm_ring import attach_shared_memory
+
+# OPTIMIZATION: model_complexity=0 is the "Lite" model (Faster, slightly less accurate)
+# perfect for real-time gesture control on laptops.
+HANDS_OPTIONS = dict(
+    max_num_hands=1,
+    model_complexity=0,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.7,
+)
+
+INFERENCE_MODES = ("thread", "process")
+
+# pts:        (N, 21, 3) float32 normalized to the input image, or None
+# handedness: "Left" / "Right" per hand
+# model_ms:   time spent in hands.process() itself
+HandsOutput = namedtuple("HandsOutput", "pts handedness model_ms")
+NO_HANDS = HandsOutput(None, (), 0.0)
+
+
+def _run_hands(hands, rgb):
+    # OPTIMIZATION: Pass by reference, flag as not writeable
+    # This drastically speeds up the internal MediaPipe processing
+    rgb.flags.writeable = False
+    start = time.perf_counter()
+    result = hands.process(rgb)
+    model_ms = (time.perf_counter() - start) * 1000
+    rgb.flags.writeable = True
+
+    if not result.multi_hand_landmarks:
+        return HandsOutput(None, (), model_ms)
+    pts = np.stack([landmarks_to_array(h.landmark) for h in result.multi_hand_landmarks])
+    handedness = tuple(h.classification[0].label for h in result.multi_handedness or ())
+    return HandsOutput(pts, handedness, model_ms)
+
+
+class HandInference:
+    mode = None
+
+    def start(self):
+        raise NotImplementedError
+
+    def input_buffer(self, shape):
+        """A uint8 array of this shape to put the next RGB frame in."""
+        raise NotImplementedError
+
+    def process(self, rgb):
+        raise NotImplementedError
+
+    def set_options(self, options):
+        """Change Hands options (model_complexity, confidences...) on the fly."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ThreadInference(HandInference):
+    mode = "thread"
+
+    def __init__(self, options=None):
+        self.options = dict(HANDS_OPTIONS, **(options or {}))
+        self.hands = None
+        self._rgb = None
+
+    def start(self):
+        import mediapipe as mp
+        self.hands = mp.solutions.hands.Hands(**self.options)
+
+    def input_buffer(self, shape):
+        # Reused, reallocated only when the input size changes
+        if self._rgb is None or self._rgb.shape != shape:
+            self._rgb = np.empty(shape, dtype=np.uint8)
+        return self._rgb
+
+    def process(self, rgb):
+        return _run_hands(self.hands, rgb)
+
+    def set_options(self, options):
+        options = dict(self.options, **options)
+        if options == self.options:
+            return
+        self.options = options
+        if self.hands:
+            # Loading the new model holds up this one frame
+            self.close()
+            self.start()
+
+    def close(self):
+        if self.hands:
+            self.hands.close()
+            self.hands = None
+
+
+class ProcessInference(HandInference):
+    """MediaPipe in a child process.
+
+    timeout:         seconds to wait for one frame's result before the
+                     child is considered hung and restarted
+    start_timeout:   seconds start() waits for the model to load
+    restart_backoff: minimum seconds between two restarts, so a child
+                     that dies on startup doesn't respawn every frame
+    """
+
+    mode = "process"
+
+    def __init__(self, options=None, max_pixels=1280 * 720, timeout=2.0, start_timeout=30.0, restart_backoff=1.0):
+        self.options = dict(HANDS_OPTIONS, **(options or {}))
+        self.max_pixels = max_pixels
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.restart_backoff = restart_backoff
+        self.ctx = mp_proc.get_context("spawn")
+
+        self._shm = None
+        self._pixels = None
+        self._input = None
+        self._proc = None
+        self._conn = None
+        self._ready = False
+        self._respawn_at = None
+        self._seq = 0
+
+        # Stats
+        self.restarts = 0
+        self.skipped = 0  # frames answered with NO_HANDS while the child was (re)starting
+
+    # --- child lifecycle ----------------------------------------------
+
+    def start(self):
+        if self._shm is None:
+            self._open_slot()
+        self._spawn()
+        if not self._wait_ready(self.start_timeout):
+            self.close()
+            raise RuntimeError("inference process didn't start")
+
+    def _open_slot(self):
+        self._shm = shared_memory.SharedMemory(create=True, size=self.max_pixels * 3)
+        self._pixels = np.ndarray((self.max_pixels * 3,), dtype=np.uint8, buffer=self._shm.buf)
+
+    def _close_slot(self):
+        self._pixels = self._input = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def _spawn(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self._proc = self.ctx.Process(
+            target=inference_main,
+            args=(self._shm.name, child_conn, self.options),
+            name="GesturlyInference",
+            daemon=True,
+        )
+        self._proc.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._ready = False
+        self._respawn_at = None
+
+    def _wait_ready(self, timeout):
+        try:
+            if self._conn.poll(timeout) and self._conn.recv() == "ready":
+                self._ready = True
+        except (EOFError, OSError):
+            pass
+        return self._ready
+
+    def _kill(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+        if self._proc:
+            if self._proc.is_alive():
+                self._proc.kill()
+            self._proc.join(timeout=1)
+            self._proc = None
+        self._ready = False
+
+    def _restart(self):
+        # Never blocks: the new child loads its model while frames keep
+        # flowing (without hands) through the pipeline
+        self.restarts += 1
+        self._kill()
+        self._respawn_at = time.monotonic() + self.restart_backoff
+
+    def _check_ready(self):
+        if self._proc is None:
+            if time.monotonic() >= self._respawn_at:
+                self._spawn()
+            return False
+        if self._wait_ready(0):
+            return True
+        if not self._proc.is_alive():
+            self._restart()
+        return False
+
+    # --- per frame ----------------------------------------------------
+
+    def input_buffer(self, shape):
+        # A view straight into shared memory, the child reads it in place
+        size = shape[0] * shape[1] * shape[2]
+        if size > self._pixels.size:
+            # Bigger frames than planned for: a bigger slot and a child on it.
+            # Not waited for, frames have no hands until its model is loaded
+            self._kill()
+            self._close_slot()
+            self.max_pixels = size // 3
+            self._open_slot()
+            self._spawn()
+        self._input = self._pixels[:size].reshape(shape)
+        return self._input
+
+    def process(self, rgb):
+        if rgb is not self._input:
+            self.input_buffer(rgb.shape)[...] = rgb
+        if not self._ready and not self._check_ready():
+            self.skipped += 1
+            return NO_HANDS
+
+        self._seq += 1
+        try:
+            self._conn.send((self._seq, rgb.shape))
+            if self._conn.poll(self.timeout):
+                seq, pts, handedness, model_ms = self._conn.recv()
+                if seq == self._seq:
+                    return HandsOutput(pts, handedness, model_ms)
+        except (EOFError, OSError):
+            pass
+        # Crashed, hung, or answered something else: start over
+        self._restart()
+        return NO_HANDS
+
+    def set_options(self, options):
+        options = dict(self.options, **options)
+        if options == self.options:
+            return
+        self.options = options
+        if self._shm is not None:
+            # A new child with the new model, frames have no hands until it's ready
+            self._kill()
+            self._spawn()
+
+    def close(self):
+        if self._conn and self._ready:
+            try:
+                self._conn.send(None)
+                self._proc.join(timeout=1)
+            except OSError:
+                pass
+        self._kill()
+        if self._shm is not None:
+            self._close_slot()
+
+
+def inference_main(shm_name, conn, options):
+    """Entry point of the inference process."""
+    import mediapipe as mp
+
+    shm = attach_shared_memory(shm_name)
+    try:
+        with mp.solutions.hands.Hands(**options) as hands:
+            conn.send("ready")
+            while True:
+                try:
+                    msg = conn.recv()
+                except EOFError:
+                    break  # parent went away
+                if msg is None:
+                    break
+                seq, shape = msg
+                rgb = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                conn.send((seq,) + tuple(_run_hands(hands, rgb)))
+                del rgb
+    finally:
+        shm.close()
+
+
+def make_inference(mode, options=None):
+    if mode == "thread":
+        return ThreadInference(options)
+    if mode == "process":
+        return ProcessInference(options)
+    raise ValueError(f"unknown inference mode {mode!r}, expected one of {INFERENCE_MODES}")
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+
+
+class HandROI:
+    """Region of interest around the tracked hand.
+
+    After a frame with a hand, the next frame's inference runs on a padded
+    square crop around where the hand was (downscaled to at most max_side
+    pixels) instead of the whole frame. When the hand is lost, or the crop
+    would cover most of the frame anyway, we fall back to full-frame detection.
+    """
+
+    def __init__(self, padding=0.5, max_side=320, max_area=0.6):
+        self.padding = padding      # extra margin, as a fraction of the hand box side, on each side
+        self.max_side = max_side    # crops bigger than this get downscaled before inference
+        self.max_area = max_area    # crops covering more of the frame than this aren't worth it
+        self.region = None          # (x0, y0, side) in full-frame pixels, or None = full frame
+        self._scaled = None         # reused downscale target
+
+    def reset(self):
+        self.region = None
+
+    def update(self, pts, frame_w, frame_h):
+        """Plan the next crop from this frame's full-frame normalized landmarks (or None)."""
+        if pts is None:
+            self.region = None
+            return
+
+        xs = pts[:, 0] * frame_w
+        ys = pts[:, 1] * frame_h
+        x_min, x_max = xs.min(), xs.max()
+        y_min, y_max = ys.min(), ys.max()
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = int(min(side, frame_w, frame_h))
+        if side <= 0 or side * side > self.max_area * frame_w * frame_h:
+            self.region = None
+            return
+
+        # Square around the hand centre, shifted (not shrunk) to stay inside the frame
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(np.clip(cx - side / 2, 0, frame_w - side))
+        y0 = int(np.clip(cy - side / 2, 0, frame_h - side))
+        self.region = (x0, y0, side)
+
+    def crop(self, img):
+        """Returns (inference image, region). region is None for a full frame.
+
+        OPTIMIZATION: No per-frame allocation. The crop is a view into img,
+        or, if it was bigger than max_side, downscaled into a buffer reused
+        (and overwritten) every frame. Either goes straight into cvtColor,
+        whose output is the contiguous image MediaPipe gets.
+        """
+        if self.region is None:
+            return img, None
+        x0, y0, side = self.region
+        view = img[y0:y0 + side, x0:x0 + side]
+        if side > self.max_side:
+            shape = (self.max_side, self.max_side, img.shape[2])
+            if self._scaled is None or self._scaled.shape != shape:
+                self._scaled = np.empty(shape, dtype=img.dtype)
+            cv2.resize(view, (self.max_side, self.max_side), dst=self._scaled, interpolation=cv2.INTER_AREA)
+            return self._scaled, self.region
+        return view, self.region
+
+
+def to_full_frame(pts, region, frame_w, frame_h):
+    """Map (N, 21, 3) landmarks normalized to a crop back to the full frame.
+
+    A uniform downscale of the crop doesn't change normalized coordinates.
+    MediaPipe's z is on roughly the same scale as x, so it scales with width.
+    """
+    if region is None:
+        return pts
+    x0, y0, side = region
+    out = np.empty_like(pts)
+    out[..., 0] = (pts[..., 0] * side + x0) / frame_w
+    out[..., 1] = (pts[..., 1] * side + y0) / frame_h
+    out[..., 2] = pts[..., 2] * (side / frame_w)
+    return out
+
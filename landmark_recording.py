@@ -0,0 +1,151 @@
+import json
+import os
+import time
+import numpy as np
+
+from gesture_features import GESTURE_NAMES
+
+# A recording is a directory:
+#   meta.json        version, frame count, label names (code -> name), free-form info
+#   timestamps.bin   (T,)        float64 seconds
+#   landmarks.bin    (T, 21, 3)  float32, NaN when no hand was seen
+#   handedness.bin   (T,)        int8   0 = Left, 1 = Right, -1 = no hand
+#   labels.bin       (T,)        int8   ground truth gesture code, -1 = unlabelled
+# Raw little-endian arrays are appended frame by frame, so a multi-hour capture
+# never sits in memory, a crash still leaves a usable file, and loading is a
+# np.memmap (instant, regardless of length).
+FORMAT_VERSION = 1
+
+HANDEDNESS = {"Left": 0, "Right": 1}
+NO_HAND = -1
+UNLABELLED = -1
+MAX_LABELS = 128  # codes are int8
+
+_FIELDS = [
+    ("timestamps", np.dtype("<f8"), ()),
+    ("landmarks", np.dtype("<f4"), (21, 3)),
+    ("handedness", np.dtype("i1"), ()),
+    ("labels", np.dtype("i1"), ()),
+]
+
+
+class LandmarkRecorder:
+    """Appends one hand per frame to a recording directory.
+
+    label_names: code -> name of the gestures being recorded (index 0 = no
+    gesture), e.g. the active gesture table's or k-NN classifier's names.
+    Labels that aren't in it get the next free code, the names are saved
+    in meta.json.
+    """
+
+    def __init__(self, path, info=None, label_names=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.frames = 0
+        self.info = dict(info or {}, created=time.time())
+        self.label_names = list(label_names or GESTURE_NAMES)
+        self._label_codes = {name: code for code, name in enumerate(self.label_names) if name}
+        self._files = {name: open(os.path.join(path, name + ".bin"), "wb") for name, _, _ in _FIELDS}
+        self._nan_hand = np.full((21, 3), np.nan, dtype="<f4")
+        self._write_meta()
+
+    def add(self, timestamp, pts=None, handedness=None, label=UNLABELLED):
+        """Record one frame. pts=None records a "no hand" frame."""
+        f = self._files
+        f["timestamps"].write(np.float64(timestamp).astype("<f8").tobytes())
+        if pts is None:
+            f["landmarks"].write(self._nan_hand.tobytes())
+            f["handedness"].write(np.int8(NO_HAND).tobytes())
+        else:
+            f["landmarks"].write(np.asarray(pts, dtype="<f4").tobytes())
+            f["handedness"].write(np.int8(HANDEDNESS.get(handedness, NO_HAND)).tobytes())
+        code = label if label == UNLABELLED else self.label_code(label)
+        f["labels"].write(np.int8(code).tobytes())
+        self.frames += 1
+
+    def label_code(self, label):
+        if label is None:
+            return 0
+        if not isinstance(label, str):
+            return int(label)
+        code = self._label_codes.get(label)
+        if code is None:
+            if len(self.label_names) >= MAX_LABELS:
+                return UNLABELLED
+            code = self._label_codes[label] = len(self.label_names)
+            self.label_names.append(label)
+            self._write_meta()  # a crash still leaves the name next to its code
+        return code
+
+    def _write_meta(self):
+        meta = {
+            "version": FORMAT_VERSION,
+            "frames": self.frames,
+            "label_names": self.label_names,
+            "info": self.info,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as fh:
+            json.dump(meta, fh, indent=2)
+
+    def close(self):
+        for fh in self._files.values():
+            fh.close()
+        self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped, read-only view of a recording directory."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported recording version {self.meta.get('version')}")
+        self.label_names = self.meta["label_names"]
+
+        # Trust the data files over meta["frames"], an interrupted recording
+        # never got to rewrite meta.json
+        sizes = []
+        for name, dtype, shape in _FIELDS:
+            n = os.path.getsize(os.path.join(path, name + ".bin"))
+            sizes.append(n // (dtype.itemsize * int(np.prod(shape, dtype=int))))
+        self.frames = min(sizes)
+
+        for name, dtype, shape in _FIELDS:
+            if self.frames:
+                arr = np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode="r", shape=(self.frames,) + shape)
+            else:
+                arr = np.empty((0,) + shape, dtype=dtype)
+            setattr(self, name, arr)
+
+    def __len__(self):
+        return self.frames
+
+    @property
+    def has_hand(self):
+        return self.handedness != NO_HAND
+
+    @property
+    def duration(self):
+        if self.frames < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+
+if __name__ == "__main__":
+    import sys
+
+    for rec_path in sys.argv[1:]:
+        rec = LandmarkRecording(rec_path)
+        labelled = rec.labels[rec.labels != UNLABELLED]
+        print(f"{rec_path}: {rec.frames} frames, {rec.duration:.1f}s, "
+              f"{int(rec.has_hand.sum())} with hand")
+        for code, count in zip(*np.unique(labelled, return_counts=True)):
+            print(f"  {rec.label_names[code] or 'None':<12} {count}")
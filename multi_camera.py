@@ -0,0 +1,262 @@
+"""Several camera stations on one machine, one process per camera.
+
+Each station process does its own capture -> MediaPipe -> classify ->
+confirm loop, so stations run on separate cores instead of sharing one
+GIL. Stations publish their latest frame and landmarks through
+shared-memory rings (see shm_ring.py) and confirmed gestures through one
+queue. The coordinator merges them into a single event stream.
+
+    python multi_camera.py 0 1                       # two webcams
+    python multi_camera.py clip.mp4 --copies 6 --fast --seconds 30   # load test, no camera needed
+"""
+import argparse
+import multiprocessing as mp_proc
+import queue
+import time
+import numpy as np
+
+from shm_ring import SharedRing
+
+LANDMARK_RECORD = np.dtype([
+    ('frame_id', '<i8'),
+    ('timestamp', '<f8'),       # time.time() of the capture
+    ('infer_ms', '<f4'),        # cvtColor + hands.process
+    ('has_hand', 'u1'),
+    ('gesture', 'i1'),          # per-frame code into the station's label_names (0 = none)
+    ('landmarks', '<f4', (21, 3)),
+])
+
+
+def frame_record(width, height):
+    return np.dtype([('frame_id', '<i8'), ('timestamp', '<f8'), ('frame', 'u1', (height, width, 3))])
+
+
+def station_main(station_id, source_spec, frame_spec, landmark_spec, events, stop, options):
+    """Entry point of one station process. Everything heavy is imported here."""
+    import cv2
+    from frame_sources import open_source
+    from gesture_engine import GestureEngine, FakeKeyboard
+
+    # Each process already owns a core, OpenCV's own threads would just contend
+    cv2.setNumThreads(1)
+
+    frames = landmarks = engine = None
+    table = [None]  # gesture table the coordinator has the names of
+    dropped = [0]
+
+    def send(kind, value, ts, frame_id, timeout=None):
+        # A slow or stopped coordinator must not stall capture: with the
+        # queue full the event is dropped (and counted)
+        try:
+            events.put((station_id, kind, value, ts, frame_id), block=timeout is not None, timeout=timeout)
+            return True
+        except queue.Full:
+            dropped[0] += 1
+            return False
+
+    def publish(res):
+        if stop.is_set():
+            engine.stop()
+        now = time.time()
+        # Landmark records carry codes into the active table (gestures.json
+        # or k-NN labels), its names go to the coordinator whenever it changes
+        # (and again next frame if they didn't fit in the queue)
+        if engine.gestures is not table[0]:
+            if send("names", list(engine.gestures.names), now, res.frame_id):
+                table[0] = engine.gestures
+        if res.fired:
+            send("gesture", res.fired, now, res.frame_id)
+
+        rec = landmarks.begin_write()
+        rec['frame_id'] = res.frame_id
+        rec['timestamp'] = now
+        rec['infer_ms'] = res.infer_ms
+        rec['has_hand'] = res.pts is not None
+        rec['gesture'] = table[0].codes.get(res.gesture, 0) if table[0] else 0
+        if res.pts is not None:
+            rec['landmarks'] = res.pts[0]
+        landmarks.commit_write()
+
+        # Frame goes straight into shared memory, resized in place
+        img = res.image
+        rec = frames.begin_write()
+        rec['frame_id'] = res.frame_id
+        rec['timestamp'] = now
+        if img.shape[:2] == (out_h, out_w):
+            rec['frame'] = img
+        else:
+            cv2.resize(img, (out_w, out_h), dst=rec['frame'], interpolation=cv2.INTER_AREA)
+        frames.commit_write()
+
+    # Whatever fails (a camera that won't open...), the coordinator hears
+    # this station finished
+    try:
+        frames = SharedRing.attach(*frame_spec)
+        landmarks = SharedRing.attach(*landmark_spec)
+        out_h, out_w = frames.record_dtype['frame'].shape[:2]
+
+        # Files play at their own frame rate unless --fast. Stations press no
+        # keys, they only report what they confirmed; whoever reads the
+        # coordinator's merged events acts on them.
+        source = open_source(source_spec, loop=options.get("loop"), realtime=not options.get("fast"))
+        engine = GestureEngine(source, keyboard=FakeKeyboard())
+        engine.on_frame.append(publish)
+        engine.run()
+    finally:
+        for ring in (frames, landmarks):
+            if ring is not None:
+                ring.close()
+        # Briefly waits for room, the coordinator may be draining the queue
+        # (running stops on a dead station anyway)
+        send("finished", dropped[0], time.time(), engine.frames_processed if engine else 0, timeout=1.0)
+
+
+class Station:
+    def __init__(self, station_id, source, frame_size):
+        self.id = station_id
+        self.source = source
+        self.frames = SharedRing(frame_record(*frame_size), slots=3)
+        self.landmarks = SharedRing(LANDMARK_RECORD, slots=8)
+        self.process = None
+        self.finished = False
+        self.dropped_events = 0  # events that didn't fit in the queue, known once finished
+        self.label_names = [None]  # decodes the landmark records' gesture codes
+
+
+class MultiCameraCoordinator:
+    """Starts one station process per source and merges their gestures.
+
+    merge_window: the same gesture confirmed by two stations within this
+    many seconds (one person seen by two cameras) is delivered once. A
+    station's own repeats (held volume) always go through.
+    """
+
+    def __init__(self, sources, frame_size=(640, 480), fast=False, loop=False, merge_window=0.3):
+        self.ctx = mp_proc.get_context("spawn")
+        self.stations = [Station(i, src, frame_size) for i, src in enumerate(sources)]
+        self.events = self.ctx.Queue(maxsize=1024)
+        self.stop_event = self.ctx.Event()
+        self.options = {"fast": fast, "loop": loop}
+        self.merge_window = merge_window
+        self._last_merged = {}
+        self.merged_count = 0
+        self.duplicate_count = 0
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        for st in self.stations:
+            st.process = self.ctx.Process(
+                target=station_main,
+                args=(st.id, st.source, st.frames.spec, st.landmarks.spec, self.events, self.stop_event, self.options),
+                name=f"GesturlyStation{st.id}",
+                daemon=True,
+            )
+            st.process.start()
+
+    def stop(self):
+        self.stop_event.set()
+        for st in self.stations:
+            if st.process:
+                st.process.join(timeout=5)
+                if st.process.is_alive():
+                    st.process.terminate()
+        for st in self.stations:
+            st.frames.close()
+            st.landmarks.close()
+
+    @property
+    def running(self):
+        # A station whose process died without a word counts as finished too
+        return any(not st.finished and (st.process is None or st.process.is_alive()) for st in self.stations)
+
+    def next_event(self, timeout=None):
+        """Next merged (station_id, gesture, timestamp, frame_id), or None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                station_id, kind, value, ts, frame_id = self.events.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if kind == "finished":
+                self.stations[station_id].finished = True
+                self.stations[station_id].dropped_events = value
+                continue
+            if kind == "names":
+                self.stations[station_id].label_names = value
+                continue
+            gesture = value
+            last = self._last_merged.get(gesture)  # (station_id, timestamp)
+            if last is not None and last[0] != station_id and ts - last[1] < self.merge_window:
+                self.duplicate_count += 1
+                continue
+            self._last_merged[gesture] = (station_id, ts)
+            self.merged_count += 1
+            return station_id, gesture, ts, frame_id
+
+    def latest_frame(self, station_id):
+        return self.stations[station_id].frames.read_latest()
+
+    def latest_landmarks(self, station_id):
+        return self.stations[station_id].landmarks.read_latest()
+
+    def gesture_name(self, station_id, code):
+        # A landmark record's gesture code, None for no gesture
+        names = self.stations[station_id].label_names
+        return names[code] if 0 <= code < len(names) else None
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        out = []
+        for st in self.stations:
+            frames = st.landmarks.writes
+            last = st.landmarks.read_latest()
+            out.append({
+                "station": st.id,
+                "source": st.source,
+                "frames": frames,
+                "fps": frames / elapsed if elapsed else 0.0,
+                "infer_ms": float(last['infer_ms']) if last is not None else 0.0,
+                "alive": bool(st.process and st.process.is_alive()),
+                "dropped_events": st.dropped_events,
+            })
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="camera indexes and/or video files")
+    parser.add_argument("--copies", type=int, default=1, help="run every source N times (load testing)")
+    parser.add_argument("--fast", action="store_true", help="process files as fast as possible instead of at their frame rate")
+    parser.add_argument("--loop", action="store_true", help="restart video files at the end")
+    parser.add_argument("--seconds", type=float, default=0, help="stop after N seconds (0 = until sources end / Ctrl+C)")
+    parser.add_argument("--size", default="640x480", help="shared-memory frame size, WxH")
+    args = parser.parse_args()
+
+    frame_size = tuple(int(v) for v in args.size.lower().split("x"))
+    coordinator = MultiCameraCoordinator(args.sources * args.copies, frame_size, fast=args.fast, loop=args.loop)
+    coordinator.start()
+    deadline = time.monotonic() + args.seconds if args.seconds else None
+    try:
+        while coordinator.running and (deadline is None or time.monotonic() < deadline):
+            event = coordinator.next_event(timeout=0.5)
+            if event:
+                station_id, gesture, ts, frame_id = event
+                print(f"[station {station_id} frame {frame_id}] {gesture}")
+    except KeyboardInterrupt:
+        pass
+
+    stats = coordinator.stats()
+    coordinator.stop()
+    total = 0.0
+    for s in stats:
+        total += s["fps"]
+        print(f"station {s['station']} ({s['source']}): {s['frames']} frames, {s['fps']:.1f} fps, "
+              f"last inference {s['infer_ms']:.1f} ms, {s['dropped_events']} events dropped")
+    print(f"total: {total:.1f} fps across {len(stats)} stations, "
+          f"{coordinator.merged_count} gestures ({coordinator.duplicate_count} cross-station duplicates merged)")
+
+
+if __name__ == "__main__":
+    main()
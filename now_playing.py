@@ -0,0 +1,226 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+_UNSET = object()
+
+
+# Backends
+class NowPlayingBackend:
+    """Where "now playing" information comes from.
+
+    get_info() returns {'song', 'artist', 'source'} or None when nothing plays.
+    get_album_art(info) returns encoded image bytes (JPEG/PNG) or None.
+    Both are only ever called from the NowPlayingService thread, so they may block.
+    """
+
+    def get_info(self):
+        raise NotImplementedError
+
+    def get_album_art(self, info):
+        return None
+
+
+class AppleScriptBackend(NowPlayingBackend):
+    """Spotify / Apple Music on macOS through osascript."""
+
+    SCRIPT_SPOTIFY = '''if application "Spotify" is running then
+            tell application "Spotify"
+                if player state is playing then
+                    return name of current track & "|" & artist of current track & "|spotify"
+                end if
+            end tell
+        end if
+        return ""'''
+
+    SCRIPT_MUSIC = '''if application "Music" is running then
+            tell application "Music"
+                if player state is playing then
+                    return name of current track & "|" & artist of current track & "|music"
+                end if
+            end tell
+        end if
+        return ""'''
+
+    def __init__(self):
+        self.art_file = os.path.join(tempfile.gettempdir(), "gesturly_album_art.jpg")
+
+    def get_info(self):
+        for script in [self.SCRIPT_SPOTIFY, self.SCRIPT_MUSIC]:
+            try:
+                result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=0.5)
+                if result.stdout.strip():
+                    parts = result.stdout.strip().split('|')
+                    if len(parts) >= 2:
+                        return {'song': parts[0], 'artist': parts[1], 'source': parts[2] if len(parts) > 2 else 'music'}
+            except Exception:
+                continue
+        return None
+
+    def get_album_art(self, info):
+        # Only Apple Music exposes artwork data to AppleScript
+        if info['source'] != 'music':
+            return None
+        script = f'''
+        if application "Music" is running then
+            tell application "Music"
+                if player state is playing then
+                    try
+                        set artworkData to data of artwork 1 of current track
+                        set fileRef to open for access POSIX file "{self.art_file}" with write permission
+                        set eof fileRef to 0
+                        write artworkData to fileRef
+                        close access fileRef
+                        return "success"
+                    on error
+                        return "error"
+                    end try
+                end if
+            end tell
+        end if
+        return "not_playing"
+        '''
+        try:
+            result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=1)
+            if "success" in result.stdout:
+                with open(self.art_file, "rb") as fh:
+                    return fh.read()
+        except Exception:
+            pass
+        return None
+
+
+class FakeNowPlayingBackend(NowPlayingBackend):
+    """Scripted player for Linux, tests and soak runs.
+
+    tracks: list of {'song', 'artist', 'source'} (optionally 'art': bytes),
+    each "plays" for track_seconds, then the list wraps. No tracks = idle.
+    """
+
+    DEMO_TRACKS = [
+        {'song': "Midnight City", 'artist': "M83", 'source': 'music'},
+        {'song': "Digital Love", 'artist': "Daft Punk", 'source': 'spotify'},
+        {'song': "Intro", 'artist': "The xx", 'source': 'music'},
+    ]
+
+    def __init__(self, tracks=None, track_seconds=10.0, clock=time.monotonic):
+        self.tracks = list(tracks or [])
+        self.track_seconds = track_seconds
+        self.clock = clock
+        self.start = clock()
+        self.info_calls = 0
+        self.art_calls = 0
+
+    def _current(self):
+        if not self.tracks:
+            return None
+        n = int((self.clock() - self.start) // self.track_seconds)
+        return self.tracks[n % len(self.tracks)]
+
+    def get_info(self):
+        self.info_calls += 1
+        track = self._current()
+        if track is None:
+            return None
+        return {'song': track['song'], 'artist': track['artist'], 'source': track['source']}
+
+    def get_album_art(self, info):
+        self.art_calls += 1
+        track = self._current()
+        return track.get('art') if track else None
+
+
+def default_backend():
+    if os.environ.get("GESTURLY_FAKE_MUSIC"):
+        return FakeNowPlayingBackend(FakeNowPlayingBackend.DEMO_TRACKS)
+    if sys.platform == "darwin":
+        return AppleScriptBackend()
+    return FakeNowPlayingBackend()
+
+
+# Service
+class NowPlayingService(threading.Thread):
+    """Polls one backend off the GUI thread and publishes only changes.
+
+    Subscribers are called from this thread with a track dict
+    {'song', 'artist', 'source', 'art'} or None when playback stops.
+    Art is fetched once per track change; an unchanged poll only fetches
+    again (every art_retry seconds) while the current track has no art.
+    'art' is the raw image bytes, or whatever art_cache.get(info, fetch)
+    returns when a cache is given (see album_art_cache.AlbumArtCache).
+    """
+
+    def __init__(self, backend=None, interval=1.0, art_cache=None, art_retry=10.0):
+        super().__init__(name="GesturlyNowPlaying", daemon=True)
+        self.backend = backend or default_backend()
+        self.interval = interval
+        self.art_cache = art_cache
+        self.art_retry = art_retry
+        self.current = None
+        self._key = _UNSET  # so the very first poll always publishes
+        self._art_retry_at = 0.0
+        self._subscribers = []
+        # Held while delivering, so a new subscriber's initial state can't
+        # arrive after (and overwrite) a concurrent change
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback):
+        """Register callback(track). It immediately receives the current state."""
+        with self._lock:
+            self._subscribers.append(callback)
+            callback(self.current)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def poll(self):
+        """One poll cycle. Returns True if the state changed."""
+        info = self.backend.get_info()
+        key = (info['song'], info['artist'], info['source']) if info else None
+        if key == self._key:
+            # A fetch can fail on a network blip: try again now and then
+            if not info or self.current['art'] is not None or time.monotonic() < self._art_retry_at:
+                return False
+            art = self._fetch_art(info)
+            if art is None:
+                return False
+            self._publish(dict(info, art=art))
+            return True
+
+        track = None
+        if info:
+            track = dict(info, art=self._fetch_art(info))
+        self._key = key
+        self._publish(track)
+        return True
+
+    def _fetch_art(self, info):
+        self._art_retry_at = time.monotonic() + self.art_retry
+        if self.art_cache:
+            return self.art_cache.get(info, self.backend.get_album_art)
+        return self.backend.get_album_art(info)
+
+    def _publish(self, track):
+        with self._lock:
+            self.current = track
+            for callback in list(self._subscribers):
+                callback(track)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"NowPlayingService: poll failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
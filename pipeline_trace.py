@@ -0,0 +1,184 @@
+"""Per-stage pipeline tracing.
+
+Every stage of a frame (capture read, flip, cvtColor, hands.process, drawing,
+QImage copy, signal emit, GUI rescale / paint) records a (stage, frame, start,
+duration, thread) span into a fixed-size ring buffer. The buffer can be dumped
+as a Chrome / Perfetto trace (chrome://tracing, ui.perfetto.dev) or summarized
+as per-stage percentiles.
+
+Tracing is off by default. Turn it on with GESTURLY_TRACE=trace.json (the file
+is written when the worker stops) or TRACER.enable() from code.
+
+    python pipeline_trace.py trace.json     # summarize a dumped trace
+"""
+import itertools
+import json
+import os
+import threading
+import time
+import numpy as np
+
+
+class PipelineTracer:
+    """Fixed-capacity span ring buffer, safe to write from any thread.
+
+    There is no lock: each writer claims a slot from an itertools.count (its
+    __next__ is atomic under the GIL) and fills it. When the ring wraps the
+    oldest spans are overwritten.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        self.enabled = False
+        self.capacity = capacity
+        self._stage = np.zeros(capacity, dtype=np.int16)
+        self._frame = np.zeros(capacity, dtype=np.int64)
+        self._start = np.zeros(capacity, dtype=np.int64)
+        self._dur = np.zeros(capacity, dtype=np.int64)
+        self._tid = np.zeros(capacity, dtype=np.int64)
+        self._slots = itertools.count()
+        self._written = 0
+        self._stage_ids = {}
+        self._stage_names = []
+        self._names_lock = threading.Lock()
+        self._thread_names = {}
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stage_id(self, name):
+        sid = self._stage_ids.get(name)
+        if sid is None:
+            # Only the first span of a new stage name takes the lock
+            with self._names_lock:
+                sid = self._stage_ids.get(name)
+                if sid is None:
+                    sid = len(self._stage_names)
+                    self._stage_names.append(name)
+                    self._stage_ids[name] = sid
+        return sid
+
+    # --- hot path -------------------------------------------------------
+
+    def now(self):
+        """Start timestamp for lap(). Returns 0 when tracing is off."""
+        if not self.enabled:
+            return 0
+        return time.perf_counter_ns()
+
+    def lap(self, stage, frame_id, start_ns):
+        """Record `stage` as running from start_ns until now.
+
+        Returns the current time so stages can be chained:
+            t = tracer.now()
+            ...; t = tracer.lap("flip", fid, t)
+            ...; t = tracer.lap("cvtColor", fid, t)
+        A zero start_ns (tracing was off when the frame began) records nothing.
+        """
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        if start_ns:
+            self.record(stage, frame_id, start_ns, now - start_ns)
+        return now
+
+    def record(self, stage, frame_id, start_ns, duration_ns):
+        i = next(self._slots)
+        slot = i % self.capacity
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        self._stage[slot] = self.stage_id(stage)
+        self._frame[slot] = frame_id
+        self._start[slot] = start_ns
+        self._dur[slot] = duration_ns
+        self._tid[slot] = tid
+        if i >= self._written:
+            self._written = i + 1
+
+    # --- export -------------------------------------------------------
+
+    def _valid(self):
+        n = min(self._written, self.capacity)
+        return slice(0, n)
+
+    def durations(self):
+        """{stage name: durations in ms} for everything still in the ring."""
+        sl = self._valid()
+        stages, durs = self._stage[sl], self._dur[sl] / 1e6
+        return {name: durs[stages == sid] for sid, name in enumerate(self._stage_names)}
+
+    def summary(self):
+        """{stage: (count, p50, p95, p99, max)} in milliseconds."""
+        out = {}
+        for name, d in self.durations().items():
+            if len(d):
+                p50, p95, p99 = np.percentile(d, [50, 95, 99])
+                out[name] = (len(d), p50, p95, p99, float(d.max()))
+        return out
+
+    def format_summary(self):
+        return format_summary(self.summary())
+
+    def chrome_events(self):
+        sl = self._valid()
+        order = np.argsort(self._start[sl], kind="stable")
+        tids = {tid: n for n, tid in enumerate(self._thread_names, start=1)}
+        pid = os.getpid()
+
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": n, "args": {"name": self._thread_names[tid]}}
+            for tid, n in tids.items()
+        ]
+        stage, frame, start, dur, tid = (a[sl][order] for a in (self._stage, self._frame, self._start, self._dur, self._tid))
+        for s, f, t0, d, th in zip(stage.tolist(), frame.tolist(), start.tolist(), dur.tolist(), tid.tolist()):
+            events.append({
+                "name": self._stage_names[s], "ph": "X", "pid": pid, "tid": tids.get(th, 0),
+                "ts": (t0 - self._origin_ns) / 1000.0, "dur": d / 1000.0,
+                "args": {"frame": f},
+            })
+        return events
+
+    def dump(self, path):
+        with open(path, "w") as fh:
+            json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}, fh)
+
+
+def format_summary(summary):
+    lines = [f"{'stage':<22}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for name, (count, p50, p95, p99, mx) in summary.items():
+        lines.append(f"{name:<22}{count:>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}{mx:>10.3f}")
+    return "\n".join(lines)
+
+
+def summarize_trace_file(path):
+    with open(path) as fh:
+        events = json.load(fh)["traceEvents"]
+    durs = {}
+    for e in events:
+        if e.get("ph") == "X":
+            durs.setdefault(e["name"], []).append(e["dur"] / 1000.0)
+    summary = {}
+    for name, d in durs.items():
+        d = np.asarray(d)
+        p50, p95, p99 = np.percentile(d, [50, 95, 99])
+        summary[name] = (len(d), p50, p95, p99, float(d.max()))
+    return summary
+
+
+# Shared by the worker, the capture thread and the GUI
+TRACER = PipelineTracer()
+TRACE_PATH = os.environ.get("GESTURLY_TRACE")
+if TRACE_PATH:
+    TRACER.enable()
+
+
+if __name__ == "__main__":
+    import sys
+
+    for trace_path in sys.argv[1:]:
+        print(trace_path)
+        print(format_summary(summarize_trace_file(trace_path)))
@@ -0,0 +1,119 @@
+"""Trades recognition quality for speed at runtime, to hold a latency budget.
+
+A tier is one set of the knobs that decide what inference costs: how much
+the full frame is downscaled before detection, the MediaPipe model, its
+tracking confidence and how big ROI crops may get. QualityGovernor watches
+per-frame inference time and steps down a tier when frames keep going
+over budget, and back up when there is plenty of headroom.
+
+Hysteresis, so it settles instead of oscillating:
+  - stepping down needs the budget exceeded for a whole window of frames,
+    stepping up needs a window comfortably (up_ratio) under it and a
+    longer wait (up_hold seconds)
+  - after every change the window starts over, measuring the new tier only
+  - a tier that was too slow shortly after stepping up to it waits twice
+    as long before being tried again (up to max_up_hold)
+"""
+import collections
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# input_scale:         full-frame detection input size, relative to the camera frame
+# model_complexity:    0 = lite, 1 = full MediaPipe hand landmark model
+# tracking_confidence: below this MediaPipe re-runs palm detection, the
+#                      expensive step; lower keeps tracking for longer
+# roi_max_side:        ROI crops are downscaled to at most this many pixels
+QualityTier = namedtuple("QualityTier", "name input_scale model_complexity tracking_confidence roi_max_side")
+
+QUALITY_TIERS = (
+    QualityTier("high", 1.0, 1, 0.7, 320),
+    QualityTier("balanced", 1.0, 0, 0.7, 320),  # the fixed settings we used to start with
+    QualityTier("fast", 0.75, 0, 0.5, 256),
+    QualityTier("minimal", 0.5, 0, 0.5, 192),
+)
+DEFAULT_TIER = 1
+
+
+def tier_options(tier):
+    """The MediaPipe Hands options of a tier (see hand_inference.HANDS_OPTIONS)."""
+    return dict(model_complexity=tier.model_complexity, min_tracking_confidence=tier.tracking_confidence)
+
+
+def describe_tier(tier):
+    model = "full" if tier.model_complexity else "lite"
+    return f"{tier.name} ({model} model, {tier.input_scale:.0%} input, tracking {tier.tracking_confidence:.1f})"
+
+
+class QualityGovernor:
+    """Picks a tier from measured inference times.
+
+    budget_ms:   target per-frame inference time
+    window:      frames per decision, their 90th percentile is compared
+    up_ratio:    step up only when under up_ratio * budget
+    down_hold /
+    up_hold:     minimum seconds on a tier before stepping down / up
+    """
+
+    def __init__(self, budget_ms, tiers=QUALITY_TIERS, start=DEFAULT_TIER, window=30, up_ratio=0.5,
+                 down_hold=1.0, up_hold=5.0, max_up_hold=60.0, clock=time.monotonic):
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.index = start
+        self.window = window
+        self.up_ratio = up_ratio
+        self.down_hold = down_hold
+        self.base_up_hold = up_hold
+        self.up_hold = up_hold
+        self.max_up_hold = max_up_hold
+        self.clock = clock
+        self._samples = collections.deque(maxlen=window)
+        self._since = clock()
+        self._stepped_up_at = None
+
+        # Stats
+        self.changes = 0
+        self.history = []  # (time, tier name, p90 that caused it)
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def update(self, infer_ms):
+        """Feed one frame's inference time. Returns the new tier when it
+        changes, else None."""
+        self._samples.append(infer_ms)
+        if len(self._samples) < self.window:
+            return None
+        now = self.clock()
+        held = now - self._since
+        p90 = float(np.percentile(np.array(self._samples), 90))
+
+        if p90 > self.budget_ms and held >= self.down_hold and self.index < len(self.tiers) - 1:
+            # Came straight back down: that tier is too slow here, wait longer next time
+            if self._stepped_up_at is not None and now - self._stepped_up_at < 2 * self.up_hold:
+                self.up_hold = min(self.up_hold * 2, self.max_up_hold)
+            self._stepped_up_at = None
+            return self._change(self.index + 1, now, p90)
+
+        if p90 < self.up_ratio * self.budget_ms and held >= self.up_hold and self.index > 0:
+            self._stepped_up_at = now
+            return self._change(self.index - 1, now, p90)
+
+        # Stable for a while: forget earlier bad experiences
+        if held > 4 * self.max_up_hold:
+            self.up_hold = self.base_up_hold
+        return None
+
+    def _change(self, index, now, p90):
+        self.index = index
+        self._since = now
+        self._samples.clear()
+        self.changes += 1
+        self.history.append((now, self.tier.name, p90))
+        return self.tier
+
+    def format_stats(self):
+        return (f"quality: {describe_tier(self.tier)}, budget {self.budget_ms:.0f} ms, "
+                f"{self.changes} tier changes")
@@ -0,0 +1,104 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+_HEADER = 64  # control block: total write count, padded to a cache line
+
+
+class SharedRing:
+    """Fixed-size ring of numpy records in one SharedMemory block.
+
+    One process writes, any number read. There are no locks: every slot
+    carries a sequence number that is odd while the slot is being written
+    (a seqlock), and readers retry when it changed under them. Readers only
+    ever want the newest record, so a slow reader just skips records.
+
+    record_dtype is any numpy dtype, typically structured, e.g.
+        np.dtype([('frame_id', '<i8'), ('frame', 'u1', (480, 640, 3))])
+
+    Create it in the parent, pass ring.spec to the child and rebuild it
+    there with SharedRing.attach(*spec).
+    """
+
+    def __init__(self, record_dtype, slots=4, name=None):
+        self.record_dtype = np.dtype(record_dtype)
+        self.slots = slots
+        self.owner = name is None
+        slot_dtype = np.dtype([('seq', '<i8'), ('data', self.record_dtype)], align=True)
+        size = _HEADER + slots * slot_dtype.itemsize
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = attach_shared_memory(name)
+        self._ctrl = np.ndarray((1,), dtype='<i8', buffer=self.shm.buf, offset=0)
+        self._ring = np.ndarray((slots,), dtype=slot_dtype, buffer=self.shm.buf, offset=_HEADER)
+        if self.owner:
+            self._ctrl[0] = 0
+            self._ring['seq'] = 0
+        self._pending = None
+
+    @property
+    def spec(self):
+        return (self.record_dtype, self.slots, self.shm.name)
+
+    @classmethod
+    def attach(cls, record_dtype, slots, name):
+        return cls(record_dtype, slots, name)
+
+    @property
+    def writes(self):
+        return int(self._ctrl[0])
+
+    # --- writer -------------------------------------------------------
+
+    def begin_write(self):
+        """Claim the next slot. Returns its record, write fields in place
+        (e.g. cv2.resize(..., dst=rec['frame'])) then call commit_write()."""
+        slot = self.writes % self.slots
+        self._ring['seq'][slot] += 1   # odd: being written
+        self._pending = slot
+        return self._ring['data'][slot]
+
+    def commit_write(self):
+        slot, self._pending = self._pending, None
+        self._ring['seq'][slot] += 1   # even: stable
+        self._ctrl[0] += 1
+
+    def write(self, **fields):
+        rec = self.begin_write()
+        for key, value in fields.items():
+            rec[key] = value
+        self.commit_write()
+
+    # --- readers ------------------------------------------------------
+
+    def read_latest(self, retries=3):
+        """Copy of the newest record (a numpy void, index it by field) or None."""
+        for _ in range(retries):
+            n = self.writes
+            if n == 0:
+                return None
+            slot = (n - 1) % self.slots
+            seq = self._ring['seq'][slot]
+            if seq & 1:
+                continue
+            rec = self._ring['data'][slot].copy()
+            if self._ring['seq'][slot] == seq:
+                return rec
+        return None
+
+    def close(self):
+        # Drop our views before closing, SharedMemory refuses while they exist
+        self._ctrl = self._ring = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def attach_shared_memory(name):
+    # Our readers/writers are always our own child processes, which share the
+    # parent's resource tracker, so attaching never causes an early unlink.
+    # Python 3.13+ lets us skip the (idempotent) registration altogether.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,321 @@
+"""Soak test: the whole app, offscreen, for hours, watching for leaks.
+
+    python soak_test.py --hours 8 --stats soak-1.4.jsonl
+    python soak_test.py --minutes 10 --interval 10 --max-rss-mb 50
+    python soak_test.py --compare soak-1.3.jsonl soak-1.4.jsonl
+
+Runs MainWindow on Qt's offscreen platform with generated camera frames
+(frame_sources.SyntheticSource at camera speed) and a scripted music player
+(now_playing.FakeNowPlayingBackend) whose tracks change every few seconds
+and come with album art, and clicks through the pages now and then. Every
+--interval seconds it samples RSS, open file descriptors, threads, child
+processes, gc counts and live Python objects per type. One JSON line per
+sample goes to --stats (the temp directory unless given).
+
+Growth is measured against the first sample after --warmup. If it goes
+over a bound, the run stops and exits with status 1. So does a run whose
+gesture worker failed, never came up, or stopped processing frames after
+the warmup: an idle app doesn't leak.
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+TOP_TYPES = 25  # object types written per sample
+
+
+# --- sampling -----------------------------------------------------------
+
+def rss_mb():
+    if psutil:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        # Peak, not current, but still catches steady growth (bytes on macOS, KiB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def open_fds():
+    if psutil:
+        return psutil.Process().num_fds() if hasattr(psutil.Process, "num_fds") else psutil.Process().num_handles()
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return -1
+
+
+def os_threads():
+    if psutil:
+        return psutil.Process().num_threads()
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def child_processes():
+    if psutil:
+        return len(psutil.Process().children(recursive=True))
+    try:
+        with open(f"/proc/self/task/{os.getpid()}/children") as fh:
+            return len(fh.read().split())
+    except OSError:
+        return -1
+
+
+def sample(start, window):
+    """One sample. "objects" has every type, only the top ones are written out."""
+    gc.collect()
+    counts = collections.Counter(type(o).__name__ for o in gc.get_objects())
+    engine = window.worker.engine if window.worker else None  # None while starting up
+    return {
+        "t": round(time.monotonic() - start, 1),
+        "rss_mb": round(rss_mb(), 2),
+        "fds": open_fds(),
+        "threads": threading.active_count(),
+        "os_threads": os_threads(),
+        "children": child_processes(),
+        "gc_counts": gc.get_count(),
+        "gc_objects": sum(counts.values()),
+        "objects": counts,
+        "frames": engine.frames_processed if engine else 0,
+        "fps": round(engine.pacer.fps, 1) if engine else 0.0,
+        "tracks": window.now_playing_service.backend.info_calls,
+        "status": window.worker.status if window.worker else None,
+    }
+
+
+def pipeline_failures(base, cur):
+    """The app itself has to be working, or there's nothing to soak."""
+    if cur["status"] and cur["status"].startswith("error"):
+        return [f"gesture worker failed ({cur['status']})"]
+    if base is None:
+        return []
+    if cur["status"] is None:
+        return ["no gesture worker after the warmup"]
+    if cur is not base and cur["frames"] <= base["frames"]:
+        return [f"no frames processed since the baseline ({cur['frames']} in all)"]
+    return []
+
+
+# --- bounds ---------------------------------------------------------------
+
+def growth(base, cur):
+    """Per metric growth from the baseline sample."""
+    out = {k: cur[k] - base[k] for k in ("rss_mb", "fds", "threads", "os_threads", "children", "gc_objects")}
+    # Only types in both: a saved sample has just the top types
+    types = {t: n - base["objects"][t] for t, n in cur["objects"].items() if t in base["objects"]}
+    out["worst_type"] = max(types.items(), key=lambda kv: kv[1], default=("-", 0))
+    return out
+
+
+def violations(g, args):
+    found = []
+    if g["rss_mb"] > args.max_rss_mb:
+        found.append(f"RSS grew {g['rss_mb']:.1f} MB (bound {args.max_rss_mb})")
+    if g["fds"] > args.max_fds:
+        found.append(f"{g['fds']} more open file descriptors (bound {args.max_fds})")
+    if g["os_threads"] > args.max_threads:
+        found.append(f"{g['os_threads']} more threads (bound {args.max_threads})")
+    if g["children"] > args.max_children:
+        found.append(f"{g['children']} more child processes (bound {args.max_children})")
+    name, n = g["worst_type"]
+    if n > args.max_objects:
+        found.append(f"{n} more {name} objects (bound {args.max_objects})")
+    return found
+
+
+def format_growth(g):
+    name, n = g["worst_type"]
+    return (f"rss {g['rss_mb']:+.1f} MB, fds {g['fds']:+d}, threads {g['os_threads']:+d}, "
+            f"children {g['children']:+d}, objects {g['gc_objects']:+d} (most: {name} {n:+d})")
+
+
+# --- fake inputs ------------------------------------------------------------
+
+def demo_tracks(count=12, size=600):
+    """Scripted tracks with distinct generated JPEG covers."""
+    tracks = []
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        img = np.empty((size, size, 3), dtype=np.uint8)
+        img[:] = rng.integers(0, 255, 3, dtype=np.uint8)
+        cv2.circle(img, (size // 2, size // 2), size // 3, [int(v) for v in rng.integers(0, 255, 3)], -1)
+        ok, jpeg = cv2.imencode(".jpg", img)
+        tracks.append({"song": f"Soak Track {i}", "artist": f"Artist {i % 4}",
+                       "source": "music" if i % 3 else "spotify", "art": jpeg.tobytes()})
+    return tracks
+
+
+# --- run ------------------------------------------------------------------
+
+def run(args):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from album_art_cache import AlbumArtCache
+    from frame_sources import SyntheticSource
+    from gesture_engine import FakeKeyboard
+    from gui import MainWindow
+    from now_playing import FakeNowPlayingBackend
+
+    app = QApplication(sys.argv[:1])
+    cache_dir = tempfile.mkdtemp(prefix="gesturly-soak-")
+    window = MainWindow(
+        source=SyntheticSource(args.width, args.height, fps=args.fps, realtime=True),
+        keyboard=FakeKeyboard(),
+        music_backend=FakeNowPlayingBackend(demo_tracks(), track_seconds=args.track_seconds),
+        art_cache=AlbumArtCache(cache_dir, max_memory_entries=4, max_disk_bytes=256 * 1024),
+    )
+    window.now_playing_service.interval = args.poll_interval
+    window.show()
+
+    start = time.monotonic()
+    duration = args.hours * 3600 + args.minutes * 60
+    state = {"base": None, "last": None, "failed": [], "samples": 0}
+    out = open(args.stats, "w", encoding="utf-8")
+    out.write(json.dumps({"started": time.time(), "argv": sys.argv[1:], "python": sys.version.split()[0]}) + "\n")
+
+    def on_sample():
+        s = sample(start, window)
+        out.write(json.dumps(dict(s, objects=dict(s["objects"].most_common(TOP_TYPES)))) + "\n")
+        out.flush()
+        state["samples"] += 1
+        state["last"] = s
+        line = f"[{s['t'] / 60:7.1f} min] {s['frames']} frames, {s['fps']:.1f} fps, rss {s['rss_mb']:.1f} MB"
+        if state["base"] is None:
+            if s["t"] >= args.warmup:
+                state["base"] = s
+                line += "  (baseline)"
+        else:
+            g = growth(state["base"], s)
+            line += "  " + format_growth(g)
+            state["failed"] = violations(g, args)
+        state["failed"] += pipeline_failures(state["base"], s)
+        print(line, flush=True)
+        if state["failed"] or s["t"] >= duration:
+            app.quit()
+
+    buttons = [window.btn_home, window.btn_big, window.btn_set, window.btn_dev]
+    page = [0]
+
+    def next_page():
+        page[0] = (page[0] + 1) % len(buttons)
+        window.switch_tab(page[0], buttons[page[0]])
+
+    sampler = QTimer()
+    sampler.timeout.connect(on_sample)
+    sampler.start(int(args.interval * 1000))
+    pager = QTimer()
+    pager.timeout.connect(next_page)
+    if args.page_seconds:
+        pager.start(int(args.page_seconds * 1000))
+
+    try:
+        app.exec()
+    finally:
+        sampler.stop()
+        pager.stop()
+        window.close()
+        out.close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if state["failed"]:
+        print("FAILED: " + "; ".join(state["failed"]))
+        return 1
+    if state["base"] is None:
+        print(f"no baseline: the run ({duration}s) ended within the warmup ({args.warmup}s)")
+        return 1
+    if state["last"] is state["base"]:
+        print("FAILED: no sample after the baseline, nothing shows frames were processed")
+        return 1
+    print(f"passed, {state['samples']} samples in {args.stats}")
+    return 0
+
+
+# --- comparing runs --------------------------------------------------------
+
+def load_samples(path):
+    with open(path, encoding="utf-8") as fh:
+        lines = [json.loads(line) for line in fh if line.strip()]
+    return [s for s in lines if "rss_mb" in s]
+
+
+def compare(paths, warmup):
+    print(f"{'run':<30} {'minutes':>8} {'rss MB/h':>9} {'fds':>5} {'threads':>8} {'objects/h':>10}  most grown type")
+    for path in paths:
+        samples = [s for s in load_samples(path) if s["t"] >= warmup]
+        if len(samples) < 2:
+            print(f"{path:<30} not enough samples")
+            continue
+        base, last = samples[0], samples[-1]
+        hours = max((last["t"] - base["t"]) / 3600, 1e-9)
+        # Slope over all samples, so one noisy sample doesn't decide
+        t = np.array([s["t"] for s in samples]) / 3600
+        rss_rate = np.polyfit(t, [s["rss_mb"] for s in samples], 1)[0]
+        g = growth(base, last)
+        name, n = g["worst_type"]
+        print(f"{path:<30} {last['t'] / 60:>8.1f} {rss_rate:>9.2f} {g['fds']:>+5d} {g['os_threads']:>+8d} "
+              f"{g['gc_objects'] / hours:>10.0f}  {name} {n:+d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=0)
+    parser.add_argument("--minutes", type=float, default=0)
+    parser.add_argument("--interval", type=float, default=60, help="seconds between samples")
+    parser.add_argument("--warmup", type=float, default=120, help="seconds before the baseline sample")
+    parser.add_argument("--stats", default=os.path.join(tempfile.gettempdir(), "gesturly_soak_stats.jsonl"),
+                        help="per-sample stats (JSON lines), in the temp directory by default")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--track-seconds", type=float, default=5, help="how long each fake track plays")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="now playing poll interval")
+    parser.add_argument("--page-seconds", type=float, default=20, help="switch pages this often (0 = never)")
+    bounds = parser.add_argument_group("bounds (growth after warmup)")
+    bounds.add_argument("--max-rss-mb", type=float, default=64)
+    bounds.add_argument("--max-fds", type=int, default=8)
+    bounds.add_argument("--max-threads", type=int, default=4)
+    bounds.add_argument("--max-children", type=int, default=1)
+    bounds.add_argument("--max-objects", type=int, default=20000, help="per type")
+    parser.add_argument("--compare", nargs="+", metavar="STATS", help="compare earlier runs instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare, args.warmup)
+        return 0
+    if not args.hours and not args.minutes:
+        args.hours = 1
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())